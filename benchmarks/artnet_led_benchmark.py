@@ -0,0 +1,417 @@
+"""
+End-to-end benchmark of the artnet_led integration.
+
+Every case runs a real Home Assistant core in its own process, sets up the ``light`` platform with an
+``artnet-controller`` node bound to 127.0.0.1 and one dimmer per universe, and drives it through the service bus.
+The frames are received by a fleet of simulated nodes (``client/simulator.py``) in yet another process, so the
+receiving side doesn't share the controller's event loop or CPU time. Both processes timestamp with the system's
+monotonic clock, so a frame's arrival time can be compared with the time its service call was made.
+
+A case measures, for a number of universes and a ``max_fps``:
+
+    latency       ``light.turn_on`` service call to the first frame with the new value on the wire
+    throughput    frames per second achieved per universe while every universe fades, sequence errors, and whether
+                  that is sustainable, i.e. every universe reached ``SUSTAINABLE_SHARE`` of ``max_fps``
+    cpu           process CPU time of the controller per universe frame and per output tick during the fade
+    allocations   memory blocks and bytes still allocated per output tick after a fade ran under ``tracemalloc``,
+                  and garbage collections of the youngest generation, a measure of short-lived allocations
+
+The results are written as JSON, together with the versions they were measured with, so releases can be compared::
+
+    python benchmarks/artnet_led_benchmark.py --universes 1 16 64 256 --fps 25 40 50 --output results.json
+
+Home Assistant needs to be installed; the cases use a temporary configuration directory, nothing in this one is touched.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib import metadata
+from pathlib import Path
+
+log = logging.getLogger("artnet_led_benchmark")
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INTEGRATION = REPO_ROOT / "custom_components" / "artnet_led"
+
+SCHEMA_VERSION = 1
+SUSTAINABLE_SHARE = 0.95
+WIRE_TIMEOUT = 2.0
+DISCOVERY_TIMEOUT = 15.0
+CASE_TIMEOUT = 600
+
+
+# ------------------------------------------------------------------------------
+# receiver process
+# ------------------------------------------------------------------------------
+
+async def _serve_receiver(universes: int, universes_per_node: int):
+    """Simulated nodes for ``universes`` universes, driven by JSON lines on stdin, one reply per line on stdout."""
+    sys.path.insert(0, str(REPO_ROOT))
+    from custom_components.artnet_led.client import PortAddress
+    from custom_components.artnet_led.client.simulator import start_fleet
+
+    per_node = min(universes, universes_per_node)
+    nodes = await start_fleet(-(-universes // per_node), universes_per_node=per_node)
+    node_by_universe = {port_address.port_address: node for node in nodes for port_address in node.port_addresses}
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    def reply(**message):
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+    async def arrival(universe: int, future: asyncio.Future, timeout: float):
+        try:
+            arrived = await asyncio.wait_for(future, timeout)
+        except TimeoutError:
+            arrived = None
+        reply(op="arrived", universe=universe, time=arrived)
+
+    reply(op="ready", addresses=[node.ip for node in nodes])
+    while line := await reader.readline():
+        request = json.loads(line)
+        op = request["op"]
+        if op == "wait":
+            universe = request["universe"]
+            future = node_by_universe[universe].wait_for(PortAddress.parse(universe), bytes([request["value"]]))
+            reply(op="waiting")
+            loop.create_task(arrival(universe, future, request["timeout"]))
+        elif op == "reset":
+            for node in nodes:
+                node.reset_statistics()
+            reply(op="reset")
+        elif op == "statistics":
+            reply(op="statistics", ports={
+                port_address: port_statistics.as_dict()
+                for node in nodes for port_address, port_statistics in node.statistics.items()
+                if port_address < universes
+            })
+        elif op == "stop":
+            break
+
+    for node in nodes:
+        node.close()
+
+
+class Receiver:
+    """The case's end of the receiver process."""
+
+    def __init__(self, process: asyncio.subprocess.Process, addresses: list[str]):
+        self.process = process
+        self.addresses = addresses
+
+    @classmethod
+    async def start(cls, universes: int, universes_per_node: int) -> "Receiver":
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, __file__, "--receiver", str(universes), "--universes-per-node", str(universes_per_node),
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+        )
+        receiver = cls(process, [])
+        ready = await receiver.read()
+        receiver.addresses = ready["addresses"]
+        return receiver
+
+    async def read(self) -> dict:
+        line = await self.process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"The receiver exited with {await self.process.wait()}")
+        return json.loads(line)
+
+    async def request(self, **message) -> dict:
+        self.process.stdin.write((json.dumps(message) + "\n").encode())
+        await self.process.stdin.drain()
+        return await self.read()
+
+    async def close(self):
+        if self.process.returncode is None:
+            self.process.stdin.write(b'{"op": "stop"}\n')
+            await self.process.stdin.drain()
+            await self.process.wait()
+
+
+# ------------------------------------------------------------------------------
+# case process
+# ------------------------------------------------------------------------------
+
+def _entity_id(universe: int) -> str:
+    return f"light.bench_{universe}"
+
+
+def _distribution(values: list[float], scale: float = 1000.0) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def percentile(share: float) -> float:
+        return ordered[min(len(ordered) - 1, round(share * (len(ordered) - 1)))] * scale
+
+    return {
+        "count": len(values),
+        "mean": statistics.fmean(values) * scale,
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": ordered[-1] * scale,
+    }
+
+
+async def _sample_latency(hass, receiver: Receiver, universe: int, value: int) -> tuple[float, float] | None:
+    """Seconds from the service call to its return and to the frame arriving, None if it never arrived."""
+    await receiver.request(op="wait", universe=universe, value=value, timeout=WIRE_TIMEOUT)
+    start = time.monotonic()
+    await hass.services.async_call("light", "turn_on", {
+        "entity_id": _entity_id(universe), "brightness": value, "transition": 0
+    }, blocking=True)
+    returned = time.monotonic()
+    arrived = (await receiver.read())["time"]
+    if arrived is None:
+        return None
+    return returned - start, arrived - start
+
+
+async def _fade(hass, receiver: Receiver, universes: int, on: bool, duration: float) -> tuple[dict, float, float]:
+    """Fade every light and return the port statistics, the CPU time and the wall time of the fade."""
+    await receiver.request(op="reset")
+    cpu_start, wall_start = time.process_time(), time.monotonic()
+    await hass.services.async_call("light", "turn_on" if on else "turn_off", {
+        "entity_id": [_entity_id(universe) for universe in range(universes)],
+        **({"brightness": 255} if on else {}),
+        "transition": duration,
+    }, blocking=True)
+    await asyncio.sleep(duration)
+    cpu, wall = time.process_time() - cpu_start, time.monotonic() - wall_start
+    ports = (await receiver.request(op="statistics"))["ports"]
+    return ports, cpu, wall
+
+
+async def _run_case(universes: int, max_fps: int, options: argparse.Namespace) -> dict:
+    from homeassistant import bootstrap, config_entries, loader
+    from homeassistant.core import HomeAssistant
+    from homeassistant.setup import async_setup_component
+
+    rng = random.Random(options.seed)
+    result: dict = {"universes": universes, "max_fps": max_fps}
+
+    receiver = await Receiver.start(universes, options.universes_per_node)
+    config_dir = tempfile.TemporaryDirectory(prefix="artnet_led_benchmark_")
+    hass = None
+    try:
+        (Path(config_dir.name) / "custom_components").mkdir()
+        (Path(config_dir.name) / "custom_components" / "artnet_led").symlink_to(INTEGRATION)
+
+        setup_start = time.monotonic()
+        hass = HomeAssistant(config_dir.name)
+        hass.config.skip_pip = True
+        loader.async_setup(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await bootstrap.async_load_base_functionality(hass)
+
+        if not await async_setup_component(hass, "light", {"light": [{
+            "platform": "artnet_led",
+            "host": "127.0.0.1",
+            "node_type": "artnet-controller",
+            "max_fps": max_fps,
+            "bind_address": "127.0.0.1",
+            "poll_addresses": receiver.addresses,
+            "universes": {
+                universe: {"devices": [{"channel": 1, "name": f"bench {universe}", "type": "dimmer"}]}
+                for universe in range(universes)
+            },
+        }]}):
+            raise RuntimeError("Unable to set up the light platform")
+        await hass.async_start()
+        await hass.async_block_till_done()
+        result["setup_seconds"] = time.monotonic() - setup_start
+
+        # Wait until the first universe of every simulated node made it to the wire
+        discovery_start = time.monotonic()
+        for universe in range(0, universes, options.universes_per_node):
+            while await _sample_latency(hass, receiver, universe, rng.randrange(1, 256)) is None:
+                if time.monotonic() - discovery_start > DISCOVERY_TIMEOUT:
+                    raise RuntimeError(f"Universe {universe} wasn't discovered within {DISCOVERY_TIMEOUT} seconds")
+        result["discovery_seconds"] = time.monotonic() - discovery_start
+
+        # Service call to wire, at random phases of the output loop
+        call_times, latencies, timeouts = [], [], 0
+        for sample in range(options.samples):
+            universe = rng.randrange(universes)
+            value = (hass.states.get(_entity_id(universe)).attributes.get("brightness") or 0) % 255 + 1
+            sampled = await _sample_latency(hass, receiver, universe, value)
+            if sampled is None:
+                timeouts += 1
+            else:
+                call_times.append(sampled[0])
+                latencies.append(sampled[1])
+            await asyncio.sleep(rng.uniform(0, 2 / max_fps))
+        result["latency_ms"] = {**_distribution(latencies), "timeouts": timeouts}
+        result["service_call_ms"] = _distribution(call_times)
+
+        # Every universe changes every tick while all lights fade
+        await hass.services.async_call("light", "turn_off", {"entity_id": "all", "transition": 0}, blocking=True)
+        await asyncio.sleep(0.5)
+        ports, cpu, wall = await _fade(hass, receiver, universes, True, options.duration)
+        fps = [1 / port["mean_interval"] if port["mean_interval"] else 0.0 for port in ports.values()]
+        frames = sum(port["frames"] for port in ports.values())
+        ticks = frames / universes
+        result["throughput"] = {
+            "seconds": wall,
+            "frames": frames,
+            "universe_frames_per_second": frames / wall,
+            "fps_min": min(fps),
+            "fps_mean": statistics.fmean(fps),
+            "jitter_ms_max": max(port["jitter"] for port in ports.values()) * 1000,
+            "interval_ms_max": max(port["max_interval"] for port in ports.values()) * 1000,
+            "sequence_errors": sum(port["sequence_errors"] for port in ports.values()),
+            "sustainable": min(fps) >= SUSTAINABLE_SHARE * max_fps,
+        }
+        result["cpu_us"] = {
+            "per_universe_frame": cpu / frames * 1e6 if frames else None,
+            "per_tick": cpu / ticks * 1e6 if ticks else None,
+            "utilisation": cpu / wall,
+        }
+
+        if options.allocations:
+            gc.collect()
+            collections = gc.get_stats()[0]["collections"]
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            ports, _, _ = await _fade(hass, receiver, universes, False, options.duration)
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            ticks = sum(port["frames"] for port in ports.values()) / universes
+            difference = after.compare_to(before, "filename")
+            result["allocations"] = {
+                "ticks": ticks,
+                "net_blocks_per_tick": sum(stat.count_diff for stat in difference) / ticks if ticks else None,
+                "net_bytes_per_tick": sum(stat.size_diff for stat in difference) / ticks if ticks else None,
+                "peak_bytes": peak,
+                "gc_collections_per_1000_ticks":
+                    (gc.get_stats()[0]["collections"] - collections) / ticks * 1000 if ticks else None,
+            }
+    finally:
+        if hass is not None:
+            await asyncio.wait_for(hass.async_stop(force=True), 30)
+        await receiver.close()
+        config_dir.cleanup()
+
+    return result
+
+
+# ------------------------------------------------------------------------------
+# orchestration
+# ------------------------------------------------------------------------------
+
+def _environment() -> dict:
+    def version(package: str) -> str | None:
+        try:
+            return metadata.version(package)
+        except metadata.PackageNotFoundError:
+            return None
+
+    try:
+        revision = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=REPO_ROOT, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+
+    return {
+        "timestamp": time.time(),
+        "revision": revision,
+        "integration": json.loads((INTEGRATION / "manifest.json").read_text())["version"],
+        "homeassistant": version("homeassistant"),
+        "pyartnet": version("pyartnet"),
+        "numpy": version("numpy"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _run_case_process(universes: int, max_fps: int, options: argparse.Namespace) -> dict:
+    arguments = [sys.executable, __file__, "--case", str(universes), str(max_fps),
+                 "--universes-per-node", str(options.universes_per_node), "--samples", str(options.samples),
+                 "--duration", str(options.duration), "--seed", str(options.seed)]
+    if not options.allocations:
+        arguments.append("--no-allocations")
+    try:
+        case = subprocess.run(arguments, capture_output=True, text=True, timeout=CASE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {"universes": universes, "max_fps": max_fps, "error": f"timed out after {CASE_TIMEOUT} seconds"}
+    if case.returncode != 0 or not case.stdout.strip():
+        return {"universes": universes, "max_fps": max_fps, "error": case.stderr.strip().splitlines()[-20:]}
+    return json.loads(case.stdout.strip().splitlines()[-1])
+
+
+def _summary(cases: list[dict]) -> list[dict]:
+    summary = []
+    for universes in sorted({case["universes"] for case in cases}):
+        sustained = [case for case in cases
+                     if case["universes"] == universes and case.get("throughput", {}).get("sustainable")]
+        best = max(sustained, key=lambda case: case["max_fps"], default=None)
+        summary.append({
+            "universes": universes,
+            "max_sustainable_fps": None if best is None else best["max_fps"],
+            "universe_frames_per_second": None if best is None else best["throughput"]["universe_frames_per_second"],
+        })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the artnet_led integration against simulated nodes.")
+    parser.add_argument("--universes", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--fps", type=int, nargs="+", default=[25, 40, 50], help="max_fps values to try, 1 to 50")
+    parser.add_argument("--universes-per-node", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=100, help="latency samples per case")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of fading per throughput measurement")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-allocations", dest="allocations", action="store_false",
+                        help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="file to write the JSON results to, instead of stdout")
+    parser.add_argument("--case", type=int, nargs=2, metavar=("UNIVERSES", "FPS"), help=argparse.SUPPRESS)
+    parser.add_argument("--receiver", type=int, metavar="UNIVERSES", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+
+    if options.receiver is not None:
+        asyncio.run(_serve_receiver(options.receiver, options.universes_per_node))
+        return
+    if options.case is not None:
+        print(json.dumps(asyncio.run(_run_case(*options.case, options))))
+        return
+
+    cases = []
+    for universes in options.universes:
+        for max_fps in options.fps:
+            log.warning(f"Benchmarking {universes} universes at {max_fps} fps")
+            cases.append(_run_case_process(universes, max_fps, options))
+
+    results = json.dumps({
+        "schema": SCHEMA_VERSION,
+        "environment": _environment(),
+        "options": {key: value for key, value in vars(options).items() if key not in ("case", "receiver", "output")},
+        "cases": cases,
+        "summary": _summary(cases),
+    }, indent=2)
+    if options.output:
+        Path(options.output).write_text(results + "\n")
+    else:
+        print(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import logging
 from asyncio import sleep
+from typing import Any
 
 from homeassistant.core import HomeAssistant
 from pyartnet import BaseUniverse
@@ -7,9 +8,13 @@ from pyartnet.base import BaseNode
 from pyartnet.base.base_node import TYPE_U
 from pyartnet.errors import InvalidUniverseAddressError
 
+from custom_components.artnet_led.bridge.timecode import TimecodeLock
+from custom_components.artnet_led.bridge.triggers import TriggerTable
 from custom_components.artnet_led.bridge.universe_bridge import UniverseBridge
 from custom_components.artnet_led.client import PortAddress
 from custom_components.artnet_led.client.artnet_server import ArtNetServer
+from custom_components.artnet_led.client.packet_view import ArtTimeCodeView
+from custom_components.artnet_led.client.recorder import FrameRecorder
 
 log = logging.getLogger(__name__)
 
@@ -18,14 +23,20 @@ HA_OEM = 0x2BE9
 
 class ArtNetController(BaseNode):
 
-    def __init__(self, hass: HomeAssistant, max_fps: int = 25, refresh_every: int = 2):
+    def __init__(self, hass: HomeAssistant, max_fps: int = 25, refresh_every: int = 2, bind_address: str = "0.0.0.0",
+                 poll_addresses: list[str] | None = None):
         super().__init__("", 0, max_fps=max_fps, refresh_every=0, start_refresh_task=False)
 
         self._hass = hass
+        self.timecode_locks: list[TimecodeLock] = []
+        self.triggers = TriggerTable(hass)
 
-        self.__server = ArtNetServer(hass, state_update_callback=self.update_dmx_data, oem=HA_OEM,
+        self.__server = ArtNetServer(hass, state_update_callback=self.update_dmx_data,
+                                     time_code_callback=self.update_time_code, trigger_callback=self.triggers.trigger,
+                                     command_callback=self.triggers.command, oem=HA_OEM,
                                      short_name="ha-artnet-led", long_name="HomeAssistant ArtNet integration",
-                                     retransmit_time_ms=int(refresh_every * 1000.0)
+                                     retransmit_time_ms=int(refresh_every * 1000.0), max_fps=max_fps,
+                                     bind_address=bind_address, poll_addresses=poll_addresses
                                      )
 
     def _send_universe(self, id: int, byte_size: int, values: bytearray, universe: BaseUniverse):
@@ -48,12 +59,26 @@ class ArtNetController(BaseNode):
     def start(self):
         return self.__server.start_server()
 
+    @property
+    def recorder(self) -> FrameRecorder | None:
+        return self.__server.recorder
+
+    def set_recorder(self, recorder: FrameRecorder | None):
+        self.__server.recorder = recorder
+
+    def diagnostics(self) -> dict[str, Any]:
+        return self.__server.get_diagnostics()
+
     def get_universe(self, nr: int) -> UniverseBridge:
         return super().get_universe(nr)
 
     def update_dmx_data(self, address: PortAddress, data: bytearray):
         self.get_universe(address.port_address).receive_data(data)
 
+    def update_time_code(self, timecode: ArtTimeCodeView):
+        for timecode_lock in self.timecode_locks:
+            timecode_lock.receive(timecode)
+
     async def _process_values_task(self):
         log.debug(f"Processing values changed")
         idle_ct = 0
@@ -69,6 +94,16 @@ class ArtNetController(BaseNode):
                 if job.is_done:
                     to_remove.append(job)
 
+            # process the vectorized fades of every universe
+            finished_fades = []
+            for universe in self._universes:
+                fade_engine = universe.fade_engine
+                if fade_engine is None or not fade_engine.active:
+                    continue
+                finished_fades.extend(fade_engine.process())
+                universe._data_changed = True
+                idle_ct = 0
+
             # send data of universe
             for universe in self._universes:
                 if not universe._data_changed:
@@ -81,4 +116,7 @@ class ArtNetController(BaseNode):
                     self._process_jobs.remove(job)
                     job.fade_complete()
 
+            for fade in finished_fades:
+                fade.fade_complete()
+
             await sleep(self._process_every)
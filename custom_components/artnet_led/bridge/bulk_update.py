@@ -0,0 +1,211 @@
+"""
+Apply new values to many channels of one or more universes as a single atomic change.
+
+A ``BulkUpdate`` collects channel targets and raw universe byte ranges, then starts one fade job per universe, so
+every change lands in the same frame and the node's process loop is only woken once. Universes with a vectorized
+``FadeEngine`` get their channel fades added to that engine instead.
+
+While a bulk update is active in the current context (``with BulkUpdate(...)``), lights hand their fades to it rather
+than to their channel, which is how the bulk service batches ``turn_on``/``turn_off`` of many entities.
+"""
+import logging
+from asyncio import Event
+from contextvars import ContextVar
+from time import monotonic
+from typing import Collection, Union
+
+from pyartnet import BaseUniverse, Channel
+
+from custom_components.artnet_led.bridge.channel_bridge import ChannelBridge, read_output_values, reverse_output_values
+
+log = logging.getLogger(__name__)
+
+_current_bulk_update: ContextVar[Union["BulkUpdate", None]] = ContextVar("artnet_led_bulk_update", default=None)
+
+
+def current_bulk_update() -> Union["BulkUpdate", None]:
+    return _current_bulk_update.get()
+
+
+class _ChannelFade:
+    """A channel's share of a ``UniverseFade``, standing in as the channel's ``_current_fade``.
+
+    Like pyartnet's ``ChannelBoundFade`` it has its own event, which is set once the channel left the job, whether the
+    fade completed or was cancelled.
+    """
+
+    def __init__(self, job: "UniverseFade", channel: Union[Channel, ChannelBridge], start: list[float],
+                 target: list[float]):
+        self.job = job
+        self.channel = channel
+        self.start = start
+        self.target = target
+        self.event = Event()
+
+    def cancel(self):
+        self.job.remove_channel(self.channel)
+
+
+class UniverseFade:
+    """One pyartnet process job that fades any number of channels and byte ranges of a universe together."""
+
+    def __init__(self, universe: BaseUniverse, duration_ms: float):
+        self.universe = universe
+        self.start_time = monotonic()
+        self.duration = duration_ms / 1000
+        self.channels: dict[Union[Channel, ChannelBridge], _ChannelFade] = {}
+        self.ranges: list[tuple[int, bytes, bytes]] = []
+
+        self.is_done = False
+        self.event = Event()
+
+    def add_channel(self, channel: Union[Channel, ChannelBridge], values: Collection[float]):
+        if channel._current_fade is not None:
+            channel._current_fade.cancel()
+        fade = self.channels[channel] = _ChannelFade(self, channel, list(channel._values_raw), list(values))
+        channel._current_fade = fade
+
+    def add_range(self, start: int, values: bytes):
+        """Fade raw bytes of the universe buffer, ``start`` being the 1-based DMX channel."""
+        index = start - 1
+        self.ranges.append((index, bytes(self.universe._data[index:index + len(values)]), values))
+
+    def remove_channel(self, channel: Union[Channel, ChannelBridge]):
+        fade = self.channels.pop(channel, None)
+        if fade is None:
+            return
+        if channel._current_fade is fade:
+            channel._current_fade = None
+        fade.event.set()
+
+        # Nothing left to fade, the node's process loop drops the job on its next pass
+        if not self.channels and not self.ranges:
+            self.is_done = True
+
+    def process(self):
+        progress = (monotonic() - self.start_time) / self.duration if self.duration > 0 else 1.0
+        if progress >= 1.0:
+            progress = 1.0
+            self.is_done = True
+
+        for channel, fade in self.channels.items():
+            channel.set_values([s + (t - s) * progress for s, t in zip(fade.start, fade.target)])
+
+        if self.ranges:
+            data = self.universe._data
+            for index, start, target in self.ranges:
+                data[index:index + len(target)] = bytes(round(s + (t - s) * progress) for s, t in zip(start, target))
+            self.universe._data_changed = True
+
+    def cancel(self):
+        for channel in list(self.channels):
+            self.remove_channel(channel)
+        self.event.set()
+        self.universe._node._process_jobs.remove(self)
+
+    def fade_complete(self):
+        for channel, fade in self.channels.items():
+            if channel._current_fade is fade:
+                channel._current_fade = None
+            fade.event.set()
+            if channel.callback_fade_finished is not None:
+                channel.callback_fade_finished(channel)
+        self.channels = {}
+        self.event.set()
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__:s} universe={self.universe._universe:d}, channels={len(self.channels):d}, ' \
+               f'ranges={len(self.ranges):d}, is_done={self.is_done}>'
+
+
+class BulkUpdate:
+    def __init__(self, transition: float = 0):
+        self.transition = transition
+        self.__channels: dict[BaseUniverse, dict[Union[Channel, ChannelBridge], Collection[float]]] = {}
+        self.__ranges: dict[BaseUniverse, list[tuple[int, bytes]]] = {}
+        self.__token = None
+
+    def set_channel(self, channel: Union[Channel, ChannelBridge], values: Collection[float]):
+        """Fade a channel to new values; the last target set for a channel wins."""
+        if len(values) != channel._width:
+            raise ValueError(f"Expected {channel._width} values for channel {channel}, but got {len(values)}")
+        if not all(0 <= value <= channel._value_max for value in values):
+            raise ValueError(f"Values for channel {channel} must be between 0 and {channel._value_max}")
+        self.__channels.setdefault(channel._parent_universe, {})[channel] = values
+
+    def set_range(self, universe: BaseUniverse, start: int, values: Collection[int]):
+        """Fade raw 8 bit universe values, starting at the 1-based DMX channel ``start``, bypassing any channel."""
+        if not 1 <= start or start + len(values) - 1 > 512:
+            raise ValueError(f"Channels {start}-{start + len(values) - 1} are outside of the universe")
+        if start + len(values) - 1 > universe._data_size:
+            universe._resize_universe(start + len(values) - 1)
+        self.__ranges.setdefault(universe, []).append((start, bytes(values)))
+
+    def set_universe(self, universe: BaseUniverse, data: bytes):
+        """Fade a whole universe to a buffer, through its channels where there are any.
+
+        Channels get the raw values that reproduce the buffer's bytes under their output correction, so their state
+        stays meaningful; the bytes between channels are faded as raw ranges.
+        """
+        covered = bytearray(len(data))
+        for channel in universe._channels.values():
+            values = read_output_values(channel, data)
+            if len(values) != channel._width:
+                continue
+            self.set_channel(channel, reverse_output_values(channel, values))
+            covered[channel._buf_start:channel._stop] = b"\x01" * (channel._stop - channel._buf_start)
+
+        index = 0
+        while index < len(data):
+            if covered[index]:
+                index += 1
+                continue
+            end = covered.find(1, index)
+            end = len(data) if end == -1 else end
+            self.set_range(universe, index + 1, data[index:end])
+            index = end
+
+    def apply(self):
+        """Start the collected changes, one job per universe."""
+        duration_ms = self.transition * 1000
+        nodes = set()
+
+        for universe in self.__channels.keys() | self.__ranges.keys():
+            channels = self.__channels.get(universe, {})
+            fade_engine = getattr(universe, "fade_engine", None)
+
+            job = None
+            if fade_engine is not None:
+                for channel, values in channels.items():
+                    channel.set_fade(values, duration_ms)
+            elif channels:
+                job = UniverseFade(universe, duration_ms)
+                for channel, values in channels.items():
+                    job.add_channel(channel, values)
+
+            if universe in self.__ranges:
+                job = job or UniverseFade(universe, duration_ms)
+                for start, values in self.__ranges[universe]:
+                    job.add_range(start, values)
+
+            if job is not None:
+                universe._node._process_jobs.append(job)
+            nodes.add(universe._node)
+
+        for node in nodes:
+            node._process_task.start()
+
+        log.debug(f"Applied bulk update of {sum(map(len, self.__channels.values()))} channels and "
+                  f"{sum(map(len, self.__ranges.values()))} ranges over {len(nodes)} nodes")
+        self.__channels = {}
+        self.__ranges = {}
+
+    def __enter__(self) -> "BulkUpdate":
+        self.__token = _current_bulk_update.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _current_bulk_update.reset(self.__token)
+        self.__token = None
+        if exc_type is None:
+            self.apply()
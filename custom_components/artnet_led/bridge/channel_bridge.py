@@ -3,8 +3,12 @@ from array import array
 from typing import Optional, Callable, Collection, Union, Type, List, Literal
 
 from pyartnet import Channel, BaseUniverse
+from pyartnet.errors import ChannelValueOutOfBoundsError, ValueCountDoesNotMatchChannelWidthError
 from pyartnet.fades import FadeBase, LinearFade
 
+from custom_components.artnet_led.bridge.fade_engine import EngineFade
+from custom_components.artnet_led.util.output_correction import CorrectionCurve
+
 log = logging.getLogger('pyartnet.Channel')
 
 class ChannelBridge:
@@ -16,10 +20,17 @@ class ChannelBridge:
     def _apply_output_correction(self):
         self.__channel._apply_output_correction()
 
+    def __sync_engine_fade(self):
+        fade = self.__channel._current_fade
+        if isinstance(fade, EngineFade):
+            fade.engine.sync(self)
+
     def get_values(self) -> List[int]:
+        self.__sync_engine_fade()
         return self.__channel.get_values()
 
     def set_values(self, values: Collection[Union[int, float]]):
+        self.__sync_engine_fade()
         return self.__channel.set_values(values)
 
     def to_buffer(self, buf: bytearray):
@@ -31,7 +42,25 @@ class ChannelBridge:
 
     def set_fade(self, values: Collection[Union[int, FadeBase]], duration_ms: int,
                  fade_class: Type[FadeBase] = LinearFade):
-        return self.__channel.set_fade(values, duration_ms, fade_class)
+        engine = getattr(self.__channel._parent_universe, "fade_engine", None)
+        if engine is None or fade_class is not LinearFade or any(isinstance(v, FadeBase) for v in values):
+            return self.__channel.set_fade(values, duration_ms, fade_class)
+
+        if len(values) != self.__channel._width:
+            raise ValueCountDoesNotMatchChannelWidthError(
+                f'Not enough fade values specified, expected {self.__channel._width} but got {len(values)}!')
+        for target in values:
+            if not 0 <= target <= self.__channel._value_max:
+                raise ChannelValueOutOfBoundsError(
+                    f'Target value out of bounds! 0 <= {target} <= {self.__channel._value_max}')
+
+        if self.__channel._current_fade is not None:
+            self.__channel._current_fade.cancel()
+            self.__channel._current_fade = None
+
+        self.__channel._current_fade = engine.add(self, values, duration_ms)
+        self.__channel._parent_node._process_task.start()
+        return self
 
     def __await__(self):
         return self.__channel.__await__()
@@ -42,6 +71,10 @@ class ChannelBridge:
     def set_output_correction(self, func: Optional[Callable[[float, int], float]]) -> None:
         self.__channel.set_output_correction(func)
 
+    @property
+    def _channel(self) -> Channel:
+        return self.__channel
+
     @property
     def _start(self):
         return self.__channel._start
@@ -92,16 +125,22 @@ class ChannelBridge:
 
     @property
     def _values_raw(self):
+        self.__sync_engine_fade()
         return self.__channel._values_raw
 
     @property
     def _values_act(self):
+        self.__sync_engine_fade()
         return self.__channel._values_act
 
     @callback_fade_finished.setter
     def callback_fade_finished(self, value):
         self.__channel.callback_fade_finished = value
 
+    @_current_fade.setter
+    def _current_fade(self, value):
+        self.__channel._current_fade = value
+
     @_correction_current.setter
     def _correction_current(self, value):
         self.__channel._correction_current = value
@@ -115,53 +154,50 @@ class ChannelBridge:
         self.__channel._values_act = value
 
     def from_buffer(self, buf: bytearray):
-        byte_order = self.__channel._byte_order
-        byte_size = self.__channel._byte_size
-
-        # TODO reverse correction not supported yet
-        # correction = self.__channel._correction_current
-        # value_max = self.__channel._value_max
-
-        start_index = self.__channel._start - 1
-        end_index = self.__channel._stop
-
-        byte_chunks = self.__chunks(buf[start_index:end_index], byte_size)
-
-        values_act = array(
-            'i', [int.from_bytes(byte_chunk, byte_order, signed=False)
-                  for byte_chunk in byte_chunks
-                  if len(byte_chunk) == byte_size]
-        )
-        values_act = values_act + array(values_act.typecode, [-1] * (len(self.__channel._values_act) - len(values_act)))
-
-        changed = False
-        for act_value_index, act_value in enumerate(values_act):
-            if act_value == -1:
-                log.warning(f"Channel {start_index + act_value_index} was updated externally, but is part of an "
-                            f"incomplete {byte_size} byte number. This is very likely unintended by the external "
-                            f"controller.")
-                break
-
-            if self.__channel._values_act[act_value_index] == act_value:
-                continue
-
-            self.__channel._values_act[act_value_index] = act_value
-            changed = True
-
-        if not changed:
+        channel = self.__channel
+        received = read_output_values(channel, buf)
+
+        complete = len(received)
+        if complete < channel._width:
+            log.warning(f"Channel {channel._buf_start + complete} was updated externally, but is part of an "
+                        f"incomplete {channel._byte_size} byte number. This is very likely unintended by the external "
+                        f"controller.")
+
+        # An engine fade only reaches the channel's arrays when synced, compare against where it actually is
+        self.__sync_engine_fade()
+        values_act = channel._values_act
+        if received == values_act[:complete]:
             return
 
-        # TODO reverse correction not supported yet
-        # values_raw = [round(correction.reverse_correct(val, value_max)) for val in values_act]
-        values_raw = [val for val in values_act]
-        for raw_value_index, raw_value in enumerate(values_raw):
-            self.__channel._values_raw[raw_value_index] = raw_value
+        # The received values take the channel over, an engine fade would write its own over them on the next frame
+        fade = channel._current_fade
+        if isinstance(fade, EngineFade):
+            fade.cancel()
+        values_act[:complete] = received
+        channel._values_raw[:complete] = reverse_output_values(channel, received)
 
         if self.callback_values_updated is not None:
-            self.callback_values_updated(self.__channel._values_raw)
-
-    @staticmethod
-    def __chunks(lst, n):
-        """Yield successive n-sized chunks from lst."""
-        for i in range(0, len(lst), n):
-            yield lst[i:i + n]
\ No newline at end of file
+            self.callback_values_updated(channel._values_raw)
+
+
+def read_output_values(channel: Union[Channel, ChannelBridge], buf: Union[bytes, bytearray]) -> array:
+    """Decode a channel's output values from a universe buffer; values cut off by the buffer's end are left out."""
+    byte_size = channel._byte_size
+    chunk = bytes(buf[channel._buf_start:channel._stop])
+    chunk = chunk[:len(chunk) // byte_size * byte_size]
+
+    typecode = channel._values_act.typecode
+    if byte_size == 1:
+        return array(typecode, chunk)
+    byte_order = channel._byte_order
+    return array(typecode, [int.from_bytes(chunk[i:i + byte_size], byte_order)
+                            for i in range(0, len(chunk), byte_size)])
+
+
+def reverse_output_values(channel: Union[Channel, ChannelBridge], values: array) -> array:
+    """Map output values back to the raw values that produce them under the channel's output correction."""
+    correction = channel._correction_current
+    if isinstance(correction, CorrectionCurve):
+        return correction.reverse_values(values, channel._byte_size)
+    # linear needs no reversal, and other correction functions can't be inverted
+    return values
@@ -0,0 +1,239 @@
+"""
+Array-backed linear fades for a whole universe.
+
+pyartnet runs a ``ChannelBoundFade`` job per channel and pushes every step through ``Channel.set_values`` and
+``Channel.to_buffer``. The engine instead keeps start, target, start time and duration of every faded value in NumPy
+arrays, computes the next frame of all active fades in one vectorized step and writes the bytes straight into the
+universe buffer. The per-channel value arrays are only synchronised when they're read or when a fade ends.
+
+NumPy is optional; without it ``NUMPY_AVAILABLE`` is False and channels keep using pyartnet's own fades.
+"""
+import heapq
+import itertools
+import logging
+from asyncio import Event
+from time import monotonic
+from typing import Callable, Collection, TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the installation
+    np = None
+
+if TYPE_CHECKING:
+    from custom_components.artnet_led.bridge.channel_bridge import ChannelBridge
+
+NUMPY_AVAILABLE = np is not None
+
+log = logging.getLogger(__name__)
+
+
+class EngineFade:
+    """Stands in for pyartnet's ``ChannelBoundFade`` as a channel's ``_current_fade``."""
+
+    def __init__(self, engine: "FadeEngine", channel: "ChannelBridge", end: float):
+        self.engine = engine
+        self.channel = channel
+        self.end = end
+        self.is_done = False
+        self.event = Event()
+
+    def cancel(self):
+        self.engine.remove(self)
+
+    def fade_complete(self):
+        channel = self.channel
+        self.event.set()
+
+        if channel.callback_fade_finished is not None:
+            channel.callback_fade_finished(channel)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__:s} channel={self.channel._start:d}/{self.channel._width:d}, ' \
+               f'is_done={self.is_done}>'
+
+
+class FadeEngine:
+    def __init__(self, data: bytearray):
+        self._data = data
+
+        # Every channel that ever faded through the engine owns a fixed range of value slots
+        self.__offsets: dict["ChannelBridge", int] = {}
+        self.__size = 0
+
+        self.__start = np.zeros(0)
+        self.__target = np.zeros(0)
+        self.__start_time = np.zeros(0)
+        self.__duration = np.ones(0)
+        self.__raw = np.zeros(0)
+        self.__act = np.zeros(0, dtype=np.int64)
+        self.__active = np.zeros(0, dtype=bool)
+
+        # One entry per universe byte of a registered channel: its buffer index, value slot and bit shift
+        self.__byte_index = np.zeros(0, dtype=np.intp)
+        self.__byte_slot = np.zeros(0, dtype=np.intp)
+        self.__byte_shift = np.zeros(0, dtype=np.int64)
+
+        self.__fades: dict["ChannelBridge", EngineFade] = {}
+        self.__ends: list[tuple[float, int, EngineFade]] = []
+        self.__counter = itertools.count()
+
+        # Derived from the active fades, rebuilt whenever a fade starts or stops
+        self.__dirty = True
+        self.__active_slots = np.zeros(0, dtype=np.intp)
+        self.__active_bytes = np.zeros(0, dtype=np.intp)
+        self.__groups: list[tuple[Callable[[float, int], float], int, "np.ndarray"]] = []
+
+    @property
+    def active(self) -> bool:
+        return bool(self.__fades)
+
+    def add(self, channel: "ChannelBridge", values: Collection[int | float], duration_ms: int) -> EngineFade:
+        offset = self.__register(channel)
+        width = channel._width
+
+        current = self.__fades.get(channel)
+        if current is not None:
+            self.remove(current)
+
+        now = monotonic()
+        duration = max(duration_ms / 1000, 1e-3)
+        slots = slice(offset, offset + width)
+        self.__start[slots] = channel._values_raw
+        self.__raw[slots] = self.__start[slots]
+        self.__act[slots] = channel._values_act
+        self.__target[slots] = values
+        self.__start_time[slots] = now
+        self.__duration[slots] = duration
+        self.__active[slots] = True
+
+        fade = EngineFade(self, channel, now + duration)
+        self.__fades[channel] = fade
+        heapq.heappush(self.__ends, (fade.end, next(self.__counter), fade))
+        self.__dirty = True
+        return fade
+
+    def remove(self, fade: EngineFade):
+        """Stop a fade at its current values without signalling completion to the channel's callback."""
+        if fade.is_done:
+            return
+        self.__stop(fade)
+        fade.event.set()
+
+    def process(self) -> list[EngineFade]:
+        """Advance all active fades to the current time and return the ones that finished."""
+        if not self.__fades:
+            return []
+        if self.__dirty:
+            self.__rebuild()
+
+        now = monotonic()
+        slots = self.__active_slots
+        progress = np.clip((now - self.__start_time[slots]) / self.__duration[slots], 0.0, 1.0)
+        start = self.__start[slots]
+        raw = start + (self.__target[slots] - start) * progress
+        self.__raw[slots] = raw
+
+        act = np.empty_like(raw)
+        for correction, value_max, members in self.__groups:
+            act[members] = self.__correct(correction, raw[members], value_max)
+        self.__act[slots] = np.rint(act)
+
+        active_bytes = self.__active_bytes
+        values = self.__act[self.__byte_slot[active_bytes]] >> self.__byte_shift[active_bytes] & 0xFF
+        buffer = np.frombuffer(self._data, dtype=np.uint8)
+        try:
+            buffer[self.__byte_index[active_bytes]] = values
+        finally:
+            # The universe must stay resizable, so the export is released right away
+            del buffer
+
+        finished = []
+        ends = self.__ends
+        while ends and ends[0][0] <= now:
+            _, _, fade = heapq.heappop(ends)
+            if fade.is_done:
+                continue
+            self.__stop(fade)
+            finished.append(fade)
+        return finished
+
+    def sync(self, channel: "ChannelBridge"):
+        """Copy the engine's current values of a fading channel into its pyartnet value arrays."""
+        offset = self.__offsets[channel]
+        slots = slice(offset, offset + channel._width)
+        values_raw = channel._channel._values_raw
+        values_act = channel._channel._values_act
+        for i, (raw, act) in enumerate(zip(np.rint(self.__raw[slots]).tolist(), self.__act[slots].tolist())):
+            values_raw[i] = int(raw)
+            values_act[i] = act
+
+    def __stop(self, fade: EngineFade):
+        channel = fade.channel
+        self.sync(channel)
+        offset = self.__offsets[channel]
+        self.__active[offset:offset + channel._width] = False
+
+        fade.is_done = True
+        del self.__fades[channel]
+        if channel._channel._current_fade is fade:
+            channel._channel._current_fade = None
+        self.__dirty = True
+
+    def __register(self, channel: "ChannelBridge") -> int:
+        offset = self.__offsets.get(channel)
+        if offset is not None:
+            return offset
+
+        offset = self.__size
+        width = channel._width
+        self.__offsets[channel] = offset
+        self.__size += width
+
+        def grow(array, fill):
+            return np.concatenate((array, np.full(width, fill, dtype=array.dtype)))
+
+        self.__start = grow(self.__start, 0)
+        self.__target = grow(self.__target, 0)
+        self.__start_time = grow(self.__start_time, 0)
+        self.__duration = grow(self.__duration, 1)
+        self.__raw = grow(self.__raw, 0)
+        self.__act = grow(self.__act, 0)
+        self.__active = grow(self.__active, False)
+
+        byte_size = channel._byte_size
+        shifts = np.arange(byte_size, dtype=np.int64) * 8
+        if channel._byte_order == 'big':
+            shifts = shifts[::-1]
+        self.__byte_index = np.concatenate((
+            self.__byte_index, np.arange(channel._buf_start, channel._buf_start + width * byte_size, dtype=np.intp)
+        ))
+        self.__byte_slot = np.concatenate((
+            self.__byte_slot, np.repeat(np.arange(offset, offset + width, dtype=np.intp), byte_size)
+        ))
+        self.__byte_shift = np.concatenate((self.__byte_shift, np.tile(shifts, width)))
+        return offset
+
+    def __rebuild(self):
+        self.__active_slots = np.flatnonzero(self.__active)
+        self.__active_bytes = np.flatnonzero(self.__active[self.__byte_slot])
+
+        # Positions within the active slots, grouped by output correction so each one is applied once per frame
+        position = 0
+        positions: dict[tuple[Callable[[float, int], float], int], list[int]] = {}
+        for channel in sorted(self.__fades, key=self.__offsets.__getitem__):
+            key = (channel._correction_current, channel._value_max)
+            positions.setdefault(key, []).extend(range(position, position + channel._width))
+            position += channel._width
+        self.__groups = [(correction, value_max, np.array(members, dtype=np.intp))
+                         for (correction, value_max), members in positions.items()]
+        self.__dirty = False
+
+    @staticmethod
+    def __correct(correction: Callable[[float, int], float], values: "np.ndarray", value_max: int) -> "np.ndarray":
+        try:
+            return np.clip(correction(values, value_max), 0, value_max)
+        except TypeError:
+            # A correction that only understands scalars
+            corrected = np.fromiter((correction(value, value_max) for value in values.tolist()), float, len(values))
+            return np.clip(corrected, 0, value_max)
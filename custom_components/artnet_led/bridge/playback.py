@@ -0,0 +1,316 @@
+"""
+Cue lists and chases, stepped by the output loop of their node.
+
+A cue list is compiled once. For every cue and universe it keeps the tracked state of the bytes the list controls,
+i.e. the value the latest cue up to this one set them to, as contiguous ranges (the cue's frame), and the ranges that
+differ from the previous cue's frame (its delta). Advancing to the next cue only has to touch the delta; jumping
+anywhere else, or going on before the previous cue finished fading, uses the full frame.
+
+Playback runs as a pyartnet process job, so it's advanced by the same tick that sends the universes instead of by
+Home Assistant's scheduler. A cue with a ``hold`` follows on to the next cue by itself once its fade and hold time
+passed; a cue without waits for ``go``. Follow times are scheduled from the previous cue's start rather than from the
+tick that noticed them, so chases don't drift, and steps shorter than a frame are all applied within that frame, which
+keeps the tracked state right while only the latest step is visible.
+
+Cues write the universe buffers directly. Once a cue's values are in place, and when playback stops, the bytes it wrote
+are decoded back into the channels covering them, the way received DMX is, so the channels and their lights continue
+from what is actually output.
+"""
+import logging
+from asyncio import Event
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Collection
+
+from pyartnet import BaseUniverse
+from pyartnet.base import BaseNode
+
+from custom_components.artnet_led.bridge.channel_bridge import ChannelBridge, read_output_values, \
+    reverse_output_values
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the installation
+    np = None
+
+log = logging.getLogger(__name__)
+
+UNIVERSE_SIZE = 512
+
+
+@dataclass
+class Cue:
+    """A cue as configured: raw 8 bit values for ``(universe, first DMX channel)`` targets."""
+    fade: float = 0
+    hold: float | None = None
+    channels: list[tuple[BaseUniverse, int, bytes]] = field(default_factory=list)
+
+
+@dataclass
+class CompiledCue:
+    fade: float
+    hold: float | None
+    frames: dict[BaseUniverse, list[tuple[int, bytes]]]
+    deltas: dict[BaseUniverse, list[tuple[int, bytes]]]
+
+
+def _ranges(values: bytearray, mask: bytearray) -> list[tuple[int, bytes]]:
+    """Contiguous runs of ``mask`` as ``(buffer index, values)``."""
+    ranges = []
+    index = mask.find(1)
+    while index != -1:
+        end = mask.find(0, index)
+        end = len(mask) if end == -1 else end
+        ranges.append((index, bytes(values[index:end])))
+        index = mask.find(1, end)
+    return ranges
+
+
+def compile_cues(cues: Collection[Cue], loop: bool) -> list[CompiledCue]:
+    universes = list(dict.fromkeys(universe for cue in cues for universe, _, _ in cue.channels))
+    state = {universe: bytearray(UNIVERSE_SIZE) for universe in universes}
+    mask = {universe: bytearray(UNIVERSE_SIZE) for universe in universes}
+
+    def track(cue: Cue):
+        for universe, start, values in cue.channels:
+            index = start - 1
+            if index + len(values) > UNIVERSE_SIZE:
+                raise ValueError(f"Channels {start}-{start + len(values) - 1} are outside of the universe")
+            state[universe][index:index + len(values)] = values
+            mask[universe][index:index + len(values)] = b"\x01" * len(values)
+
+    # A looping list comes around to its first cue with the state of its last one
+    if loop:
+        for cue in cues:
+            track(cue)
+
+    compiled = []
+    previous = {universe: (bytes(state[universe]), bytes(mask[universe])) for universe in universes}
+    for cue in cues:
+        track(cue)
+
+        frames = {}
+        deltas = {}
+        for universe in universes:
+            values, controlled = state[universe], mask[universe]
+            previous_values, previous_controlled = previous[universe]
+            changed = bytearray(
+                1 if controlled[i] and (not previous_controlled[i] or values[i] != previous_values[i]) else 0
+                for i in range(UNIVERSE_SIZE)
+            )
+            frames[universe] = _ranges(values, controlled)
+            deltas[universe] = _ranges(values, changed)
+            previous[universe] = (bytes(values), bytes(controlled))
+
+        compiled.append(CompiledCue(cue.fade, cue.hold, frames, deltas))
+    return compiled
+
+
+class _RangeFade:
+    """Bytes of a universe on their way from the buffer's values at the start of a cue to the cue's values."""
+
+    def __init__(self, universe: BaseUniverse, index: int, target: bytes):
+        self.universe = universe
+        self.index = index
+        self.target = target
+        start = bytes(universe._data[index:index + len(target)])
+        if np is not None:
+            self.start = np.frombuffer(start, dtype=np.uint8).astype(np.float64)
+            self.delta = np.frombuffer(target, dtype=np.uint8) - self.start
+        else:
+            self.start = start
+
+    def write(self, progress: float):
+        data = self.universe._data
+        end = self.index + len(self.target)
+        if np is not None:
+            data[self.index:end] = np.rint(self.start + self.delta * progress).astype(np.uint8).tobytes()
+        else:
+            data[self.index:end] = bytes(round(s + (t - s) * progress) for s, t in zip(self.start, self.target))
+
+
+def _take_over(universe: BaseUniverse, ranges: list[tuple[int, int]]):
+    """Decode the universe's buffer into every channel that overlaps one of the ``(first, end)`` buffer ranges."""
+    data = universe._data
+    for channel in universe._channels.values():
+        if not any(first < channel._stop and channel._buf_start < end for first, end in ranges):
+            continue
+        if isinstance(channel, ChannelBridge):
+            channel.from_buffer(data)
+            continue
+
+        values = read_output_values(channel, data)
+        channel._values_act[:len(values)] = values
+        channel._values_raw[:len(values)] = reverse_output_values(channel, values)
+
+
+class CueListPlayer:
+    """Plays one cue list; a pyartnet process job while a cue is fading or following on."""
+
+    def __init__(self, name: str, node: BaseNode, cues: Collection[Cue], loop: bool = False):
+        if not cues:
+            raise ValueError(f"Cue list {name} has no cues")
+        self.name = name
+        self.node = node
+        self.loop = loop
+        self.cues = compile_cues(cues, loop)
+
+        # Length of one pass of a looping chase, used to skip whole passes the output loop fell behind on
+        self.cycle: float | None = None
+        if loop and all(cue.hold is not None for cue in self.cues):
+            self.cycle = sum(cue.fade + cue.hold for cue in self.cues)
+            if self.cycle <= 0:
+                raise ValueError(f"Cue list {name} loops without ever waiting")
+
+        self.universe_sizes: dict[BaseUniverse, int] = {}
+        for cue in self.cues:
+            for universe, ranges in cue.frames.items():
+                if ranges:
+                    index, values = ranges[-1]
+                    self.universe_sizes[universe] = max(self.universe_sizes.get(universe, 0), index + len(values))
+
+        self.index: int | None = None
+        self.is_done = True
+        self.event = Event()
+
+        self.__cue_start = 0.0
+        self.__next_step: float | None = None
+        self.__fading: list[_RangeFade] = []
+        self.__complete = False
+        # Buffer ranges written since the channels last took over the output
+        self.__written: dict[BaseUniverse, list[tuple[int, int]]] = {}
+
+    @property
+    def running(self) -> bool:
+        return not self.is_done
+
+    def go(self, index: int | None = None, start_time: float | None = None):
+        """Start the next cue, or cue ``index`` (0-based), as if it started at the monotonic ``start_time``."""
+        if index is None:
+            index = 0 if self.index is None else self.index + 1
+            if index >= len(self.cues):
+                if not self.loop:
+                    log.debug(f"Cue list {self.name} is at its last cue")
+                    return
+                index = 0
+            sequential = self.index is not None
+        else:
+            if not 0 <= index < len(self.cues):
+                raise IndexError(f"Cue list {self.name} has no cue {index + 1}")
+            sequential = self.index is not None and index == (
+                (self.index + 1) % len(self.cues) if self.loop else self.index + 1
+            )
+        self.__start(index, monotonic() if start_time is None else start_time, sequential)
+
+    def back(self):
+        """Go back to the previous cue, with that cue's fade."""
+        if self.index is None:
+            return
+        index = self.index - 1
+        if index < 0:
+            index = len(self.cues) - 1 if self.loop else 0
+        self.__start(index, monotonic(), False)
+
+    def stop(self):
+        """Stop playback, leaving the output as it is."""
+        for range_fade in self.__fading:
+            self.__wrote(range_fade.universe, range_fade.index, range_fade.index + len(range_fade.target))
+        self.__sync_channels()
+        self.__fading = []
+        self.__next_step = None
+        self.index = None
+        if self in self.node._process_jobs:
+            self.node._process_jobs.remove(self)
+        self.is_done = True
+        self.event.set()
+
+    def process(self):
+        now = monotonic()
+
+        # Follow on through every step that was due since the last frame
+        steps = 0
+        while self.__next_step is not None and self.__next_step <= now:
+            steps += 1
+            if steps > len(self.cues) and self.cycle is not None:
+                self.__next_step += (now - self.__next_step) // self.cycle * self.cycle
+            index = self.index + 1
+            if index >= len(self.cues):
+                if not self.loop:
+                    self.__next_step = None
+                    break
+                index = 0
+            self.__start(index, self.__next_step, True)
+
+        if self.__fading:
+            fade = self.cues[self.index].fade
+            progress = (now - self.__cue_start) / fade
+            if progress >= 1.0:
+                progress = 1.0
+            for range_fade in self.__fading:
+                range_fade.write(progress)
+                range_fade.universe._data_changed = True
+            if progress >= 1.0:
+                for range_fade in self.__fading:
+                    self.__wrote(range_fade.universe, range_fade.index, range_fade.index + len(range_fade.target))
+                self.__fading = []
+                self.__complete = True
+
+        self.__sync_channels()
+
+        if not self.__fading and self.__next_step is None:
+            self.is_done = True
+
+    def cancel(self):
+        self.stop()
+
+    def fade_complete(self):
+        self.event.set()
+
+    def __start(self, index: int, start_time: float, sequential: bool):
+        cue = self.cues[index]
+        # Deltas only hold what changed against a previous cue that was completely faded in
+        frames = cue.deltas if sequential and self.__complete else cue.frames
+
+        for universe, size in self.universe_sizes.items():
+            if universe._data_size < size:
+                universe._resize_universe(size)
+
+        self.index = index
+        self.__cue_start = start_time
+        self.__complete = False
+        self.__fading = []
+        if cue.fade <= 0 or start_time + cue.fade <= monotonic():
+            for universe, ranges in frames.items():
+                data = universe._data
+                for buffer_index, values in ranges:
+                    data[buffer_index:buffer_index + len(values)] = values
+                    self.__wrote(universe, buffer_index, buffer_index + len(values))
+                if ranges:
+                    universe._data_changed = True
+            self.__complete = True
+        else:
+            self.__fading = [_RangeFade(universe, buffer_index, values)
+                             for universe, ranges in frames.items() for buffer_index, values in ranges]
+
+        self.__next_step = start_time + cue.fade + cue.hold if cue.hold is not None else None
+
+        if self.is_done:
+            self.is_done = False
+            self.event.clear()
+            self.node._process_jobs.append(self)
+            self.node._process_task.start()
+
+    def __wrote(self, universe: BaseUniverse, first: int, end: int):
+        self.__written.setdefault(universe, []).append((first, end))
+
+    def __sync_channels(self):
+        """Let the channels take over what the cues wrote; steps within one frame are decoded only once."""
+        if not self.__written:
+            return
+        written, self.__written = self.__written, {}
+        for universe, ranges in written.items():
+            _take_over(universe, ranges)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__:s} {self.name:s} cue={self.index}/{len(self.cues):d}, ' \
+               f'is_done={self.is_done}>'
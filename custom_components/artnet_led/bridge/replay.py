@@ -0,0 +1,134 @@
+"""
+Replay of a frame recording through a controller's universes.
+
+Frames are read one at a time from the memory-mapped recording, with the kernel asked to read ahead, so a recording of
+any size is streamed rather than loaded. Each frame is copied into the buffer of the universe with its port address and
+sent the normal way, i.e. through ``ArtNetServer.send_dmx`` and its output scheduler.
+
+Frame times are taken relative to the first replayed frame and scaled by the speed, against the event loop's clock, so
+timing errors don't add up over a long replay. When the loop falls behind, every frame that is due is applied before
+the universes are sent again. Seeking and changing the speed restart the stream at the current position.
+
+While a replay runs it owns the universes' buffers; lights on the same universes still write their own channels.
+"""
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant
+from pyartnet import BaseUniverse
+
+from custom_components.artnet_led.client.recorder import FrameRecorder, DIRECTION_OUT
+
+log = logging.getLogger(__name__)
+
+# Frames the kernel is asked to read ahead of the replay
+PREFETCH_FRAMES = 1024
+
+
+class Replay:
+    def __init__(self, hass: HomeAssistant, universes: list[BaseUniverse], recording: FrameRecorder,
+                 direction: int = DIRECTION_OUT, speed: float = 1.0, loop: bool = False):
+        self._hass = hass
+        self.recording = recording
+        self.direction = direction
+        self.speed = speed
+        self.loop = loop
+        self.__universes = {universe._universe: universe for universe in universes}
+
+        if recording.oldest >= recording.written:
+            raise ValueError(f"{recording.path} holds no frames")
+        self.number = recording.oldest
+        self.frames_replayed = 0
+        self.frames_skipped = 0
+        self.__task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.__task is not None and not self.__task.done()
+
+    @property
+    def position(self) -> float:
+        """Seconds from the start of the recording to the current frame."""
+        if self.number >= self.recording.written:
+            return 0.0
+        return self.recording.frame(self.number).timestamp - self.recording.frame(self.recording.oldest).timestamp
+
+    def start(self, position: float = 0.0):
+        """Start, or restart, ``position`` seconds into the recording."""
+        self.seek(self.recording.frame(self.recording.oldest).timestamp + position)
+
+    def seek(self, timestamp: float):
+        """Continue at the first frame recorded at or after a timestamp of the recording."""
+        self.__restart(self.recording.find(timestamp))
+
+    def set_speed(self, speed: float):
+        self.speed = speed
+        if self.running:
+            self.__restart(self.number)
+
+    def stop(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+    def __restart(self, number: int):
+        self.stop()
+        self.number = number
+        self.recording.prefetch(number, PREFETCH_FRAMES)
+        self.__task = self._hass.async_create_background_task(self.__run(), "artnet_led replay")
+
+    async def __run(self):
+        recording = self.recording
+        event_loop = self._hass.loop
+        universes = self.__universes
+        pending: set[BaseUniverse] = set()
+
+        while True:
+            if self.number >= recording.written:
+                frames = recording.written - recording.oldest
+                if not self.loop or frames < 2:
+                    break
+                # The next pass starts one average frame interval after the last frame of this one
+                first, last = recording.frame(recording.oldest), recording.frame(recording.written - 1)
+                await asyncio.sleep((last.timestamp - first.timestamp) / (frames - 1) / self.speed)
+                self.number = recording.oldest
+
+            # Frame times are relative to the first frame of this run, so waiting errors don't accumulate
+            origin_timestamp = recording.frame(self.number).timestamp
+            origin_time = event_loop.time()
+            speed = self.speed
+
+            while self.number < recording.written:
+                frame = recording.frame(self.number)
+                delay = origin_time + (frame.timestamp - origin_timestamp) / speed - event_loop.time()
+                if delay > 0:
+                    for universe in pending:
+                        universe.send_data()
+                    pending.clear()
+                    await asyncio.sleep(delay)
+
+                self.number += 1
+                if self.number % PREFETCH_FRAMES == 0:
+                    recording.prefetch(self.number, PREFETCH_FRAMES)
+
+                universe = universes.get(frame.port_address)
+                if frame.direction != self.direction or universe is None:
+                    self.frames_skipped += 1
+                    continue
+
+                length = len(frame.data)
+                if length > universe._data_size:
+                    universe._resize_universe(length)
+                universe._data[:length] = frame.data
+                pending.add(universe)
+                self.frames_replayed += 1
+
+            for universe in pending:
+                universe.send_data()
+            pending.clear()
+
+        log.debug(f"Replay of {recording.path} finished after {self.frames_replayed} frames")
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__:s} {self.recording.path:s} frame={self.number:d}, speed={self.speed}, ' \
+               f'running={self.running}>'
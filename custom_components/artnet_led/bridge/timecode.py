@@ -0,0 +1,140 @@
+"""
+Cue lists locked to received ArtTimeCode.
+
+Every cue of a timecode cue list has the timecode it starts at. The lock keeps the list on the cue that is current for
+the received timecode, found by bisecting the sorted cue times, and starts each cue at the moment its timecode passed
+rather than when the packet arrived, so fades run in step with the sender.
+
+Between packets the position is extrapolated from the monotonic clock. Each packet is compared with that estimate:
+an error within ``JUMP_FRAMES`` frames is network jitter or clock drift and only nudges the estimate, anything larger
+(the sound desk was paused, rewound or located elsewhere) is a jump and re-seeks the cue list.
+"""
+import logging
+from bisect import bisect_right
+from time import monotonic
+from typing import Collection
+
+from custom_components.artnet_led.bridge.playback import CueListPlayer
+from custom_components.artnet_led.client import TimeCodeType
+from custom_components.artnet_led.client.packet_view import ArtTimeCodeView
+
+log = logging.getLogger(__name__)
+
+FRAME_RATES = {
+    TimeCodeType.FILM: 24.0,
+    TimeCodeType.EBU: 25.0,
+    TimeCodeType.DF: 30000 / 1001,
+    TimeCodeType.SMPTE: 30.0,
+}
+
+# Errors up to this many frames are smoothed out, larger ones are handled as a jump
+JUMP_FRAMES = 2
+# Share of the error corrected per packet
+DRIFT_GAIN = 0.1
+
+Timecode = tuple[int, int, int, int]
+
+
+def timecode_seconds(timecode: Timecode, timecode_type: TimeCodeType) -> float:
+    """Seconds since 00:00:00:00 of an ``(hours, minutes, seconds, frames)`` timecode."""
+    hours, minutes, seconds, frames = timecode
+    if timecode_type is TimeCodeType.DF:
+        # Drop frame skips frames 0 and 1 of every minute, except every tenth one
+        total_minutes = hours * 60 + minutes
+        frame_number = ((hours * 3600 + minutes * 60 + seconds) * 30 + frames
+                        - 2 * (total_minutes - total_minutes // 10))
+        return frame_number / FRAME_RATES[TimeCodeType.DF]
+    return hours * 3600 + minutes * 60 + seconds + frames / FRAME_RATES[timecode_type]
+
+
+def parse_timecode(value: str) -> Timecode:
+    """``HH:MM:SS:FF``, the frames separator may also be ``;`` or ``.``."""
+    parts = value.replace(";", ":").replace(".", ":").split(":")
+    if len(parts) != 4:
+        raise ValueError(f"Invalid timecode {value}, expected HH:MM:SS:FF")
+    hours, minutes, seconds, frames = map(int, parts)
+    if not (0 <= hours < 24 and 0 <= minutes < 60 and 0 <= seconds < 60 and 0 <= frames < 30):
+        raise ValueError(f"Invalid timecode {value}")
+    return hours, minutes, seconds, frames
+
+
+class TimecodeTimeline:
+    """Cue start times, sorted, per timecode type."""
+
+    def __init__(self, timecodes: Collection[Timecode]):
+        timecodes = list(timecodes)
+        if timecodes != sorted(timecodes):
+            raise ValueError("The cues' timecodes must be in ascending order")
+        self.timecodes = timecodes
+        self.__times: dict[TimeCodeType, list[float]] = {}
+
+    def times(self, timecode_type: TimeCodeType) -> list[float]:
+        times = self.__times.get(timecode_type)
+        if times is None:
+            times = self.__times[timecode_type] = [timecode_seconds(timecode, timecode_type)
+                                                   for timecode in self.timecodes]
+        return times
+
+    def cue_at(self, position: float, timecode_type: TimeCodeType) -> int:
+        """Index of the cue that is current at a position, -1 before the first one."""
+        return bisect_right(self.times(timecode_type), position) - 1
+
+
+class TimecodeLock:
+    def __init__(self, player: CueListPlayer, timecodes: Collection[Timecode]):
+        if player.loop or any(cue.hold is not None for cue in player.cues):
+            raise ValueError(f"Cue list {player.name} follows timecode, it can't loop or hold")
+        self.player = player
+        self.timeline = TimecodeTimeline(timecodes)
+
+        self.timecode_type: TimeCodeType | None = None
+        # Timecode position minus the monotonic clock, None until the first packet
+        self.offset: float | None = None
+        self.jumps = 0
+
+    def position(self, now: float | None = None) -> float | None:
+        if self.offset is None:
+            return None
+        return (monotonic() if now is None else now) + self.offset
+
+    def receive(self, timecode: ArtTimeCodeView):
+        now = monotonic()
+        timecode_type = timecode.type
+        frame_rate = FRAME_RATES[timecode_type]
+        position = timecode_seconds((timecode.hours, timecode.minutes, timecode.seconds, timecode.frames),
+                                    timecode_type)
+
+        jump = self.offset is None or timecode_type is not self.timecode_type
+        if not jump:
+            error = position - (now + self.offset)
+            if abs(error) * frame_rate > JUMP_FRAMES:
+                jump = True
+            else:
+                self.offset += error * DRIFT_GAIN
+
+        if jump:
+            if self.offset is not None:
+                self.jumps += 1
+                log.debug(f"Timecode of cue list {self.player.name} jumped to {timecode.hours:02d}:"
+                          f"{timecode.minutes:02d}:{timecode.seconds:02d}:{timecode.frames:02d}")
+            self.offset = position - now
+            self.timecode_type = timecode_type
+
+        self.__follow(now, jump)
+
+    def __follow(self, now: float, seek: bool):
+        player = self.player
+        index = self.timeline.cue_at(now + self.offset, self.timecode_type)
+        if index < 0:
+            if player.index is not None:
+                player.stop()
+            return
+        if index == player.index and not seek:
+            return
+
+        # The cue started when its timecode passed, which may be up to a frame ago or, after a jump, much longer
+        start_time = self.timeline.times(self.timecode_type)[index] - self.offset
+        player.go(index, start_time=start_time)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__:s} {self.player.name:s} position={self.position()}, jumps={self.jumps:d}>'
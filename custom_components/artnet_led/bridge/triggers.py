@@ -0,0 +1,81 @@
+"""
+ArtTrigger and ArtCommand dispatch straight from the datagram path.
+
+Triggers are looked up by ``(oem, key, sub_key)`` in a dict of actions that were bound at setup, so a button panel
+recalls a snapshot or steps a cue list in the same loop iteration the datagram arrives in, without going through the
+service bus. ArtCommand keys that the server doesn't handle itself (``Snapshot=evening&Go=stage``) are looked up the same
+way by their lower-cased key.
+
+Optionally every trigger is also fired as an ``artnet_led_trigger`` event, at most once per ``EVENT_INTERVAL`` for the
+same configured trigger, so a held or bouncing button can't flood the event bus. Triggers without an action share a
+single interval: any host can send every possible key, and remembering each of them would grow without bound.
+"""
+import logging
+from time import monotonic
+from typing import Callable
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.artnet_led.client import ArtTrigger
+from custom_components.artnet_led.client.packet_view import ArtTriggerView
+
+log = logging.getLogger(__name__)
+
+EVENT_TRIGGER = "artnet_led_trigger"
+EVENT_INTERVAL = 0.1
+
+# OEM code of the triggers whose keys the Art-Net specification defines
+OEM_ANY = 0xFFFF
+
+TriggerKey = tuple[int, int, int]
+
+
+class TriggerTable:
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self.actions: dict[TriggerKey, Callable[[], None]] = {}
+        self.commands: dict[str, Callable[[str], None]] = {}
+        self.fire_events = False
+
+        # Last event per configured trigger, None for all the unhandled ones together
+        self.__last_event: dict[TriggerKey | None, float] = {}
+
+    def add_trigger(self, oem: int, key: int, sub_key: int, action: Callable[[], None]):
+        trigger_key = (oem, key, sub_key)
+        if trigger_key in self.actions:
+            log.warning(f"Trigger {trigger_key} is configured more than once, the last one wins")
+        self.actions[trigger_key] = action
+
+    def add_command(self, key: str, handler: Callable[[str], None]):
+        self.commands[key.lower()] = handler
+
+    def trigger(self, trigger: ArtTrigger | ArtTriggerView):
+        trigger_key = (trigger.oem, trigger.key, trigger.sub_key)
+
+        action = self.actions.get(trigger_key)
+        if action is not None:
+            self.__run(action, trigger_key)
+
+        if self.fire_events:
+            now = monotonic()
+            interval_key = trigger_key if action is not None else None
+            if now - self.__last_event.get(interval_key, -EVENT_INTERVAL) >= EVENT_INTERVAL:
+                self.__last_event[interval_key] = now
+                self._hass.bus.async_fire(EVENT_TRIGGER, {
+                    "oem": trigger.oem, "key": trigger.key, "sub_key": trigger.sub_key, "handled": action is not None
+                })
+
+    def command(self, key: str, value: str):
+        handler = self.commands.get(key)
+        if handler is None:
+            log.debug(f"No handler for ArtCommand {key}={value}")
+            return
+        self.__run(lambda: handler(value), key)
+
+    @staticmethod
+    def __run(action: Callable[[], None], source):
+        try:
+            action()
+        except (HomeAssistantError, LookupError, ValueError) as e:
+            log.warning(f"Action of {source} failed: {e}")
@@ -1,19 +1,73 @@
+from bisect import bisect_left, bisect_right
 from typing import Literal
 
 from pyartnet import BaseUniverse
 
 from custom_components.artnet_led.bridge.channel_bridge import ChannelBridge
+from custom_components.artnet_led.bridge.fade_engine import FadeEngine, NUMPY_AVAILABLE
 
 
 class UniverseBridge(BaseUniverse):
+    def __init__(self, node, universe: int = 0):
+        super().__init__(node, universe)
+
+        # Linear fades of all channels are computed together when NumPy is around
+        self.fade_engine: FadeEngine | None = FadeEngine(self._data) if NUMPY_AVAILABLE else None
+
+        self.__last_frame: bytes | None = None
+
+        # Channels sorted by start, with their 0-based first and last buffer index. Channels can't overlap, so both
+        # index lists are sorted. Rebuilt lazily after channels were added.
+        self.__index_channels: list[ChannelBridge] | None = None
+        self.__index_first: list[int] = []
+        self.__index_last: list[int] = []
+
     def receive_data(self, data: bytearray):
-        channels = self._channels
+        frame = bytes(data)
+        previous = self.__last_frame
+        if frame == previous:
+            return
+        self.__last_frame = frame
+
+        if previous is None or len(previous) != len(frame):
+            low, high = 0, len(frame) - 1
+        else:
+            low, high = self.__changed_range(previous, frame)
+
+        if self.__index_channels is None:
+            self.__build_index()
+
+        channels = self.__index_channels
+        begin = bisect_left(self.__index_last, low)
+        end = bisect_right(self.__index_first, high)
+        for i in range(begin, end):
+            first = self.__index_first[i]
+            last = self.__index_last[i] + 1
+            if previous is not None and frame[first:last] == previous[first:last]:
+                continue
+            channels[i].from_buffer(frame)
+
+    @staticmethod
+    def __changed_range(previous: bytes, frame: bytes) -> tuple[int, int]:
+        """Return the first and last index of the bytes that differ between two equally long frames."""
+        diff = int.from_bytes(previous, 'big') ^ int.from_bytes(frame, 'big')
+        size = len(frame)
+        low = size - (diff.bit_length() + 7) // 8
+        high = size - 1 - ((diff & -diff).bit_length() - 1) // 8
+        return low, high
 
-        for channel in channels.values():
-            channel.from_buffer(data)
+    def __build_index(self):
+        channels = sorted((c for c in self._channels.values() if isinstance(c, ChannelBridge)),
+                          key=lambda c: c._start)
+        self.__index_channels = channels
+        self.__index_first = [c._start - 1 for c in channels]
+        self.__index_last = [c._stop - 1 for c in channels]
 
     def add_channel(self, start: int, width: int, channel_name: str = '', byte_size: int = 1,
                     byte_order: Literal['big', 'little'] = 'big') -> ChannelBridge:
         channel_bridge = ChannelBridge(super().add_channel(start, width, channel_name, byte_size, byte_order))
         self._channels[channel_name] = channel_bridge
+        self.__index_channels = None
+        # Channels added after the last frame still need to pick up its current values
+        self.__last_frame = None
         return channel_bridge
@@ -2,6 +2,7 @@ import datetime
 import logging
 from dataclasses import dataclass, field
 from enum import Enum
+from typing import Union
 
 CLIENT_VERSION = 1
 
@@ -464,7 +465,7 @@ class ArtBase:
             return None
 
         opcode = ArtBase._consume_int_lsb(packet, 8)
-        return OpCode(opcode[0])
+        return OpCode._value2member_map_.get(opcode[0])
 
 
 class ArtPoll(ArtBase):
@@ -526,7 +527,7 @@ class ArtPoll(ArtBase):
     @target_port_bounds.setter
     def target_port_bounds(self, bounds: (PortAddress, PortAddress)):
         self.__target_port_bottom = bounds[0]
-        self.__target_port_top = bounds[0]
+        self.__target_port_top = bounds[1]
         self.__enable_targeted_mode = True
 
     def serialize(self) -> bytearray:
@@ -1185,7 +1186,8 @@ class ArtCommand(ArtBase):
         packet = super().serialize()
         self._append_int_msb(packet, self.protocol_version)
         self._append_int_msb(packet, self.esta)
-        self._append_str(packet, self.command, 512)
+        self._append_int_msb(packet, len(self.command) + 1)
+        self._append_str(packet, self.command, len(self.command) + 1)
         return packet
 
     def deserialize(self, packet: bytearray) -> int:
@@ -1197,7 +1199,8 @@ class ArtCommand(ArtBase):
                 raise SerializationException("Protocol is not 14!")
 
             self.esta, index = self._consume_int_msb(packet, index)
-            self.command, index = self._consume_str(packet, index, 512)
+            command_length, index = self._consume_int_msb(packet, index)
+            self.command, index = self._consume_str(packet, index, command_length)
 
         except SerializationException as e:
             print(e)
@@ -1280,6 +1283,10 @@ class ArtDmx(ArtBase):
         assert len(data) <= 512
         self.data = data
 
+    @property
+    def port_address_raw(self) -> int:
+        return self.port_address.port_address
+
     def serialize(self) -> bytearray:
         packet = super().serialize()
         self._append_int_msb(packet, self.protocol_version)
@@ -1287,8 +1294,8 @@ class ArtDmx(ArtBase):
         packet.append(self.physical)
 
         port_address = self.port_address.port_address
-        packet.append(port_address & 0x0F)
-        packet.append(port_address >> 8 & 0x0F)
+        packet.append(port_address & 0xFF)
+        packet.append(port_address >> 8 & 0x7F)
 
         self._append_int_msb(packet, len(self.data))
         packet.extend(self.data)
@@ -1314,6 +1321,55 @@ class ArtDmx(ArtBase):
         return index
 
 
+class ArtDmxTemplate:
+    """
+    Preallocated ArtDmx packet for a single port address.
+
+    The 18-byte header is serialized once. Every refresh only patches the sequence number in place and copies the
+    payload in with one slice assignment; the length field is only rewritten when the universe changes size.
+    """
+    SEQUENCE_INDEX = 12
+    LENGTH_INDEX = 16
+    HEADER_LENGTH = 18
+
+    def __init__(self,
+                 port_address: PortAddress,
+                 physical: int = 0,
+                 protocol_version: int = PROTOCOL_VERSION
+                 ) -> None:
+        self.port_address = port_address
+        self.__header = bytes(ArtDmx(protocol_version=protocol_version, physical=physical,
+                                     port_address=port_address, data=[]).serialize())
+        assert len(self.__header) == self.HEADER_LENGTH
+
+        self.__packet = bytearray(self.__header)
+        self.__data_length = 0
+
+    @property
+    def packet(self) -> bytearray:
+        return self.__packet
+
+    def update(self, sequence_number: int, data: Union[bytes, bytearray, memoryview]) -> bytearray:
+        data_length = len(data)
+        assert data_length <= 512
+        if data_length != self.__data_length:
+            self.__resize(data_length)
+
+        packet = self.__packet
+        packet[self.SEQUENCE_INDEX] = sequence_number
+        packet[self.HEADER_LENGTH:] = data
+        return packet
+
+    def __resize(self, data_length: int):
+        packet = bytearray(self.HEADER_LENGTH + data_length)
+        packet[:self.HEADER_LENGTH] = self.__header
+        packet[self.LENGTH_INDEX] = data_length >> 8 & 0xFF
+        packet[self.LENGTH_INDEX + 1] = data_length & 0xFF
+
+        self.__packet = packet
+        self.__data_length = data_length
+
+
 class SerializationException(Exception):
 
     def __init__(self, *args: object) -> None:
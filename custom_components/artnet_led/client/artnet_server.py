@@ -5,21 +5,33 @@ import random
 import uuid
 from asyncio import transports, Task
 from dataclasses import dataclass, field
-from socket import socket
-from typing import Any, Union
+from functools import cached_property
+from typing import Any, Callable, Union
 
-from _socket import SO_BROADCAST, AF_INET, SOCK_DGRAM, SOL_SOCKET, IPPROTO_UDP, inet_aton, inet_ntoa
+from _socket import SOL_SOCKET, SO_SNDBUF, inet_aton, inet_ntoa
 from homeassistant.core import HomeAssistant
-from netifaces import AF_INET
 
 from custom_components.artnet_led.client import OpCode, ArtBase, ArtPoll, ArtPollReply, PortAddress, IndicatorState, \
     PortAddressProgrammingAuthority, BootProcess, NodeReport, Port, PortType, StyleCode, FailsafeState, \
-    DiagnosticsMode, DiagnosticsPriority, ArtIpProgReply, ArtDiagData, ArtTimeCode, ArtCommand, ArtTrigger, ArtDmx
+    DiagnosticsMode, DiagnosticsPriority, ArtIpProgReply, ArtDiagData, ArtTimeCode, ArtCommand, ArtTrigger, ArtDmx, \
+    ArtDmxTemplate
 from custom_components.artnet_led.client.net_utils import get_private_ip, get_default_gateway
+from custom_components.artnet_led.client.packet_view import ArtPollView, ArtPollReplyView, ArtDiagDataView, \
+    ArtTimeCodeView, ArtCommandView, ArtTriggerView, ArtDmxView, peek_raw_opcode
+from custom_components.artnet_led.client.port_counters import PortCounters
+from custom_components.artnet_led.client.receive_filter import ReceiveFilter
+from custom_components.artnet_led.client.recorder import FrameRecorder, DIRECTION_IN, DIRECTION_OUT
 
 STALE_NODE_CUTOFF_TIME = 10
 
+# Seconds without ArtDmx on a port before its good input "data received" flag is cleared again
+INPUT_TIMEOUT = 4
+
 ARTNET_PORT = 0x1936
+BROADCAST_ADDRESS = "255.255.255.255"
+
+# Room for a full frame of 512 byte universes towards a dozen nodes without the kernel dropping datagrams
+SEND_BUFFER_SIZE = 1 << 20
 
 RDM_SUPPORT = False  # TODO
 SWITCH_TO_SACN_SUPPORT = False  # TODO
@@ -53,6 +65,10 @@ class Node:
 
         return input_ports.union(output_ports)
 
+    @cached_property
+    def destination(self) -> tuple[str, int]:
+        return inet_ntoa(self.addr), ARTNET_PORT
+
     def __repr__(self) -> str:
         return str(self)
 
@@ -66,25 +82,43 @@ class Node:
         return hash((self.addr, self.bind_index))
 
 
+def _resolve_future(future: asyncio.Future[None]):
+    if not future.done():
+        future.set_result(None)
+
+
 @dataclass
 class OwnPort:
     port: Port = field(default_factory=Port)
     data: bytearray | None = None
-    update_task: Task[None] = None
+    dmx_template: ArtDmxTemplate | None = None
+    sequence_number: int = 0
+    dirty: bool = False
+    changed_at: float = 0.0
+    last_sent: float = 0.0
+    last_input: float = 0.0
+    input_watchdog: asyncio.TimerHandle | None = None
+    receive_filter: ReceiveFilter = field(default_factory=ReceiveFilter)
+    counters: PortCounters = field(default_factory=PortCounters)
 
 
 class ArtNetServer(asyncio.DatagramProtocol):
-    def __init__(self, hass: HomeAssistant, state_update_callback=None, new_node_callback=None,
+    def __init__(self, hass: HomeAssistant, state_update_callback=None, new_node_callback=None, time_code_callback=None,
+                 trigger_callback=None, command_callback=None,
                  firmware_version: int = 0,
                  oem: int = 0, esta=0,
                  short_name: str = "PyArtNet", long_name: str = "Python ArtNet Server",
                  is_server_dhcp_configured: bool = True, polling: bool = True, sequencing: bool = True,
-                 retransmit_time_ms: int = 900):
+                 retransmit_time_ms: int = 900, max_fps: int = 25, bind_address: str = "0.0.0.0",
+                 poll_addresses: list[str] | None = None):
         super().__init__()
 
         self.__hass = hass
         self.__state_update_callback = state_update_callback
         self.__new_node_callback = new_node_callback
+        self.__time_code_callback = time_code_callback
+        self.__trigger_callback = trigger_callback
+        self.__command_callback = command_callback
         self.firmware_version = firmware_version
         self.oem = oem
         self.esta = esta
@@ -93,16 +127,22 @@ class ArtNetServer(asyncio.DatagramProtocol):
         self.dhcp_configured = is_server_dhcp_configured
         self._polling = polling
         self._sequencing = sequencing
-        self.sequence_number = 1 if sequencing else 0
         self.retransmit_time_ms = retransmit_time_ms
+        self.max_fps = max_fps
+        self.bind_address = bind_address
+        # Unicast polling reaches nodes that broadcasts don't, e.g. simulated ones on loopback
+        self.poll_addresses = poll_addresses or [BROADCAST_ADDRESS]
 
         self.own_port_addresses = {}
+        # The same ports by their 15 bit port address, so received ArtDmx is matched without building a PortAddress
+        self.__own_ports_by_raw: dict[int, tuple[PortAddress, OwnPort]] = {}
+        self.recorder: FrameRecorder | None = None
         self.node_change_subscribers = set()
 
         self.nodes_by_ip = {}
         self.nodes_by_port_address = {}
 
-        self._own_ip = inet_aton(get_private_ip())
+        self._own_ip = inet_aton(get_private_ip() if bind_address == "0.0.0.0" else bind_address)
         self._default_gateway = inet_aton(get_default_gateway())
 
         self.indicator_state = IndicatorState.LOCATE_IDENTIFY
@@ -114,8 +154,31 @@ class ArtNetServer(asyncio.DatagramProtocol):
 
         self.startup_time = None
 
+        self._transport: transports.DatagramTransport | None = None
+        self.tx_packets = 0
+        self.tx_bytes = 0
+        self.tx_errors = 0
+        self.tx_errors_by_destination: dict[str, int] = {}
+
         self.mac = uuid.getnode().to_bytes(6, "big")
 
+        self.__output_task: Task[None] | None = None
+        self.__output_wakeup: asyncio.Future[None] | None = None
+
+        # Opcodes missing from this table (ArtSync, ArtAddress, ArtIpProg, ArtNzs, vendor specific traffic, ...) as
+        # well as anything that isn't Art-Net at all only bump the drop counter.
+        self.dropped_datagrams = 0
+        self.__datagram_handlers: dict[int, Callable[[tuple[str | Any, int], memoryview], None]] = {
+            OpCode.OP_POLL.value: self.__on_poll,
+            OpCode.OP_POLL_REPLY.value: self.__on_poll_reply,
+            OpCode.OP_IP_PROG_REPLY.value: self.__on_ip_prog_reply,
+            OpCode.OP_DIAG_DATA.value: self.__on_diag_data,
+            OpCode.OP_TIME_CODE.value: self.__on_time_code,
+            OpCode.OP_COMMAND.value: self.__on_command,
+            OpCode.OP_TRIGGER.value: self.__on_trigger,
+            OpCode.OP_OUTPUT_DMX.value: self.__on_dmx,
+        }
+
     def uptime(self) -> int:
         return (datetime.datetime.now() - self.startup_time).seconds if self.startup_time else 0
 
@@ -123,11 +186,17 @@ class ArtNetServer(asyncio.DatagramProtocol):
         port = Port(input=True, output=True, type=PortType.ART_NET,
                     sw_in=port_address.universe, sw_out=port_address.universe)
 
-        self.own_port_addresses[port_address] = OwnPort(port)
+        own_port = self.own_port_addresses[port_address] = OwnPort(port, dmx_template=ArtDmxTemplate(
+            port_address, physical=HA_PHYSICAL_PORT
+        ), sequence_number=1 if self._sequencing else 0)
+        self.__own_ports_by_raw[port_address.port_address] = (port_address, own_port)
         self.update_subscribers()
 
     def remove_port(self, port_address: PortAddress):
-        del self.own_port_addresses[port_address]
+        own_port = self.own_port_addresses.pop(port_address)
+        del self.__own_ports_by_raw[port_address.port_address]
+        if own_port.input_watchdog:
+            own_port.input_watchdog.cancel()
         self.update_subscribers()
 
     def get_port_bounds(self) -> Union[tuple[PortAddress, PortAddress], None]:
@@ -181,6 +250,35 @@ class ArtNetServer(asyncio.DatagramProtocol):
         for subscriber in self.node_change_subscribers:
             self.send_reply(subscriber)
 
+    def get_receive_filter_counters(self) -> dict[PortAddress, dict[str, int]]:
+        return {address: own_port.receive_filter.counters() for address, own_port in self.own_port_addresses.items()}
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        now = self.__hass.loop.time()
+        ports = {
+            str(address): {
+                "nodes": len(self.get_node_by_port_address(address) or ()),
+                **own_port.counters.as_dict(now),
+                "receive_filter": own_port.receive_filter.counters(),
+            }
+            for address, own_port in self.own_port_addresses.items()
+        }
+        return {
+            "bind_address": self.bind_address,
+            "poll_addresses": self.poll_addresses,
+            "max_fps": self.max_fps,
+            "uptime": self.uptime(),
+            "nodes": sorted({str(node) for node in self.nodes_by_ip.values()}),
+            "tx_packets": self.tx_packets,
+            "tx_bytes": self.tx_bytes,
+            "tx_errors": self.tx_errors,
+            "tx_errors_by_destination": dict(self.tx_errors_by_destination),
+            "dropped_datagrams": self.dropped_datagrams,
+            "packets_per_second": sum(port["packets_per_second"] for port in ports.values()),
+            "bytes_per_second": sum(port["bytes_per_second"] for port in ports.values()),
+            "ports": ports,
+        }
+
     def get_grouped_ports(self) -> [(int, int, [[Port]])]:
         # Sort the ports by their net and subnet
         net_sub = set(map(lambda p: (p.net, p.sub_net), self.own_port_addresses))
@@ -207,7 +305,8 @@ class ArtNetServer(asyncio.DatagramProtocol):
 
     def start_server(self):
         loop = self.__hass.loop
-        server_event = loop.create_datagram_endpoint(lambda: self, local_addr=('0.0.0.0', ARTNET_PORT))
+        server_event = loop.create_datagram_endpoint(lambda: self, local_addr=(self.bind_address, ARTNET_PORT),
+                                                     allow_broadcast=True)
 
         if self._polling:
             self.__hass.async_create_background_task(self.start_poll_loop(), "Art-Net polling loop")
@@ -225,10 +324,9 @@ class ArtNetServer(asyncio.DatagramProtocol):
                 poll.enable_diagnostics(DiagnosticsMode.UNICAST, DiagnosticsPriority.DP_HIGH)
 
                 log.debug("Sending ArtPoll")
-                with socket(AF_INET, SOCK_DGRAM, IPPROTO_UDP) as sock:
-                    sock.setsockopt(SOL_SOCKET, SO_BROADCAST, 1)
-                    sock.setblocking(False)
-                    sock.sendto(poll.serialize(), ("255.255.255.255", 0x1936))
+                packet = poll.serialize()
+                for poll_address in self.poll_addresses:
+                    self.send_packet(packet, (poll_address, ARTNET_PORT))
 
                 self.__hass.async_create_background_task(self.remove_stale_nodes(), "Art-Net remove stale nodes")
 
@@ -258,16 +356,40 @@ class ArtNetServer(asyncio.DatagramProtocol):
         for (ip, bind_index) in nodes_by_ip_to_delete:
             del self.nodes_by_ip[(ip, bind_index)]
 
-    @staticmethod
-    def send_artnet(art_packet: ArtBase, ip: str):
-        with socket(AF_INET, SOCK_DGRAM, IPPROTO_UDP) as sock:
-            sock.setblocking(False)
-            sock.sendto(art_packet.serialize(), (ip, ARTNET_PORT))
+    def send_artnet(self, art_packet: ArtBase, ip: str):
+        self.send_packet(art_packet.serialize(), (ip, ARTNET_PORT))
+
+    def send_packet(self, packet: bytes | bytearray | memoryview, destination: tuple[str, int]) -> bool:
+        transport = self._transport
+        if transport is None or transport.is_closing():
+            log.debug(f"Can't send to {destination[0]} yet, the server socket isn't open.")
+            self.tx_errors += 1
+            return False
+
+        try:
+            transport.sendto(packet, destination)
+        except OSError as e:
+            self.__count_tx_error(destination, e)
+            return False
+
+        self.tx_packets += 1
+        self.tx_bytes += len(packet)
+        return True
+
+    def __count_tx_error(self, destination: tuple[str, int], error: OSError):
+        self.tx_errors += 1
+        ip = destination[0]
+        error_count = self.tx_errors_by_destination.get(ip, 0) + 1
+        self.tx_errors_by_destination[ip] = error_count
+        if error_count == 1:
+            log.warning(f"Failed sending to {ip}: {error}")
+        else:
+            log.debug(f"Failed sending to {ip} ({error_count} times so far): {error}")
 
     def send_diagnostics(self, addr: str = None, diagnostics_priority=DiagnosticsPriority.DP_MED,
                          diagnostics_mode=DiagnosticsMode.BROADCAST):
         diag_data = ArtDiagData(diag_priority=diagnostics_priority, logical_port=0, text=self.status_message)
-        address = addr if diagnostics_mode == DiagnosticsMode.UNICAST else bytes("255.255.255.255")
+        address = addr if diagnostics_mode == DiagnosticsMode.UNICAST else BROADCAST_ADDRESS
         self.send_artnet(diag_data, address)
 
     def send_reply(self, addr):
@@ -302,12 +424,13 @@ class ArtNetServer(asyncio.DatagramProtocol):
                 if bind_index != 0:
                     bind_index += 1
 
-    def send_dmx(self, address: PortAddress, data: bytearray) -> Task[None] | None:
+    def send_dmx(self, address: PortAddress, data: bytearray):
         if not self.get_node_by_port_address(address):
             if self.uptime() < 3:
                 log.debug("Can't currently send DMX as nodes haven't had the chance to be discovered.")
                 return
 
+            self.own_port_addresses[address].counters.dropped += 1
             if len(self.nodes_by_port_address) == 0:
                 log.error("The server hasn't received replies from any node at all. We don't know where we can "
                           "send the DMX data to. If this message persists, consider using direct mode instead of "
@@ -318,146 +441,215 @@ class ArtNetServer(asyncio.DatagramProtocol):
             return
 
         own_port = self.own_port_addresses[address]
-        if own_port.update_task:
-            own_port.update_task.cancel()
+        own_port.data = data
+        if not own_port.dirty:
+            own_port.changed_at = self.__hass.loop.time()
+            own_port.dirty = True
 
         is_already_outputting = own_port.port.good_output_a.data_being_transmitted
         if not is_already_outputting:
             own_port.port.good_output_a.data_being_transmitted = True
             self.update_subscribers()
 
-        task = self.__hass.async_create_task(self.start_artdmx_loop(address, data, own_port))
-        own_port.update_task = task
-        return task
-
-    async def start_artdmx_loop(self, address, data, own_port):
-        own_port.data = data
-        art_dmx = ArtDmx(sequence_number=self.sequence_number, physical=HA_PHYSICAL_PORT, port_address=address,
-                         data=data)
-        packet = art_dmx.serialize()
-
-        while True:
-            nodes = self.get_node_by_port_address(address)
-            if not nodes:
+        self.__wake_output_loop()
+
+    def __wake_output_loop(self):
+        if self.__output_task is None:
+            self.__output_task = self.__hass.async_create_background_task(
+                self.__output_loop(), "Art-Net output scheduler"
+            )
+        elif self.__output_wakeup is not None and not self.__output_wakeup.done():
+            self.__output_wakeup.set_result(None)
+
+    async def __output_loop(self):
+        """
+        Single clock for all ArtDmx output. Ports are only marked dirty by send_dmx; every tick flushes all dirty
+        ports at once, at most max_fps times per second. In between, the loop sleeps until either a port is marked
+        dirty or the next keep-alive refresh is due. With refreshes turned off it ends after a frame without changes.
+        """
+        loop = self.__hass.loop
+        frame_interval = 1.0 / max(1, self.max_fps)
+        refresh_interval = self.retransmit_time_ms / 1000.0
+
+        try:
+            while True:
+                now = loop.time()
+                next_refresh = None
+                for address, own_port in self.own_port_addresses.items():
+                    if own_port.data is None:
+                        continue
+
+                    if own_port.dirty or (refresh_interval and own_port.last_sent + refresh_interval <= now):
+                        self.__flush_port(address, own_port, now, frame_interval)
+
+                    if refresh_interval and own_port.port.good_output_a.data_being_transmitted:
+                        port_refresh = own_port.last_sent + refresh_interval
+                        if next_refresh is None or port_refresh < next_refresh:
+                            next_refresh = port_refresh
+
+                # Without keep-alive refreshes the loop waits one frame for new changes, so a fade keeps being paced
+                # by it; it only ends once a whole frame went by without any
+                idle = next_refresh is None
+                wakeup = self.__output_wakeup = loop.create_future()
+                refresh_handle = loop.call_at(now + frame_interval if idle else next_refresh, _resolve_future, wakeup)
+                try:
+                    await wakeup
+                finally:
+                    refresh_handle.cancel()
+                    self.__output_wakeup = None
+
+                if idle and not any(own_port.dirty for own_port in self.own_port_addresses.values()):
+                    return
+
+                # Dirty ports never get flushed faster than max_fps
+                delay = now + frame_interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        finally:
+            self.__output_task = None
+
+    def __flush_port(self, address: PortAddress, own_port: OwnPort, now: float, frame_interval: float):
+        changed = own_port.dirty
+        own_port.dirty = False
+
+        nodes = self.get_node_by_port_address(address)
+        if not nodes:
+            if changed:
+                own_port.counters.dropped += 1
+            if own_port.port.good_output_a.data_being_transmitted:
                 log.warning(f"No nodes found that listen to port address {address}. "
                             f"Stopping sending ArtDmx refreshes...")
                 own_port.port.good_output_a.data_being_transmitted = False
                 self.update_subscribers()
-            else:
-                with socket(AF_INET, SOCK_DGRAM, IPPROTO_UDP) as sock:
-                    sock.setblocking(False)
-                    for node in nodes:
-                        ip_str = inet_ntoa(node.addr)
-                        log.debug(f"Sending ArtDmx to {ip_str}")
-                        sock.sendto(packet, (ip_str, ARTNET_PORT))
-
-            if self._sequencing:
-                self.sequence_number += 0x01
-                if self.sequence_number > 0xFF:
-                    self.sequence_number = 0x01
-                art_dmx.sequence_number = self.sequence_number
-                packet = art_dmx.serialize()
-
-            if self.retransmit_time_ms == 0:
-                return
+            return
+
+        packet = own_port.dmx_template.update(own_port.sequence_number, own_port.data)
+        for node in nodes:
+            self.send_packet(packet, node.destination)
+        own_port.counters.sent(now, len(nodes), len(packet), own_port.changed_at if changed else None,
+                               own_port.last_sent, frame_interval)
+        own_port.last_sent = now
+
+        if self.recorder is not None:
+            self.recorder.record(DIRECTION_OUT, address.port_address, own_port.sequence_number, own_port.data, now)
 
-            await asyncio.sleep(self.retransmit_time_ms / 1000.0)
+        if self._sequencing:
+            own_port.sequence_number += 0x01
+            if own_port.sequence_number > 0xFF:
+                own_port.sequence_number = 0x01
 
     def connection_made(self, transport: transports.DatagramTransport) -> None:
         self.startup_time = datetime.datetime.now()
         log.debug("Server connection made")
         super().connection_made(transport)
 
+        self._transport = transport
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            try:
+                sock.setsockopt(SOL_SOCKET, SO_SNDBUF, SEND_BUFFER_SIZE)
+            except OSError as e:
+                log.warning(f"Couldn't resize the send buffer of the server socket: {e}")
+
     def connection_lost(self, exc: Exception | None) -> None:
+        self._transport = None
         super().connection_lost(exc)
 
+    def error_received(self, exc: Exception) -> None:
+        log.debug(f"Socket error on the server socket: {exc}")
+        self.tx_errors += 1
+
     def datagram_received(self, data: bytes, addr: tuple[str | Any, int]) -> None:
         self.handle_datagram(addr, data)
 
     def handle_datagram(self, addr, data):
-        data = bytearray(data)
-        opcode = ArtBase.peek_opcode(data)
-        if opcode == OpCode.OP_POLL:
-            poll = ArtPoll()
-            poll.deserialize(data)
-
-            log.debug(f"Received ArtPoll from {addr[0]}")
-            self.handle_poll(addr, poll)
+        data = memoryview(data)
+        handler = self.__datagram_handlers.get(peek_raw_opcode(data))
+        if handler is None:
+            self.dropped_datagrams += 1
+            return
+        handler(addr, data)
 
-        elif opcode == OpCode.OP_POLL_REPLY:
-            reply = ArtPollReply()
-            reply.deserialize(data)
+    def __on_poll(self, addr, data: memoryview):
+        poll = ArtPollView.decode(data)
+        if poll is None:
+            log.debug(f"Received truncated ArtPoll from {addr[0]}")
+            return
 
-            log.debug(f"Received ArtPollReply from {reply.long_name}")
-            self.handle_poll_reply(addr, reply)
+        log.debug(f"Received ArtPoll from {addr[0]}")
+        self.handle_poll(addr, poll)
 
-        elif opcode == OpCode.OP_IP_PROG:
-            log.debug(f"Received IP prog request from {addr[0]}, ignoring...")
+    def __on_poll_reply(self, addr, data: memoryview):
+        reply = ArtPollReplyView.decode(data)
+        if reply is None:
+            log.debug(f"Received truncated ArtPollReply from {addr[0]}")
+            return
 
-        elif opcode == OpCode.OP_IP_PROG_REPLY:
-            ip_prog_reply = ArtIpProgReply()
-            ip_prog_reply.deserialize(data)
+        log.debug(f"Received ArtPollReply from {reply.long_name}")
+        self.handle_poll_reply(addr, reply)
 
-            log.debug(f"Received IP prog reply from {addr[0]}:\n"
-                      f"  IP      : {ip_prog_reply.prog_ip}\n"
-                      f"  Subnet  : {ip_prog_reply.prog_subnet}\n"
-                      f"  Gateway : {ip_prog_reply.prog_gateway}\n"
-                      f"  DHCP    : {ip_prog_reply.dhcp_enabled}")
-            #                 TODO set port.good_input.data_received
+    def __on_ip_prog_reply(self, addr, data: memoryview):
+        ip_prog_reply = ArtIpProgReply()
+        ip_prog_reply.deserialize(bytearray(data))
 
-        elif opcode == OpCode.OP_ADDRESS:
-            log.debug(f"Received Adress request from {addr[0]}, not doing anything with it...")
+        log.debug(f"Received IP prog reply from {addr[0]}:\n"
+                  f"  IP      : {ip_prog_reply.prog_ip}\n"
+                  f"  Subnet  : {ip_prog_reply.prog_subnet}\n"
+                  f"  Gateway : {ip_prog_reply.prog_gateway}\n"
+                  f"  DHCP    : {ip_prog_reply.dhcp_enabled}")
+        #                 TODO set port.good_input.data_received
 
-        elif opcode == OpCode.OP_DIAG_DATA:
-            diag_data = ArtDiagData()
-            diag_data.deserialize(data)
+    def __on_diag_data(self, addr, data: memoryview):
+        diag_data = ArtDiagDataView.decode(data)
+        if diag_data is None:
+            return
 
-            log.debug(f"Received Diag Data from {addr[0]}:\n"
-                      f"  Priority     : {diag_data.diag_priority}\n"
-                      f"  Logical port : {diag_data.logical_port}\n"
-                      f"  Text         : {diag_data.text}")
+        log.debug(f"Received Diag Data from {addr[0]}:\n"
+                  f"  Priority     : {diag_data.diag_priority}\n"
+                  f"  Logical port : {diag_data.logical_port}\n"
+                  f"  Text         : {diag_data.text}")
 
-        elif opcode == OpCode.OP_TIME_CODE:
-            timecode = ArtTimeCode()
-            timecode.deserialize(data)
+    def __on_time_code(self, addr, data: memoryview):
+        timecode = ArtTimeCodeView.decode(data)
+        if timecode is None:
+            return
 
-            log.debug(f"Received Time Code from {addr[0]}:\n"
-                      f"  Current time/frame : {timecode.hours}:{timecode.minutes}:{timecode.seconds}.{timecode.frames}\n"
-                      f"  Type               : {timecode.type}")
+        log.debug(f"Received Time Code from {addr[0]}:\n"
+                  f"  Current time/frame : {timecode.hours}:{timecode.minutes}:{timecode.seconds}.{timecode.frames}\n"
+                  f"  Type               : {timecode.type}")
+        self.handle_time_code(timecode)
 
-        elif opcode == OpCode.OP_COMMAND:
-            command = ArtCommand()
-            command.deserialize(data)
+    def __on_command(self, addr, data: memoryview):
+        command = ArtCommandView.decode(data)
+        if command is None:
+            return
 
-            log.debug(f"Received command from {addr[0]}\n"
-                      f"  ESTA    : {command.esta}\n"
-                      f"  Command : {command.command}")
-            self.handle_command(command)
+        log.debug(f"Received command from {addr[0]}\n"
+                  f"  ESTA    : {command.esta}\n"
+                  f"  Command : {command.command}")
+        self.handle_command(command)
 
-        elif opcode == OpCode.OP_TRIGGER:
-            trigger = ArtTrigger()
-            trigger.deserialize(data)
+    def __on_trigger(self, addr, data: memoryview):
+        trigger = ArtTriggerView.decode(data)
+        if trigger is None:
+            return
 
-            log.debug(f"Received trigger from {addr[0]}\n"
-                      f"  OEM    : {trigger.oem}\n"
-                      f"  Key    : {trigger.key}\n"
-                      f"  Subkey : {trigger.sub_key}")
-            self.handle_trigger(trigger)
+        log.debug(f"Received trigger from {addr[0]}\n"
+                  f"  OEM    : {trigger.oem}\n"
+                  f"  Key    : {trigger.key}\n"
+                  f"  Subkey : {trigger.sub_key}")
+        self.handle_trigger(trigger)
 
-        elif opcode == OpCode.OP_OUTPUT_DMX:
-            dmx = ArtDmx()
-            dmx.deserialize(data)
+    def __on_dmx(self, addr, data: memoryview):
+        dmx = ArtDmxView.decode(data)
+        if dmx is None:
+            self.dropped_datagrams += 1
+            return
 
+        if log.isEnabledFor(logging.DEBUG):
             log.debug(f"Received DMX data from {addr[0]}\n"
                       f"  Address: {dmx.port_address}")
-            self.handle_dmx(dmx)
-
-        elif opcode == OpCode.OP_SYNC:
-            # No action
-            pass
-
-        else:
-            log.warning(f"Received Opcode {opcode}, which isn't supported yet!")
+        self.handle_dmx(addr, dmx)
 
     def should_handle_ports(self, lower_port: PortAddress, upper_port: PortAddress) -> bool:
         if not self.own_port_addresses:
@@ -529,7 +721,7 @@ class ArtNetServer(asyncio.DatagramProtocol):
                 if self.indicator_state == IndicatorState.LOCATE_IDENTIFY:
                     self.indicator_state = IndicatorState.MUTE_MODE
 
-    def handle_poll(self, addr: tuple[str | Any, int], poll: ArtPoll):
+    def handle_poll(self, addr: tuple[str | Any, int], poll: ArtPoll | ArtPollView):
         if inet_aton(addr[0]) == self._own_ip:
             log.debug("Ignoring ArtPoll as it came from ourselves")
             return
@@ -547,13 +739,17 @@ class ArtNetServer(asyncio.DatagramProtocol):
             self.send_diagnostics(addr=addr[0], diagnostics_mode=DiagnosticsMode.UNICAST,
                                   diagnostics_priority=poll.diagnostics_priority)
 
-    def handle_command(self, command: ArtCommand):
+    def handle_command(self, command: ArtCommand | ArtCommandView):
         if command.esta == 0xFFFF:
             commands = command.command.split("&")
             for c in commands:
                 c = c.strip(' ')
                 if c:
-                    key, value = c.split('=')
+                    # Fields come from anyone on the network; one without a value is skipped rather than trusted
+                    key, sep, value = c.partition('=')
+                    if not sep:
+                        log.debug(f"Ignoring ArtCommand field without a value: {c}")
+                        continue
                     key = key.lower()
                     if key == 'SwoutText'.lower():
                         self.swout_text = value
@@ -561,39 +757,58 @@ class ArtNetServer(asyncio.DatagramProtocol):
                     elif key == 'SwinText'.lower():
                         self.swin_text = value
                         log.debug(f"Set Sw in text to: {value}")
-        # TODO check if it would be cool to add HA specific commands?
-
-    def handle_trigger(self, trigger):
-        # TODO possible integrations here
-        #  0: ASCII inputs into HA?
-        #  1: Define and activate Macro's
-        #  2: Key press inputs into HA?
-        #  3: Scenes!
-        pass
-
-    def handle_dmx(self, dmx: ArtDmx):
-        own_port = self.own_port_addresses.get(dmx.port_address)
-        if not own_port:
+                    elif self.__command_callback:
+                        self.__command_callback(key, value)
+
+    def handle_time_code(self, timecode: ArtTimeCode | ArtTimeCodeView):
+        if self.__time_code_callback:
+            self.__time_code_callback(timecode)
+
+    def handle_trigger(self, trigger: ArtTrigger | ArtTriggerView):
+        if self.__trigger_callback:
+            self.__trigger_callback(trigger)
+
+    def handle_dmx(self, addr: tuple[str | Any, int], dmx: ArtDmx | ArtDmxView):
+        port_address_raw = dmx.port_address_raw
+        own = self.__own_ports_by_raw.get(port_address_raw)
+        if own is None:
             log.debug(f"Received ArtDmx for port address that we don't care about: {dmx.port_address}")
             return
+        port_address, own_port = own
+
+        loop = self.__hass.loop
+        own_port.last_input = loop.time()
+        own_port.port.last_input_seen = datetime.datetime.now()
 
-        if own_port.port.good_input.data_received:
+        if not own_port.port.good_input.data_received:
             own_port.port.good_input.data_received = True
             self.update_subscribers()
 
-        own_port.port.last_input_seen = datetime.datetime.now()
-        self.__hass.async_create_task(self.disable_input_flag(own_port))
-        if self.__state_update_callback:
-            self.__state_update_callback(dmx.port_address, dmx.data)
+        # A single timer per port; incoming frames only move last_input forward and the timer re-arms itself lazily.
+        if own_port.input_watchdog is None:
+            own_port.input_watchdog = loop.call_at(own_port.last_input + INPUT_TIMEOUT,
+                                                   self.__input_watchdog_expired, own_port)
+
+        if self.recorder is not None:
+            self.recorder.record(DIRECTION_IN, port_address_raw, dmx.sequence_number, dmx.data,
+                                 own_port.last_input)
 
-    async def disable_input_flag(self, own_port: OwnPort):
-        await asyncio.sleep(4)
+        if not own_port.receive_filter.accept(addr, dmx, own_port.last_input):
+            return
 
-        cutoff_time = datetime.datetime.now() - datetime.timedelta(seconds=4)
+        if self.__state_update_callback:
+            self.__state_update_callback(port_address, dmx.data)
 
-        if own_port.port.last_input_seen < cutoff_time:
-            own_port.port.good_input.data_received = False
-            self.update_subscribers()
+    def __input_watchdog_expired(self, own_port: OwnPort):
+        loop = self.__hass.loop
+        deadline = own_port.last_input + INPUT_TIMEOUT
+        if deadline > loop.time():
+            own_port.input_watchdog = loop.call_at(deadline, self.__input_watchdog_expired, own_port)
+            return
+
+        own_port.input_watchdog = None
+        own_port.port.good_input.data_received = False
+        self.update_subscribers()
 
 # server = ArtNetServer(firmware_version=1, short_name="Test python", long_name="Hello I am testing ArtNet server",
 #                       polling=True)
@@ -0,0 +1,312 @@
+"""
+Read-only views over received Art-Net datagrams.
+
+Every view is decoded straight from a ``memoryview`` of the datagram with a precompiled ``struct.Struct`` layout.
+Fixed fields are unpacked eagerly, payloads stay zero-copy slices of the datagram and anything that needs an
+allocation (strings, enums, port lists) is only decoded when the attribute is accessed.
+
+The attribute names mirror the mutable packet classes in ``artnet_led.client``, so handlers accept either.
+"""
+import struct
+from typing import NamedTuple, Union
+
+from custom_components.artnet_led.client import PortAddress, DiagnosticsMode, DiagnosticsPriority, Port, \
+    IndicatorState, PortAddressProgrammingAuthority, BootProcess, FailsafeState, TimeCodeType
+
+HEADER_LENGTH = 10
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+_HEADER = struct.Struct("<QH")
+_ART_NET_ID = int.from_bytes(b"Art-Net\0", "little")
+
+_ART_POLL = struct.Struct(">HBB")
+_ART_POLL_TARGETS = struct.Struct(">HH")
+_ART_POLL_REPLY = struct.Struct(">4sHHBBHBBH18s64s64sH4s4s4s4s4sBBB3xB6s4sBB")
+_ART_POLL_REPLY_TAIL = struct.Struct(">4sB6s")
+_ART_DIAG_DATA = struct.Struct(">HxBBxH")
+_ART_COMMAND = struct.Struct(">HHH")
+_ART_TIME_CODE = struct.Struct(">H2xBBBBB")
+_ART_TRIGGER = struct.Struct(">H2xHBB")
+_ART_DMX = struct.Struct(">HBBBBH")
+
+ART_POLL_REPLY_TAIL_OFFSET = HEADER_LENGTH + _ART_POLL_REPLY.size
+ART_DMX_DATA_OFFSET = HEADER_LENGTH + _ART_DMX.size
+
+
+def peek_raw_opcode(packet: Buffer) -> int | None:
+    """Return the raw 16-bit opcode, or None if the packet doesn't start with a valid Art-Net header."""
+    if len(packet) < HEADER_LENGTH:
+        return None
+    art_net_id, opcode = _HEADER.unpack_from(packet)
+    if art_net_id != _ART_NET_ID:
+        return None
+    return opcode
+
+
+def _c_string(raw: Buffer) -> str:
+    return bytes(raw).split(b'\0', 1)[0].decode("ASCII", errors="replace")
+
+
+def _swap16(value: int) -> int:
+    return (value & 0xFF) << 8 | value >> 8
+
+
+class ArtPollView(NamedTuple):
+    protocol_version: int
+    flags: int
+    diag_priority: int
+    target_port_top: int = 0x7FFF
+    target_port_bottom: int = 0
+
+    @classmethod
+    def decode(cls, packet: memoryview) -> Union["ArtPollView", None]:
+        if len(packet) < HEADER_LENGTH + _ART_POLL.size:
+            return None
+        fields = _ART_POLL.unpack_from(packet, HEADER_LENGTH)
+        if len(packet) < HEADER_LENGTH + _ART_POLL.size + _ART_POLL_TARGETS.size:
+            return cls(*fields)
+        return cls(*fields, *_ART_POLL_TARGETS.unpack_from(packet, HEADER_LENGTH + _ART_POLL.size))
+
+    @property
+    def targeted_mode_enabled(self) -> bool:
+        return bool(self.flags >> 5 & 1)
+
+    @property
+    def vlc_transmission_enabled(self) -> bool:
+        return bool(self.flags >> 4 & 1)
+
+    @property
+    def diagnostics_mode(self) -> DiagnosticsMode:
+        return DiagnosticsMode(bool(self.flags >> 3 & 1))
+
+    @property
+    def is_diagnostics_enabled(self) -> bool:
+        return bool(self.flags >> 2 & 1)
+
+    @property
+    def notify_on_change(self) -> bool:
+        return bool(self.flags >> 1 & 1)
+
+    @property
+    def diagnostics_priority(self) -> DiagnosticsPriority:
+        return DiagnosticsPriority._value2member_map_.get(self.diag_priority, DiagnosticsPriority.DP_UNKNOWN)
+
+    @property
+    def target_port_bounds(self) -> (PortAddress, PortAddress):
+        return PortAddress.parse(self.target_port_bottom), PortAddress.parse(self.target_port_top)
+
+
+class ArtPollReplyView(NamedTuple):
+    source_ip: bytes
+    port_le: int
+    firmware_version: int
+    net_switch: int
+    sub_switch: int
+    oem: int
+    ubea: int
+    status1: int
+    esta_le: int
+    short_name_raw: bytes
+    long_name_raw: bytes
+    node_report_raw: bytes
+    port_count: int
+    port_type_flags: bytes
+    good_input_flags: bytes
+    good_output_a_flags: bytes
+    sw_ins: bytes
+    sw_outs: bytes
+    acn_priority: int
+    sw_macro_bitmap: int
+    sw_remote_bitmap: int
+    style: int
+    mac_address: bytes
+    bind_ip: bytes
+    bind_index: int
+    status2: int
+    good_output_b_flags: bytes = bytes(4)
+    status3: int = 0
+    default_resp_uid: bytes = bytes(6)
+
+    @classmethod
+    def decode(cls, packet: memoryview) -> Union["ArtPollReplyView", None]:
+        if len(packet) < ART_POLL_REPLY_TAIL_OFFSET:
+            return None
+        fields = _ART_POLL_REPLY.unpack_from(packet, HEADER_LENGTH)
+        if len(packet) < ART_POLL_REPLY_TAIL_OFFSET + _ART_POLL_REPLY_TAIL.size:
+            return cls(*fields)
+        return cls(*fields, *_ART_POLL_REPLY_TAIL.unpack_from(packet, ART_POLL_REPLY_TAIL_OFFSET))
+
+    @property
+    def port(self) -> int:
+        return _swap16(self.port_le)
+
+    @property
+    def esta(self) -> int:
+        return _swap16(self.esta_le)
+
+    @property
+    def short_name(self) -> str:
+        return _c_string(self.short_name_raw)
+
+    @property
+    def long_name(self) -> str:
+        return _c_string(self.long_name_raw)
+
+    @property
+    def node_report(self) -> str:
+        return _c_string(self.node_report_raw)
+
+    @property
+    def indicator_state(self) -> IndicatorState:
+        return IndicatorState(self.status1 >> 6 & 3)
+
+    @property
+    def port_address_programming_authority(self) -> PortAddressProgrammingAuthority:
+        return PortAddressProgrammingAuthority._value2member_map_.get(
+            self.status1 >> 4 & 3, PortAddressProgrammingAuthority.UNKNOWN
+        )
+
+    @property
+    def boot_process(self) -> BootProcess:
+        return BootProcess(bool(self.status1 >> 2 & 1))
+
+    @property
+    def supports_rdm(self) -> bool:
+        return bool(self.status1 >> 1 & 1)
+
+    @property
+    def supports_web_browser_configuration(self) -> bool:
+        return bool(self.status2 & 1)
+
+    @property
+    def dhcp_configured(self) -> bool:
+        return bool(self.status2 >> 1 & 1)
+
+    @property
+    def dhcp_capable(self) -> bool:
+        return bool(self.status2 >> 2 & 1)
+
+    @property
+    def supports_15_bit_port_address(self) -> bool:
+        return bool(self.status2 >> 3 & 1)
+
+    @property
+    def failsafe_state(self) -> FailsafeState:
+        return FailsafeState(self.status3 >> 6)
+
+    @property
+    def ports(self) -> list[Port]:
+        ports = []
+        for i in range(min(self.port_count, 4)):
+            port = Port()
+            port.port_types_flags = self.port_type_flags[i]
+            port.good_input.flags = self.good_input_flags[i]
+            port.good_output_a.flags = self.good_output_a_flags[i]
+            port.sw_in = self.sw_ins[i]
+            port.sw_out = self.sw_outs[i]
+            port.good_output_b = self.good_output_b_flags[i]
+            ports.append(port)
+        return ports
+
+
+class ArtDiagDataView(NamedTuple):
+    protocol_version: int
+    diag_priority_raw: int
+    logical_port: int
+    length: int
+    text_raw: memoryview
+
+    @classmethod
+    def decode(cls, packet: memoryview) -> Union["ArtDiagDataView", None]:
+        offset = HEADER_LENGTH + _ART_DIAG_DATA.size
+        if len(packet) < offset:
+            return None
+        protocol_version, diag_priority, logical_port, length = _ART_DIAG_DATA.unpack_from(packet, HEADER_LENGTH)
+        return cls(protocol_version, diag_priority, logical_port, length, packet[offset:offset + length])
+
+    @property
+    def diag_priority(self) -> DiagnosticsPriority:
+        return DiagnosticsPriority._value2member_map_.get(self.diag_priority_raw, DiagnosticsPriority.DP_UNKNOWN)
+
+    @property
+    def text(self) -> str:
+        return _c_string(self.text_raw)
+
+
+class ArtCommandView(NamedTuple):
+    protocol_version: int
+    esta: int
+    length: int
+    command_raw: memoryview
+
+    @classmethod
+    def decode(cls, packet: memoryview) -> Union["ArtCommandView", None]:
+        offset = HEADER_LENGTH + _ART_COMMAND.size
+        if len(packet) < offset:
+            return None
+        protocol_version, esta, length = _ART_COMMAND.unpack_from(packet, HEADER_LENGTH)
+        return cls(protocol_version, esta, length, packet[offset:offset + length])
+
+    @property
+    def command(self) -> str:
+        return _c_string(self.command_raw)
+
+
+class ArtTimeCodeView(NamedTuple):
+    protocol_version: int
+    frames: int
+    seconds: int
+    minutes: int
+    hours: int
+    type_raw: int
+
+    @classmethod
+    def decode(cls, packet: memoryview) -> Union["ArtTimeCodeView", None]:
+        if len(packet) < HEADER_LENGTH + _ART_TIME_CODE.size:
+            return None
+        return cls(*_ART_TIME_CODE.unpack_from(packet, HEADER_LENGTH))
+
+    @property
+    def type(self) -> TimeCodeType:
+        return TimeCodeType._value2member_map_.get(self.type_raw, TimeCodeType.FILM)
+
+
+class ArtTriggerView(NamedTuple):
+    protocol_version: int
+    oem: int
+    key: int
+    sub_key: int
+    payload: memoryview
+
+    @classmethod
+    def decode(cls, packet: memoryview) -> Union["ArtTriggerView", None]:
+        offset = HEADER_LENGTH + _ART_TRIGGER.size
+        if len(packet) < offset:
+            return None
+        return cls(*_ART_TRIGGER.unpack_from(packet, HEADER_LENGTH), packet[offset:offset + 512])
+
+
+class ArtDmxView(NamedTuple):
+    protocol_version: int
+    sequence_number: int
+    physical: int
+    sub_uni: int
+    net: int
+    length: int
+    data: memoryview
+
+    @classmethod
+    def decode(cls, packet: memoryview) -> Union["ArtDmxView", None]:
+        if len(packet) < ART_DMX_DATA_OFFSET:
+            return None
+        fields = _ART_DMX.unpack_from(packet, HEADER_LENGTH)
+        return cls(*fields, packet[ART_DMX_DATA_OFFSET:ART_DMX_DATA_OFFSET + fields[5]])
+
+    @property
+    def port_address_raw(self) -> int:
+        return (self.net & 0x7F) << 8 | self.sub_uni
+
+    @property
+    def port_address(self) -> PortAddress:
+        return PortAddress.parse(self.port_address_raw)
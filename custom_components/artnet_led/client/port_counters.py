@@ -0,0 +1,108 @@
+"""
+Fixed-size transmit counters and frame timing histograms of an Art-Net port.
+
+They are updated by the output scheduler for every frame it sends: a few integer increments and a bisect into constant
+bucket bounds, nothing that grows with the number of frames, so they are always on. Rates are counted per
+``RATE_WINDOW`` and published when the window closes, which doesn't need a history of timestamps either.
+
+Two times are kept per frame that carried a change:
+
+    latency    from ``send_dmx`` marking the port dirty to the frame being handed to the socket
+    jitter     how much later than possible that was: a change can't go out before ``1 / max_fps`` after the previous
+               frame of the port, so anything beyond that is the event loop or the scheduler running late
+
+A frame that is more than a whole frame interval late counts as late. Keep-alive refreshes only count as frames.
+"""
+from array import array
+from bisect import bisect_right
+from typing import Any
+
+RATE_WINDOW = 1.0
+
+# Upper bounds of the histogram buckets in seconds, the last bucket is open ended
+LATENCY_BOUNDS = (0.001, 0.002, 0.005, 0.010, 0.020, 0.040, 0.080, 0.160, 0.320)
+JITTER_BOUNDS = (0.0005, 0.001, 0.002, 0.005, 0.010, 0.020, 0.040, 0.080)
+
+
+class Histogram:
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = array("Q", bytes(8 * (len(bounds) + 1)))
+
+    def add(self, value: float):
+        self.counts[bisect_right(self.bounds, value)] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"bounds_ms": [bound * 1000 for bound in self.bounds], "counts": self.counts.tolist()}
+
+
+class PortCounters:
+    def __init__(self):
+        self.frames = 0
+        self.refreshes = 0
+        self.packets = 0
+        self.bytes = 0
+        self.late = 0
+        self.dropped = 0
+        self.latency = Histogram(LATENCY_BOUNDS)
+        self.jitter = Histogram(JITTER_BOUNDS)
+
+        self.fps = 0.0
+        self.packets_per_second = 0.0
+        self.bytes_per_second = 0.0
+
+        self.__window_start = 0.0
+        self.__window_frames = 0
+        self.__window_packets = 0
+        self.__window_bytes = 0
+
+    def sent(self, now: float, packets: int, size: int, changed_at: float | None, last_sent: float,
+             frame_interval: float):
+        """A frame of ``size`` bytes went out to ``packets`` nodes; ``changed_at`` is None for keep-alive refreshes."""
+        if now - self.__window_start >= RATE_WINDOW:
+            self.__close_window(now)
+
+        self.frames += 1
+        self.packets += packets
+        self.bytes += packets * size
+        self.__window_frames += 1
+        self.__window_packets += packets
+        self.__window_bytes += packets * size
+
+        if changed_at is None:
+            self.refreshes += 1
+            return
+
+        self.latency.add(now - changed_at)
+        earliest = last_sent + frame_interval
+        lateness = now - (changed_at if changed_at > earliest else earliest)
+        self.jitter.add(lateness)
+        if lateness > frame_interval:
+            self.late += 1
+
+    def __close_window(self, now: float):
+        elapsed = now - self.__window_start
+        self.fps = self.__window_frames / elapsed
+        self.packets_per_second = self.__window_packets / elapsed
+        self.bytes_per_second = self.__window_bytes / elapsed
+        self.__window_start = now
+        self.__window_frames = self.__window_packets = self.__window_bytes = 0
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        # Nothing was sent for a while, so the published rates are stale; the open window has the current ones
+        if now - self.__window_start >= 2 * RATE_WINDOW:
+            self.__close_window(now)
+
+        return {
+            "frames": self.frames,
+            "refreshes": self.refreshes,
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "late": self.late,
+            "dropped": self.dropped,
+            "fps": self.fps,
+            "packets_per_second": self.packets_per_second,
+            "bytes_per_second": self.bytes_per_second,
+            "latency": self.latency.as_dict(),
+            "jitter": self.jitter.as_dict(),
+        }
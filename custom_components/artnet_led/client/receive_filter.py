@@ -0,0 +1,72 @@
+"""
+Per-port filtering of inbound ArtDmx before it reaches the bridge.
+
+Art-Net sequence numbers run from 0x01 to 0xFF and wrap back to 0x01; 0x00 means the sender doesn't sequence its
+output. Every source (IP address and physical port) is tracked on its own, since several consoles or a merging node
+can feed the same port address with independent counters. Duplicates are judged against the last frame the port
+accepted from any source, so a source repeating itself after another one took over still gets through.
+"""
+from dataclasses import dataclass, field
+
+from custom_components.artnet_led.client.packet_view import ArtDmxView
+
+SEQUENCE_MODULUS = 255
+
+# A frame at most this many steps behind the last accepted one is considered late; anything further back is treated
+# as the source having restarted its counter.
+REORDER_WINDOW = 32
+
+# Seconds of silence after which a source's sequence history is forgotten
+SOURCE_TIMEOUT = 2.0
+
+
+@dataclass
+class _Source:
+    sequence_number: int = 0
+    last_seen: float = 0.0
+
+
+@dataclass
+class ReceiveFilter:
+    accepted: int = 0
+    duplicates: int = 0
+    out_of_order: int = 0
+    payload: bytes = b""
+    sources: dict[tuple[str, int], _Source] = field(default_factory=dict)
+
+    def accept(self, addr: tuple[str, int], dmx: ArtDmxView, now: float) -> bool:
+        """Return whether the frame carries new data, updating the counters either way."""
+        key = (addr[0], dmx.physical)
+        source = self.sources.get(key)
+        if source is None or now - source.last_seen > SOURCE_TIMEOUT:
+            if source is None:
+                self.__forget_stale_sources(now)
+            source = self.sources[key] = _Source()
+        source.last_seen = now
+
+        sequence_number = dmx.sequence_number
+        if sequence_number and source.sequence_number:
+            behind = (source.sequence_number - sequence_number) % SEQUENCE_MODULUS
+            if 0 < behind <= REORDER_WINDOW:
+                self.out_of_order += 1
+                return False
+
+        if sequence_number:
+            source.sequence_number = sequence_number
+
+        # The payload is only compared once the header passed, and without decoding any channel
+        if dmx.data == self.payload:
+            self.duplicates += 1
+            return False
+
+        self.payload = bytes(dmx.data)
+        self.accepted += 1
+        return True
+
+    def __forget_stale_sources(self, now: float):
+        stale = [key for key, source in self.sources.items() if now - source.last_seen > SOURCE_TIMEOUT]
+        for key in stale:
+            del self.sources[key]
+
+    def counters(self) -> dict[str, int]:
+        return {"accepted": self.accepted, "duplicates": self.duplicates, "out_of_order": self.out_of_order}
@@ -0,0 +1,208 @@
+"""
+Ring buffer recording of ArtDmx frames in a memory-mapped file.
+
+The file has a fixed size, chosen when it is created, and holds the last ``slot_count`` frames sent or received::
+
+    header    ">4sBxxxIIQd"  magic, version, slot count, index interval, frames written, wall clock offset
+    index     "<dQ"          per ``INDEX_INTERVAL`` frames: monotonic timestamp and number of the frame, a ring too
+    slots     "<dQHBBH"      monotonic timestamp, frame number, port address, direction, ArtDmx sequence, length,
+                             followed by 512 bytes of DMX data
+
+Recording a frame is a couple of ``pack_into`` calls and a copy into the map: no allocations beyond Python's own
+argument handling and no explicit system calls per frame, the kernel writes the pages back on its own. That doesn't
+make it free: a write into the map can page-fault, and under writeback pressure the kernel may stall it until the page
+is written. ``open`` asks the kernel to read the whole ring in ahead, so a fault rarely has to wait for the disk.
+Opening, flushing and closing touch the disk and belong in the executor.
+
+Timestamps are the event loop's monotonic clock; ``wall_clock_offset`` converts them to wall clock time of the session
+that recorded them. Frames are written in time order, so a time range is found by bisecting the index and then scanning
+at most ``INDEX_INTERVAL`` slots.
+"""
+import logging
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_left
+from typing import Iterator, NamedTuple
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"ALRB"
+VERSION = 1
+DMX_SIZE = 512
+INDEX_INTERVAL = 256
+
+DIRECTION_IN = 0
+DIRECTION_OUT = 1
+
+_HEADER = struct.Struct(">4sBxxxIIQd")
+_INDEX_ENTRY = struct.Struct("<dQ")
+_SLOT_HEADER = struct.Struct("<dQHBBH")
+SLOT_SIZE = (_SLOT_HEADER.size + DMX_SIZE + 15) // 16 * 16
+
+_WRITTEN_OFFSET = 16
+
+
+class RecordedFrame(NamedTuple):
+    timestamp: float
+    number: int
+    port_address: int
+    direction: int
+    sequence: int
+    data: bytes
+
+
+class FrameRecorder:
+    def __init__(self, path: str, slot_count: int):
+        if slot_count < INDEX_INTERVAL:
+            raise ValueError(f"A recording needs room for at least {INDEX_INTERVAL} frames")
+        self.path = path
+        # Whole index intervals, so every index entry of a frame in the ring has a place of its own
+        self.slot_count = slot_count // INDEX_INTERVAL * INDEX_INTERVAL
+        self.index_count = self.slot_count // INDEX_INTERVAL
+        self.written = 0
+        self.wall_clock_offset = 0.0
+
+        self.__index_offset = _HEADER.size
+        self.__slots_offset = (self.__index_offset + self.index_count * _INDEX_ENTRY.size + 63) // 64 * 64
+        self.__file = None
+        self.__map: mmap.mmap | None = None
+
+    @property
+    def size(self) -> int:
+        return self.__slots_offset + self.slot_count * SLOT_SIZE
+
+    @property
+    def is_open(self) -> bool:
+        return self.__map is not None
+
+    def open(self, monotonic_now: float):
+        """Create or reuse the file and start a new recording in it. Blocking, run it in the executor."""
+        self.__file = open(self.path, "a+b")
+        try:
+            if os.fstat(self.__file.fileno()).st_size != self.size:
+                self.__file.truncate(self.size)
+            self.__map = mmap.mmap(self.__file.fileno(), self.size)
+            if hasattr(mmap, "MADV_WILLNEED"):
+                self.__map.madvise(mmap.MADV_WILLNEED)
+        except OSError:
+            self.__file.close()
+            self.__file = None
+            raise
+
+        self.written = 0
+        self.wall_clock_offset = time.time() - monotonic_now
+        _HEADER.pack_into(self.__map, 0, MAGIC, VERSION, self.slot_count, INDEX_INTERVAL, 0, self.wall_clock_offset)
+        log.debug(f"Recording DMX frames to {self.path} ({self.slot_count} frames, {self.size >> 20} MiB)")
+
+    @classmethod
+    def open_recording(cls, path: str) -> "FrameRecorder":
+        """Open an existing recording read-only, e.g. to look into a show after the fact. Blocking."""
+        with open(path, "rb") as file:
+            recording = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(recording) < _HEADER.size:
+            recording.close()
+            raise ValueError(f"{path} is not a DMX recording")
+        magic, version, slot_count, index_interval, written, wall_clock_offset = _HEADER.unpack_from(recording)
+        if magic != MAGIC or version != VERSION or index_interval != INDEX_INTERVAL:
+            recording.close()
+            raise ValueError(f"{path} is not a DMX recording of a supported version")
+
+        recorder = cls(path, slot_count)
+        if len(recording) != recorder.size:
+            recording.close()
+            raise ValueError(f"{path} is truncated")
+        recorder.__map = recording
+        recorder.written = written
+        recorder.wall_clock_offset = wall_clock_offset
+        return recorder
+
+    def flush(self):
+        """Write the dirty pages to disk. Blocking, run it in the executor."""
+        if self.__map is not None:
+            self.__map.flush()
+
+    def close(self):
+        """Blocking, run it in the executor."""
+        if self.__map is None:
+            return
+        recording, self.__map = self.__map, None
+        if self.__file is not None:
+            recording.flush()
+            self.__file.close()
+            self.__file = None
+        recording.close()
+
+    def record(self, direction: int, port_address: int, sequence: int, data: bytes | bytearray | memoryview,
+               timestamp: float):
+        recording = self.__map
+        if recording is None:
+            return
+
+        number = self.written
+        length = len(data)
+        if length > DMX_SIZE:
+            length = DMX_SIZE
+        offset = self.__slots_offset + (number % self.slot_count) * SLOT_SIZE
+        _SLOT_HEADER.pack_into(recording, offset, timestamp, number, port_address, direction, sequence, length)
+        data_offset = offset + _SLOT_HEADER.size
+        recording[data_offset:data_offset + length] = data[:length] if length < len(data) else data
+
+        if number % INDEX_INTERVAL == 0:
+            _INDEX_ENTRY.pack_into(recording,
+                                   self.__index_offset + (number // INDEX_INTERVAL % self.index_count) * _INDEX_ENTRY.size,
+                                   timestamp, number)
+
+        self.written = number + 1
+        struct.pack_into(">Q", recording, _WRITTEN_OFFSET, self.written)
+
+    @property
+    def oldest(self) -> int:
+        """Number of the oldest frame still in the ring."""
+        return max(0, self.written - self.slot_count)
+
+    def frame(self, number: int) -> RecordedFrame:
+        offset = self.__slots_offset + (number % self.slot_count) * SLOT_SIZE
+        timestamp, stored_number, port_address, direction, sequence, length = \
+            _SLOT_HEADER.unpack_from(self.__map, offset)
+        data_offset = offset + _SLOT_HEADER.size
+        return RecordedFrame(timestamp, stored_number, port_address, direction, sequence,
+                             self.__map[data_offset:data_offset + length])
+
+    def frames(self, start: float, end: float) -> Iterator[RecordedFrame]:
+        """The frames recorded with ``start <= timestamp < end``, oldest first."""
+        number = self.find(start)
+        while number < self.written:
+            frame = self.frame(number)
+            if frame.timestamp >= end:
+                return
+            yield frame
+            number += 1
+
+    def prefetch(self, number: int, count: int):
+        """Ask the kernel to read the slots of ``count`` frames from ``number`` on ahead, without waiting for it."""
+        if not hasattr(mmap, "MADV_WILLNEED") or self.__map is None:
+            return
+        first = number % self.slot_count
+        last = min(first + count, self.slot_count)
+        start = (self.__slots_offset + first * SLOT_SIZE) // mmap.PAGESIZE * mmap.PAGESIZE
+        self.__map.madvise(mmap.MADV_WILLNEED, start, self.__slots_offset + last * SLOT_SIZE - start)
+
+    def find(self, timestamp: float) -> int:
+        """Number of the first frame recorded at or after ``timestamp``, ``written`` if there is none."""
+        oldest = self.oldest
+        # Index entries of frames that are still in the ring, oldest first
+        first_entry = -(-oldest // INDEX_INTERVAL)
+        entries = range(first_entry, -(-self.written // INDEX_INTERVAL))
+
+        def entry_timestamp(entry: int) -> float:
+            return _INDEX_ENTRY.unpack_from(
+                self.__map, self.__index_offset + (entry % self.index_count) * _INDEX_ENTRY.size
+            )[0]
+
+        position = bisect_left(entries, timestamp, key=entry_timestamp)
+        number = oldest if position == 0 else entries[position - 1] * INDEX_INTERVAL
+        while number < self.written and self.frame(number).timestamp < timestamp:
+            number += 1
+        return number
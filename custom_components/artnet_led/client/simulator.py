@@ -0,0 +1,219 @@
+"""
+Simulated Art-Net nodes, for exercising the controller without lighting hardware.
+
+A ``SimulatedNode`` binds its own address, answers ``ArtPoll`` with ``ArtPollReply`` packets for its port addresses
+(four ports per bind index, like a real multi-port node) and records every ArtDmx it receives with the event loop's
+monotonic time of arrival. Every address in 127.0.0.0/8 is local on Linux, so a fleet of nodes on 127.0.0.2,
+127.0.0.3, ... can share the Art-Net port with a controller bound to 127.0.0.1, which then polls them by unicast::
+
+    nodes = await start_fleet(4, universes_per_node=8)
+    server = ArtNetServer(hass, bind_address="127.0.0.1", poll_addresses=[node.ip for node in nodes])
+
+The per port statistics give frame counts, sequence errors and the mean and standard deviation of the time between
+frames, which is the jitter of the controller's output clock as seen on the wire. ``wait_for`` resolves with the arrival
+time of a frame on the same clock, so the latency from a change to the wire is that time minus the time of the change.
+"""
+import asyncio
+import logging
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from socket import inet_aton
+from typing import Any, Iterable, NamedTuple
+
+from custom_components.artnet_led.client import ArtPollReply, OpCode, Port, PortAddress, StyleCode, PORT
+from custom_components.artnet_led.client.packet_view import ArtPollView, ArtDmxView, peek_raw_opcode
+
+log = logging.getLogger(__name__)
+
+PORTS_PER_BIND_INDEX = 4
+RECEIVED_FRAMES = 10_000
+
+
+class SimulatedFrame(NamedTuple):
+    timestamp: float
+    port_address: int
+    sequence: int
+    data: bytes
+
+
+@dataclass
+class PortStatistics:
+    """Running statistics of the frames received on one port address."""
+    frames: int = 0
+    sequence_errors: int = 0
+    last_timestamp: float | None = None
+    last_sequence: int | None = None
+    max_interval: float = 0.0
+
+    # Welford's running mean and variance of the intervals
+    intervals: int = 0
+    mean_interval: float = 0.0
+    _m2: float = field(default=0.0, repr=False)
+
+    def add(self, timestamp: float, sequence: int):
+        self.frames += 1
+        if sequence and self.last_sequence is not None and sequence != self.last_sequence % 255 + 1:
+            self.sequence_errors += 1
+        self.last_sequence = sequence or self.last_sequence
+
+        if self.last_timestamp is not None:
+            interval = timestamp - self.last_timestamp
+            self.intervals += 1
+            delta = interval - self.mean_interval
+            self.mean_interval += delta / self.intervals
+            self._m2 += delta * (interval - self.mean_interval)
+            if interval > self.max_interval:
+                self.max_interval = interval
+        self.last_timestamp = timestamp
+
+    @property
+    def jitter(self) -> float:
+        """Standard deviation of the intervals between frames."""
+        return math.sqrt(self._m2 / self.intervals) if self.intervals > 1 else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "sequence_errors": self.sequence_errors,
+            "mean_interval": self.mean_interval,
+            "jitter": self.jitter,
+            "max_interval": self.max_interval,
+        }
+
+
+class SimulatedNode(asyncio.DatagramProtocol):
+    def __init__(self, ip: str, port_addresses: Iterable[PortAddress], short_name: str = "Simulated node",
+                 long_name: str = "Simulated Art-Net node", port: int = PORT,
+                 received_frames: int = RECEIVED_FRAMES):
+        super().__init__()
+        self.ip = ip
+        self.port = port
+        self.port_addresses = list(port_addresses)
+        self.short_name = short_name
+        self.long_name = long_name
+
+        self.received: deque[SimulatedFrame] = deque(maxlen=received_frames)
+        self.statistics: dict[int, PortStatistics] = {
+            port_address.port_address: PortStatistics() for port_address in self.port_addresses
+        }
+        self.polls = 0
+        self.ignored_frames = 0
+
+        self.__transport: asyncio.DatagramTransport | None = None
+        self.__waiters: list[tuple[int, bytes, asyncio.Future[float]]] = []
+        self.__replies = self.__build_replies()
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: self, local_addr=(self.ip, self.port))
+
+    def close(self):
+        if self.__transport is not None:
+            self.__transport.close()
+            self.__transport = None
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.__transport = transport
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self.__transport = None
+
+    def datagram_received(self, data: bytes, addr: tuple[str | Any, int]) -> None:
+        packet = memoryview(data)
+        opcode = peek_raw_opcode(packet)
+        if opcode == OpCode.OP_OUTPUT_DMX.value:
+            self.__on_dmx(packet)
+        elif opcode == OpCode.OP_POLL.value:
+            self.__on_poll(packet, addr)
+
+    def wait_for(self, port_address: PortAddress, data: bytes) -> "asyncio.Future[float]":
+        """A future with the arrival time of the next frame for a port that starts with ``data``."""
+        future = asyncio.get_running_loop().create_future()
+        self.__waiters.append((port_address.port_address, bytes(data), future))
+        return future
+
+    def reset_statistics(self):
+        self.received.clear()
+        for port_address in self.statistics:
+            self.statistics[port_address] = PortStatistics()
+
+    def __on_poll(self, packet: memoryview, addr: tuple[str | Any, int]):
+        poll = ArtPollView.decode(packet)
+        if poll is None:
+            return
+        self.polls += 1
+
+        if poll.targeted_mode_enabled and not any(
+                poll.target_port_bottom <= port_address.port_address <= poll.target_port_top
+                for port_address in self.port_addresses):
+            return
+
+        for reply in self.__replies:
+            self.__transport.sendto(reply, addr)
+
+    def __on_dmx(self, packet: memoryview):
+        now = asyncio.get_running_loop().time()
+        dmx = ArtDmxView.decode(packet)
+        if dmx is None:
+            self.ignored_frames += 1
+            return
+
+        port_address = dmx.port_address_raw
+        statistics = self.statistics.get(port_address)
+        if statistics is None:
+            self.ignored_frames += 1
+            return
+        statistics.add(now, dmx.sequence_number)
+
+        data = bytes(dmx.data)
+        self.received.append(SimulatedFrame(now, port_address, dmx.sequence_number, data))
+
+        if self.__waiters:
+            waiting = []
+            for waiter in self.__waiters:
+                waiter_port_address, prefix, future = waiter
+                if future.done():
+                    continue
+                if waiter_port_address == port_address and data.startswith(prefix):
+                    future.set_result(now)
+                else:
+                    waiting.append(waiter)
+            self.__waiters = waiting
+
+    def __build_replies(self) -> list[bytes]:
+        groups: dict[tuple[int, int], list[PortAddress]] = {}
+        for port_address in self.port_addresses:
+            groups.setdefault((port_address.net, port_address.sub_net), []).append(port_address)
+
+        replies = []
+        bind_index = 1
+        for (net, sub_net), port_addresses in groups.items():
+            for chunk in range(0, len(port_addresses), PORTS_PER_BIND_INDEX):
+                ports = [Port(output=True, sw_out=port_address.universe)
+                         for port_address in port_addresses[chunk:chunk + PORTS_PER_BIND_INDEX]]
+                reply = ArtPollReply(source_ip=inet_aton(self.ip), net_switch=net, sub_switch=sub_net,
+                                     short_name=self.short_name, long_name=self.long_name, ports=ports,
+                                     style=StyleCode.ST_NODE, bind_ip=inet_aton(self.ip), bind_index=bind_index)
+                replies.append(bytes(reply.serialize()))
+                bind_index += 1
+        return replies
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__:s} {self.ip:s} ports={len(self.port_addresses):d}>'
+
+
+async def start_fleet(count: int, universes_per_node: int = 4, first_ip: str = "127.0.0.2",
+                      first_universe: int = 0) -> list[SimulatedNode]:
+    """Start ``count`` nodes on consecutive loopback addresses, each with its own consecutive universes."""
+    base = int.from_bytes(inet_aton(first_ip), "big")
+    nodes = []
+    universe = first_universe
+    for index in range(count):
+        ip = ".".join(str(byte) for byte in (base + index).to_bytes(4, "big"))
+        port_addresses = [PortAddress.parse(universe + offset) for offset in range(universes_per_node)]
+        universe += universes_per_node
+        node = SimulatedNode(ip, port_addresses, short_name=f"Simulated {index + 1}")
+        await node.start()
+        nodes.append(node)
+    return nodes
@@ -0,0 +1,38 @@
+"""Diagnostics of the integration's nodes, as returned by the ``get_diagnostics`` service and read by its sensors."""
+from __future__ import annotations
+
+from typing import Any
+
+from pyartnet import BaseNode
+
+from custom_components.artnet_led.bridge.artnet_controller import ArtNetController
+
+
+def node_diagnostics(node: BaseNode) -> dict[str, Any]:
+    if isinstance(node, ArtNetController):
+        return {"type": "artnet-controller", **node.diagnostics()}
+
+    # Nodes of pyartnet send through their own socket, only their configuration is known
+    return {
+        "type": type(node).__name__,
+        "destination": f"{node._ip}:{node._port}",
+        "max_fps": round(1 / node._process_every),
+        "universes": {
+            str(universe._universe): {"size": universe._data_size} for universe in node._universes
+        },
+    }
+
+
+def get_diagnostics(nodes_by_host: dict[str, BaseNode]) -> dict[str, Any]:
+    """Every node once, with all the hosts that are configured on it."""
+    hosts_by_node: dict[int, list[str]] = {}
+    nodes: dict[int, BaseNode] = {}
+    for host, node in nodes_by_host.items():
+        hosts_by_node.setdefault(id(node), []).append(host)
+        nodes[id(node)] = node
+
+    return {
+        "nodes": [
+            {"hosts": hosts_by_node[node_id], **node_diagnostics(node)} for node_id, node in nodes.items()
+        ],
+    }
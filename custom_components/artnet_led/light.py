@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
-import time
 from array import array
 from typing import Union
 
@@ -19,7 +19,7 @@ from homeassistant.components.light import (
     PLATFORM_SCHEMA,
     LightEntity, ATTR_WHITE, ATTR_COLOR_TEMP_KELVIN, ATTR_FLASH,
     FLASH_SHORT, FLASH_LONG, ATTR_HS_COLOR, LightEntityFeature, ColorMode)
-from homeassistant.const import CONF_DEVICES, STATE_OFF, STATE_ON
+from homeassistant.const import CONF_DEVICES, EVENT_HOMEASSISTANT_STOP, STATE_OFF, STATE_ON
 from homeassistant.const import CONF_FRIENDLY_NAME as CONF_DEVICE_FRIENDLY_NAME
 from homeassistant.const import CONF_HOST as CONF_NODE_HOST
 from homeassistant.const import CONF_NAME as CONF_DEVICE_NAME
@@ -33,8 +33,17 @@ from pyartnet import BaseUniverse, Channel
 from pyartnet.errors import UniverseNotFoundError
 
 from custom_components.artnet_led.bridge.artnet_controller import ArtNetController
+from custom_components.artnet_led.bridge.bulk_update import current_bulk_update
 from custom_components.artnet_led.bridge.channel_bridge import ChannelBridge
+from custom_components.artnet_led.bridge.playback import Cue, CueListPlayer
+from custom_components.artnet_led.bridge.timecode import TimecodeLock, parse_timecode
+from custom_components.artnet_led.bridge.triggers import OEM_ANY
+from custom_components.artnet_led.client.recorder import FrameRecorder
+from custom_components.artnet_led.services import async_setup_services, recall_snapshot, recording_path, \
+    snapshot_store_path
+from custom_components.artnet_led.snapshots import SnapshotFormatError, SnapshotStore
 from custom_components.artnet_led.util.channel_switch import validate, to_values, from_values
+from custom_components.artnet_led.util.output_correction import correction_curve
 
 ARTNET_DEFAULT_PORT = 6454
 SACN_DEFAULT_PORT = 5568
@@ -59,14 +68,40 @@ CONF_OUTPUT_CORRECTION = "output_correction"
 CONF_CHANNEL_SIZE = "channel_size"
 CONF_BYTE_ORDER = "byte_order"
 
+CONF_STATE_UPDATE_INTERVAL = "state_update_interval"
+
 CONF_DEVICE_MIN_TEMP = "min_temp"
 CONF_DEVICE_MAX_TEMP = "max_temp"
 CONF_CHANNEL_SETUP = "channel_setup"
 
+CONF_CUE_LISTS = "cue_lists"
+CONF_CUE_LOOP = "loop"
+CONF_CUES = "cues"
+CONF_CUE_FADE = "fade"
+CONF_CUE_HOLD = "hold"
+CONF_CUE_TIMECODE = "timecode"
+CONF_CUE_CHANNELS = "channels"
+CONF_CUE_UNIVERSE = "universe"
+CONF_CUE_VALUES = "values"
+
+CONF_RECORD_FRAMES = "record_frames"
+
+CONF_BIND_ADDRESS = "bind_address"
+CONF_POLL_ADDRESSES = "poll_addresses"
+
+CONF_TRIGGERS = "triggers"
+CONF_TRIGGER_EVENTS = "trigger_events"
+CONF_TRIGGER_OEM = "oem"
+CONF_TRIGGER_KEY = "key"
+CONF_TRIGGER_SUB_KEY = "sub_key"
+CONF_TRIGGER_SNAPSHOT = "snapshot"
+CONF_TRIGGER_CUE_LIST = "cue_list"
+CONF_TRIGGER_ACTION = "action"
+CONF_TRIGGER_CUE = "cue"
+
 DOMAIN = "dmx"
 
-AVAILABLE_CORRECTIONS = {"linear": pyartnet.output_correction.linear, "quadratic": pyartnet.output_correction.quadratic,
-                         "cubic": pyartnet.output_correction.cubic, "quadruple": pyartnet.output_correction.quadruple}
+AVAILABLE_CORRECTIONS = {name: correction_curve(name) for name in ("linear", "quadratic", "cubic", "quadruple")}
 
 CHANNEL_SIZE = {
     "8bit": (1, 1),
@@ -76,6 +111,10 @@ CHANNEL_SIZE = {
 }
 
 NODES = {}
+NODES_BY_HOST: dict[str, pyartnet.base.BaseNode] = {}
+LIGHTS: dict[str, DmxBaseLight] = {}
+CUE_LISTS: dict[str, CueListPlayer] = {}
+SNAPSHOT_STORE: SnapshotStore | None = None
 
 
 async def async_setup_platform(hass: HomeAssistant, config, async_add_devices, discovery_info=None):
@@ -111,15 +150,26 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_devices, d
                 start_refresh_task=(refresh_interval > 0),
                 sequence_counter=True
             )
-            NODES[id] = __node
+            NODES[__id] = __node
 
-        node = NODES[id]
+        node = NODES[__id]
 
     elif client_type == "artnet-controller":
         if "server" not in NODES:
-            __node = ArtNetController(hass, max_fps=max_fps, refresh_every=refresh_interval)
+            __node = ArtNetController(hass, max_fps=max_fps, refresh_every=refresh_interval,
+                                      bind_address=config[CONF_BIND_ADDRESS],
+                                      poll_addresses=config.get(CONF_POLL_ADDRESSES))
             NODES["server"] = __node
             __node.start()
+
+            __node.triggers.add_command("snapshot", lambda name: recall_snapshot(
+                hass, SNAPSHOT_STORE, name, 0, LIGHTS, NODES_BY_HOST
+            ))
+            for __action in ("go", "back", "stop"):
+                __node.triggers.add_command(__action, functools.partial(_run_cue_list_action, __action, None))
+
+            if config[CONF_RECORD_FRAMES]:
+                await _async_start_recording(hass, __node, config[CONF_RECORD_FRAMES])
         node = NODES["server"]
 
     elif client_type == "sacn":
@@ -136,9 +186,9 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_devices, d
                 start_refresh_task=(refresh_interval > 0),
                 source_name="ha-artnet-led"
             )
-            NODES[id] = __node
+            NODES[__id] = __node
 
-        node = NODES[id]
+        node = NODES[__id]
     elif client_type == "kinet":
         if real_port is None:
             real_port = KINET_DEFAULT_PORT
@@ -152,13 +202,15 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_devices, d
                 refresh_every=refresh_interval,
                 start_refresh_task=(refresh_interval > 0),
             )
-            NODES[id] = __node
+            NODES[__id] = __node
 
-        node = NODES[id]
+        node = NODES[__id]
 
     else:
         raise NotImplementedError(f"Unknown client type '{client_type}'")
 
+    NODES_BY_HOST[host] = node
+
     entity_registry = async_get(hass)
 
     device_list = []
@@ -168,14 +220,17 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_devices, d
             universe = node.get_universe(universe_nr)
         except UniverseNotFoundError:
             universe: BaseUniverse = node.add_universe(universe_nr)
-            universe.output_correction = AVAILABLE_CORRECTIONS.get(
+            universe.set_output_correction(AVAILABLE_CORRECTIONS.get(
                 universe_cfg[CONF_OUTPUT_CORRECTION]
-            )
+            ))
 
         for device in universe_cfg[CONF_DEVICES]:  # type: dict
             device = device.copy()
             cls = __CLASS_TYPE[device[CONF_DEVICE_TYPE]]
 
+            if device.get(CONF_STATE_UPDATE_INTERVAL) is None:
+                device[CONF_STATE_UPDATE_INTERVAL] = universe_cfg[CONF_STATE_UPDATE_INTERVAL]
+
             channel = device[CONF_DEVICE_CHANNEL]
             unique_id = f"{DOMAIN}:{host}/{universe_nr}/{channel}"
 
@@ -208,9 +263,10 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_devices, d
                 )
             )
 
-            d.channel.output_correction = AVAILABLE_CORRECTIONS.get(
+            # Devices without their own correction inherit the universe's
+            d.channel.set_output_correction(AVAILABLE_CORRECTIONS.get(
                 device[CONF_OUTPUT_CORRECTION]
-            )
+            ))
 
             device_list.append(d)
 
@@ -220,9 +276,95 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_devices, d
 
     async_add_devices(device_list)
 
+    for cue_list_name, cue_list_cfg in config[CONF_CUE_LISTS].items():
+        if cue_list_name in CUE_LISTS:
+            log.error(f"Cue list {cue_list_name} is configured more than once, ignoring the one of {host}")
+            continue
+        try:
+            cues = [
+                Cue(
+                    fade=cue_cfg[CONF_CUE_FADE],
+                    hold=cue_cfg.get(CONF_CUE_HOLD),
+                    channels=[(node.get_universe(target[CONF_CUE_UNIVERSE]), target[CONF_DEVICE_CHANNEL],
+                               bytes(target[CONF_CUE_VALUES]))
+                              for target in cue_cfg[CONF_CUE_CHANNELS]],
+                )
+                for cue_cfg in cue_list_cfg[CONF_CUES]
+            ]
+            player = CueListPlayer(cue_list_name, node, cues, loop=cue_list_cfg[CONF_CUE_LOOP])
+
+            timecodes = [cue_cfg.get(CONF_CUE_TIMECODE) for cue_cfg in cue_list_cfg[CONF_CUES]]
+            if any(timecodes):
+                if not all(timecodes):
+                    raise ValueError("either all cues or none of them need a timecode")
+                if not isinstance(node, ArtNetController):
+                    raise ValueError("following timecode needs an artnet-controller node")
+                node.timecode_locks.append(TimecodeLock(player, timecodes))
+
+            CUE_LISTS[cue_list_name] = player
+        except (UniverseNotFoundError, ValueError) as e:
+            log.error(f"Unable to set up cue list {cue_list_name} of {host}: {e!r}")
+
+    # Loaded up front, so triggers can recall snapshots straight away
+    global SNAPSHOT_STORE
+    if SNAPSHOT_STORE is None:
+        SNAPSHOT_STORE = SnapshotStore(snapshot_store_path(hass))
+        try:
+            await hass.async_add_executor_job(SNAPSHOT_STORE.load)
+        except (OSError, SnapshotFormatError) as e:
+            log.error(f"Unable to read DMX snapshots from {SNAPSHOT_STORE.path}: {e!r}")
+    snapshot_store = SNAPSHOT_STORE
+
+    if config[CONF_TRIGGERS] or config[CONF_TRIGGER_EVENTS]:
+        if isinstance(node, ArtNetController):
+            node.triggers.fire_events |= config[CONF_TRIGGER_EVENTS]
+            for trigger_cfg in config[CONF_TRIGGERS]:
+                if CONF_TRIGGER_SNAPSHOT in trigger_cfg:
+                    action = functools.partial(recall_snapshot, hass, snapshot_store,
+                                               trigger_cfg[CONF_TRIGGER_SNAPSHOT], trigger_cfg[CONF_DEVICE_TRANSITION],
+                                               LIGHTS, NODES_BY_HOST)
+                else:
+                    cue = trigger_cfg.get(CONF_TRIGGER_CUE)
+                    action = functools.partial(_run_cue_list_action, trigger_cfg[CONF_TRIGGER_ACTION],
+                                               None if cue is None else cue - 1, trigger_cfg[CONF_TRIGGER_CUE_LIST])
+                node.triggers.add_trigger(trigger_cfg[CONF_TRIGGER_OEM], trigger_cfg[CONF_TRIGGER_KEY],
+                                          trigger_cfg[CONF_TRIGGER_SUB_KEY], action)
+        else:
+            log.error(f"Triggers of {host} are ignored, only an artnet-controller node receives them")
+
+    async_setup_services(hass, LIGHTS, NODES_BY_HOST, CUE_LISTS, snapshot_store)
+
     return True
 
 
+async def _async_start_recording(hass: HomeAssistant, node: ArtNetController, frames: int):
+    recorder = FrameRecorder(recording_path(hass), frames)
+    try:
+        await hass.async_add_executor_job(recorder.open, hass.loop.time())
+    except OSError as e:
+        log.error(f"Unable to record DMX frames to {recorder.path}: {e!r}")
+        return
+    node.set_recorder(recorder)
+
+    async def async_stop_recording(event):
+        node.set_recorder(None)
+        await hass.async_add_executor_job(recorder.close)
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop_recording)
+
+
+def _run_cue_list_action(action: str, cue: int | None, name: str):
+    player = CUE_LISTS.get(name)
+    if player is None:
+        raise LookupError(f"No cue list named {name} is configured")
+    if action == "go":
+        player.go(cue)
+    elif action == "back":
+        player.back()
+    else:
+        player.stop()
+
+
 def convert_to_kelvin(kelvin_string) -> int:
     return int(kelvin_string[:-1])
 
@@ -243,10 +385,14 @@ class DmxBaseLight(LightEntity, RestoreEntity):
         self._vals = []
         self._features = 0
         self._supported_color_modes = set()
-        self._channel_last_update = 0
         self._channel_width = 0
         self._type = None
 
+        # Value changes from fades and inbound DMX are published at most once per interval, the last values win
+        self._state_update_interval: float = kwargs.get(CONF_STATE_UPDATE_INTERVAL) or 0
+        self._state_last_published = 0.0
+        self._state_update_handle: asyncio.TimerHandle | None = None
+
         self._channel: pyartnet.base.Channel
 
     def set_channel(self, channel: pyartnet.base.Channel):
@@ -293,7 +439,6 @@ class DmxBaseLight(LightEntity, RestoreEntity):
                 "values": self._vals,
                 "bright": self._attr_brightness
                 }
-        self._channel_last_update = time.time()
         return data
 
     @property
@@ -325,16 +470,40 @@ class DmxBaseLight(LightEntity, RestoreEntity):
         self._channel_value_change()
 
     def _channel_value_change(self):
-        """Schedule update while fade is running"""
-        if time.time() - self._channel_last_update > 1.1:
-            self._channel_last_update = time.time()
-        self.async_schedule_update_ha_state()
+        """Schedule update while fade is running, throttled to the state update interval"""
+        if self.hass is None or self._state_update_handle is not None:
+            return
+
+        delay = self._state_last_published + self._state_update_interval - self.hass.loop.time()
+        if delay <= 0:
+            self._publish_state()
+        else:
+            self._state_update_handle = self.hass.loop.call_later(delay, self._publish_state)
 
     def _channel_fade_finish(self, channel):
         """Fade is finished -> schedule update"""
-        self._channel_last_update = time.time()
+        self._publish_state()
+
+    def _publish_state(self):
+        """Write the current state right away, replacing any pending throttled update"""
+        if self._state_update_handle is not None:
+            self._state_update_handle.cancel()
+            self._state_update_handle = None
+
+        if self.hass is None:
+            return
+
+        self._state_last_published = self.hass.loop.time()
         self.async_schedule_update_ha_state()
 
+    def _set_fade(self, values: list, duration_ms: float):
+        """Fade the channel, or hand the values to the bulk update that is being collected"""
+        bulk_update = current_bulk_update()
+        if bulk_update is not None:
+            bulk_update.set_channel(self._channel, values)
+        else:
+            self._channel.set_fade(values, duration_ms)
+
     @staticmethod
     def _default_calculation_function(channel_value):
         return channel_value if isinstance(channel_value, int) else 0
@@ -381,11 +550,11 @@ class DmxBaseLight(LightEntity, RestoreEntity):
 
         transition = kwargs.get(ATTR_TRANSITION, self._fade_time)
 
-        self._channel.set_fade(
+        self._set_fade(
             self.get_target_values(), transition * 1000
         )
 
-        self.async_schedule_update_ha_state()
+        self._publish_state()
 
     async def async_turn_off(self, **kwargs):
         """
@@ -394,17 +563,18 @@ class DmxBaseLight(LightEntity, RestoreEntity):
         """
         transition = kwargs.get(ATTR_TRANSITION, self._fade_time)
 
-        self._channel.set_fade(
+        self._set_fade(
             [0 for _ in range(self._channel._width)],
             transition * 1000
         )
 
         self._state = False
-        self.async_schedule_update_ha_state()
+        self._publish_state()
 
     async def async_added_to_hass(self) -> None:
         """Handle entity which will be added."""
         await super().async_added_to_hass()
+        LIGHTS[self.entity_id] = self
         old_state = await self.async_get_last_state()
         if old_state:
             old_type = old_state.attributes.get('type')
@@ -415,9 +585,22 @@ class DmxBaseLight(LightEntity, RestoreEntity):
         if old_state is not None:
             await self.restore_state(old_state)
 
+    async def async_will_remove_from_hass(self) -> None:
+        if LIGHTS.get(self.entity_id) is self:
+            del LIGHTS[self.entity_id]
+        if self._state_update_handle is not None:
+            self._state_update_handle.cancel()
+            self._state_update_handle = None
+        await super().async_will_remove_from_hass()
+
     async def restore_state(self, old_state):
         log.error("Derived class should implement this. Report this to the repository author.")
 
+    async def async_refresh_from_channel(self):
+        """Wait for the channel's fade to end and take over its values as the entity's state"""
+        await self._channel
+        self._update_values(self._channel._values_raw)
+
     @property
     def channel_width(self):
         return self._channel_width
@@ -453,6 +636,9 @@ class DmxFixed(DmxBaseLight):
     async def async_turn_off(self, **kwargs):
         pass  # do nothing, fixed is constant value
 
+    async def async_refresh_from_channel(self):
+        pass  # fixed is constant value
+
     async def restore_state(self, old_state):
         log.debug("Added fixed to hass. Do nothing to restore state. Fixed is constant value")
         await super().async_create_fade()
@@ -489,10 +675,10 @@ class DmxBinary(DmxBaseLight):
 
         self._state = True
         self._attr_brightness = 255
-        self._channel.set_fade(
+        self._set_fade(
             self.get_target_values(), 0
         )
-        self.async_schedule_update_ha_state()
+        self._publish_state()
 
     async def flash_binary(self, duration: float):
         self._state = not self._state
@@ -510,10 +696,10 @@ class DmxBinary(DmxBaseLight):
     async def async_turn_off(self, **kwargs):
         self._state = False
         self._attr_brightness = 0
-        self._channel.set_fade(
+        self._set_fade(
             self.get_target_values(), 0
         )
-        self.async_schedule_update_ha_state()
+        self._publish_state()
 
     async def restore_state(self, old_state):
         log.debug("Added binary light to hass. Try restoring state.")
@@ -945,6 +1131,9 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
         vol.Required(CONF_NODE_UNIVERSES): {
             vol.All(int, vol.Range(min=0, max=1024)): {
                 vol.Optional(CONF_SEND_PARTIAL_UNIVERSE, default=True): cv.boolean,
+                vol.Optional(CONF_STATE_UPDATE_INTERVAL, default=1.0): vol.All(
+                    vol.Coerce(float), vol.Range(min=0, max=60)
+                ),
                 vol.Optional(CONF_OUTPUT_CORRECTION, default='linear'): vol.Any(
                     None, vol.In(AVAILABLE_CORRECTIONS)
                 ),
@@ -963,7 +1152,7 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
                             vol.Optional(CONF_DEVICE_TRANSITION, default=0): vol.All(
                                 vol.Coerce(float), vol.Range(min=0, max=999)
                             ),
-                            vol.Optional(CONF_OUTPUT_CORRECTION, default='linear'): vol.Any(
+                            vol.Optional(CONF_OUTPUT_CORRECTION, default=None): vol.Any(
                                 None, vol.In(AVAILABLE_CORRECTIONS)
                             ),
                             vol.Optional(CONF_CHANNEL_SIZE, default='8bit'): vol.Any(
@@ -981,11 +1170,76 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
                             vol.Optional(CONF_CHANNEL_SETUP, default=None): vol.Any(
                                 None, cv.string, cv.ensure_list
                             ),
+                            vol.Optional(CONF_STATE_UPDATE_INTERVAL): vol.All(
+                                vol.Coerce(float), vol.Range(min=0, max=60)
+                            ),
                         }
                     ],
                 )
             },
         },
+        vol.Optional(CONF_CUE_LISTS, default={}): {
+            cv.slug: {
+                vol.Optional(CONF_CUE_LOOP, default=False): cv.boolean,
+                vol.Required(CONF_CUES): vol.All(
+                    cv.ensure_list,
+                    [
+                        {
+                            vol.Optional(CONF_CUE_FADE, default=0): vol.All(
+                                vol.Coerce(float), vol.Range(min=0, max=999)
+                            ),
+                            vol.Optional(CONF_CUE_HOLD): vol.All(
+                                vol.Coerce(float), vol.Range(min=0, max=86400)
+                            ),
+                            vol.Optional(CONF_CUE_TIMECODE): vol.All(cv.string, parse_timecode),
+                            vol.Optional(CONF_CUE_CHANNELS, default=[]): vol.All(
+                                cv.ensure_list,
+                                [
+                                    {
+                                        vol.Required(CONF_CUE_UNIVERSE): vol.All(int, vol.Range(min=0, max=1024)),
+                                        vol.Required(CONF_DEVICE_CHANNEL): vol.All(
+                                            vol.Coerce(int), vol.Range(min=1, max=512)
+                                        ),
+                                        vol.Required(CONF_CUE_VALUES): vol.All(
+                                            cv.ensure_list, [cv.byte], vol.Length(min=1, max=512)
+                                        ),
+                                    }
+                                ],
+                            ),
+                        }
+                    ],
+                    vol.Length(min=1),
+                ),
+            },
+        },
+        vol.Optional(CONF_TRIGGERS, default=[]): vol.All(
+            cv.ensure_list,
+            [
+                vol.All(
+                    {
+                        vol.Optional(CONF_TRIGGER_OEM, default=OEM_ANY): vol.All(
+                            vol.Coerce(int), vol.Range(min=0, max=0xFFFF)
+                        ),
+                        vol.Required(CONF_TRIGGER_KEY): cv.byte,
+                        vol.Optional(CONF_TRIGGER_SUB_KEY, default=0): cv.byte,
+                        vol.Exclusive(CONF_TRIGGER_SNAPSHOT, "target"): cv.string,
+                        vol.Exclusive(CONF_TRIGGER_CUE_LIST, "target"): cv.slug,
+                        vol.Optional(CONF_TRIGGER_ACTION, default="go"): vol.In(["go", "back", "stop"]),
+                        vol.Optional(CONF_TRIGGER_CUE): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                        vol.Optional(CONF_DEVICE_TRANSITION, default=0): vol.All(
+                            vol.Coerce(float), vol.Range(min=0, max=999)
+                        ),
+                    },
+                    cv.has_at_least_one_key(CONF_TRIGGER_SNAPSHOT, CONF_TRIGGER_CUE_LIST),
+                )
+            ],
+        ),
+        vol.Optional(CONF_TRIGGER_EVENTS, default=False): cv.boolean,
+        vol.Optional(CONF_RECORD_FRAMES, default=0): vol.All(
+            vol.Coerce(int), vol.Any(0, vol.Range(min=256, max=4_000_000))
+        ),
+        vol.Optional(CONF_BIND_ADDRESS, default="0.0.0.0"): vol.All(cv.string, vol.Match(r"^\d{1,3}(\.\d{1,3}){3}$")),
+        vol.Optional(CONF_POLL_ADDRESSES): vol.All(cv.ensure_list, [cv.string]),
         vol.Optional(CONF_NODE_HOST_OVERRIDE, default=""): cv.string,
         vol.Optional(CONF_NODE_PORT): cv.port,
         vol.Optional(CONF_NODE_PORT_OVERRIDE): cv.port,
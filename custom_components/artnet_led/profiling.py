@@ -0,0 +1,177 @@
+"""
+On-demand timing of the DMX hot paths, for finding out where the time goes under real show load.
+
+Nothing is instrumented until a profile is started: ``start`` replaces the hot functions with timed wrappers where they
+are looked up, ``stop`` puts the originals back, so outside of a profile the integration runs its plain code. The
+sections are
+
+    ArtNetController tick        one iteration of the output loop of ``_process_values_task``, from waking up to
+                                 going back to sleep
+    ArtNetServer.handle_datagram every received datagram, including the state updates it causes
+    UniverseBridge.receive_data  received ArtDmx that made it past the receive filter
+    channel_switch.to_values     encoding a light's state into channel values
+    channel_switch.from_values   decoding channel values into a light's state
+
+Every section counts calls and their total and longest time, and keeps a histogram of the durations. The report is
+written as JSON to the configuration directory when the profile ends.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import functools
+import json
+import logging
+import sys
+import time
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.artnet_led.bridge import artnet_controller
+from custom_components.artnet_led.bridge.universe_bridge import UniverseBridge
+from custom_components.artnet_led.client.artnet_server import ArtNetServer
+from custom_components.artnet_led.client.port_counters import Histogram
+from custom_components.artnet_led.util import channel_switch
+
+log = logging.getLogger(__name__)
+
+PROFILE_FILE = "artnet_led_profile_{:%Y%m%d_%H%M%S}.json"
+
+# Upper bounds of the duration buckets in seconds, the last bucket is open ended
+DURATION_BOUNDS = (0.00001, 0.00002, 0.00005, 0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05)
+
+SECTION_TICK = "ArtNetController tick"
+
+
+class SectionTimer:
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.durations = Histogram(DURATION_BOUNDS)
+
+    def add(self, duration: float):
+        self.calls += 1
+        self.total += duration
+        if duration > self.longest:
+            self.longest = duration
+        self.durations.add(duration)
+
+    def as_dict(self, wall_time: float) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "total_ms": self.total * 1000,
+            "mean_us": self.total / self.calls * 1e6 if self.calls else None,
+            "max_us": self.longest * 1e6,
+            "share": self.total / wall_time if wall_time else None,
+            "durations": self.durations.as_dict(),
+        }
+
+
+def _timed(function: Callable, timer: SectionTimer) -> Callable:
+    perf_counter = time.perf_counter
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timer.add(perf_counter() - start)
+
+    return wrapper
+
+
+def _timed_sleep(sleep: Callable, timer: SectionTimer) -> Callable:
+    """A sleep that times the work between two calls of it, i.e. one iteration of the loop that calls it."""
+    perf_counter = time.perf_counter
+    woke_up: float | None = None
+
+    async def timed_sleep(delay: float):
+        nonlocal woke_up
+        if woke_up is not None:
+            timer.add(perf_counter() - woke_up)
+        try:
+            await sleep(delay)
+        finally:
+            woke_up = perf_counter()
+
+    return timed_sleep
+
+
+class Profiler:
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self.__timers: dict[str, SectionTimer] | None = None
+        self.__patches: list[tuple[object, str, Any, bool]] = []
+        self.__started: tuple[datetime.datetime, float, float] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.__timers is not None
+
+    def start(self):
+        if self.running:
+            raise RuntimeError("A profile is already being taken")
+        timers = self.__timers = {}
+
+        def timer(section: str) -> SectionTimer:
+            return timers.setdefault(section, SectionTimer())
+
+        self.__patch(artnet_controller, "sleep", _timed_sleep(artnet_controller.sleep, timer(SECTION_TICK)))
+        self.__patch(ArtNetServer, "handle_datagram",
+                     _timed(ArtNetServer.handle_datagram, timer("ArtNetServer.handle_datagram")))
+        self.__patch(UniverseBridge, "receive_data",
+                     _timed(UniverseBridge.receive_data, timer("UniverseBridge.receive_data")))
+
+        # The conversions are imported by name, so they're replaced in every module that holds them
+        for name in ("to_values", "from_values"):
+            original = getattr(channel_switch, name)
+            wrapper = _timed(original, timer(f"channel_switch.{name}"))
+            for module_name, module in list(sys.modules.items()):
+                if module_name.startswith(__package__) and getattr(module, name, None) is original:
+                    self.__patch(module, name, wrapper)
+
+        self.__started = (datetime.datetime.now(), time.perf_counter(), time.process_time())
+        log.info("Started profiling the DMX hot paths")
+
+    def stop(self) -> dict[str, Any]:
+        for owner, name, original, own in reversed(self.__patches):
+            if own:
+                setattr(owner, name, original)
+            else:
+                delattr(owner, name)
+        self.__patches.clear()
+
+        started_at, wall_start, cpu_start = self.__started
+        wall_time = time.perf_counter() - wall_start
+        timers, self.__timers = self.__timers, None
+        return {
+            "started": started_at.isoformat(),
+            "wall_seconds": wall_time,
+            "cpu_seconds": time.process_time() - cpu_start,
+            "sections": {section: timer.as_dict(wall_time) for section, timer in timers.items()},
+        }
+
+    async def async_profile(self, duration: float) -> dict[str, Any]:
+        """Profile that has been started for ``duration`` seconds, write the report and return it."""
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            report = self.stop()
+
+        path = self._hass.config.path(PROFILE_FILE.format(datetime.datetime.now()))
+        await self._hass.async_add_executor_job(self.__write, path, report)
+        log.info(f"Wrote the profile of the DMX hot paths to {path}")
+        return {"file": path, **report}
+
+    def __patch(self, owner: object, name: str, replacement: Any):
+        own = name in vars(owner)
+        self.__patches.append((owner, name, getattr(owner, name), own))
+        setattr(owner, name, replacement)
+
+    @staticmethod
+    def __write(path: str, report: dict[str, Any]):
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
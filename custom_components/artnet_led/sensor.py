@@ -0,0 +1,113 @@
+"""
+Optional diagnostic sensors of an artnet-controller node::
+
+    sensor:
+      - platform: artnet_led
+        host: 192.168.1.10
+
+``host`` is one of the hosts of the controller in the light platform. The sensors read the node's counters every
+``SCAN_INTERVAL`` and are unavailable until the light platform has set up the node.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+import homeassistant.helpers.config_validation as cv
+from homeassistant.components.sensor import PLATFORM_SCHEMA, SensorEntity, SensorEntityDescription, \
+    SensorStateClass, SensorDeviceClass
+from homeassistant.const import CONF_HOST, EntityCategory, UnitOfDataRate
+from homeassistant.core import HomeAssistant
+
+from custom_components.artnet_led.bridge.artnet_controller import ArtNetController
+from custom_components.artnet_led.light import DOMAIN, NODES_BY_HOST
+
+log = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(seconds=10)
+
+PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({CONF_HOST: cv.string})
+
+
+def _ports_sum(key: str) -> Callable[[dict[str, Any]], float]:
+    return lambda diagnostics: sum(port[key] for port in diagnostics["ports"].values())
+
+
+def _filtered(diagnostics: dict[str, Any]) -> int:
+    return sum(port["receive_filter"]["duplicates"] + port["receive_filter"]["out_of_order"]
+               for port in diagnostics["ports"].values())
+
+
+@dataclass(frozen=True, kw_only=True)
+class DiagnosticSensorDescription(SensorEntityDescription):
+    value_fn: Callable[[dict[str, Any]], float | int]
+
+
+SENSORS = (
+    DiagnosticSensorDescription(
+        key="packets_per_second", name="packets per second", native_unit_of_measurement="packets/s",
+        state_class=SensorStateClass.MEASUREMENT, suggested_display_precision=0,
+        value_fn=lambda diagnostics: diagnostics["packets_per_second"],
+    ),
+    DiagnosticSensorDescription(
+        key="bytes_per_second", name="data rate", device_class=SensorDeviceClass.DATA_RATE,
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND, state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda diagnostics: diagnostics["bytes_per_second"],
+    ),
+    # The busiest universe, to compare against max_fps
+    DiagnosticSensorDescription(
+        key="fps", name="frame rate", native_unit_of_measurement="fps", state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda diagnostics: max((port["fps"] for port in diagnostics["ports"].values()), default=0.0),
+    ),
+    DiagnosticSensorDescription(
+        key="late_frames", name="late frames", state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=_ports_sum("late"),
+    ),
+    DiagnosticSensorDescription(
+        key="dropped_frames", name="dropped frames", state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=_ports_sum("dropped"),
+    ),
+    DiagnosticSensorDescription(
+        key="filtered_frames", name="filtered frames", state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=_filtered,
+    ),
+    DiagnosticSensorDescription(
+        key="tx_errors", name="transmit errors", state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda diagnostics: diagnostics["tx_errors"],
+    ),
+)
+
+
+async def async_setup_platform(hass: HomeAssistant, config, async_add_entities, discovery_info=None):
+    host = config[CONF_HOST]
+    async_add_entities((DiagnosticSensor(host, description) for description in SENSORS), update_before_add=True)
+
+
+class DiagnosticSensor(SensorEntity):
+    entity_description: DiagnosticSensorDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, host: str, description: DiagnosticSensorDescription):
+        self.entity_description = description
+        self._host = host
+        self._attr_name = f"Art-Net {host} {description.name}"
+        self._attr_unique_id = f"{DOMAIN}:{host}/diagnostics/{description.key}"
+        self._attr_available = False
+        self._warned = False
+
+    async def async_update(self) -> None:
+        node = NODES_BY_HOST.get(self._host)
+        if not isinstance(node, ArtNetController):
+            if node is not None and not self._warned:
+                log.warning(f"Node {self._host} isn't an artnet-controller, it has no diagnostic counters")
+                self._warned = True
+            self._attr_available = False
+            return
+
+        self._attr_native_value = self.entity_description.value_fn(node.diagnostics())
+        self._attr_available = True
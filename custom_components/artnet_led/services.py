@@ -0,0 +1,423 @@
+"""Services of the artnet_led integration."""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import os
+from typing import TYPE_CHECKING
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_BRIGHTNESS_PCT, ATTR_COLOR_TEMP_KELVIN, \
+    ATTR_HS_COLOR, ATTR_PROFILE, ATTR_RGB_COLOR, ATTR_RGBW_COLOR, ATTR_RGBWW_COLOR, ATTR_TRANSITION, ATTR_WHITE, \
+    DOMAIN as LIGHT_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_STATE, SERVICE_TURN_OFF, SERVICE_TURN_ON
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers.storage import STORAGE_DIR
+from pyartnet import BaseNode
+from pyartnet.errors import UniverseNotFoundError
+
+from custom_components.artnet_led.bridge.artnet_controller import ArtNetController
+from custom_components.artnet_led.bridge.bulk_update import BulkUpdate
+from custom_components.artnet_led.bridge.replay import Replay
+from custom_components.artnet_led.client.recorder import FrameRecorder, DIRECTION_IN, DIRECTION_OUT
+from custom_components.artnet_led.diagnostics import get_diagnostics
+from custom_components.artnet_led.profiling import Profiler
+from custom_components.artnet_led.snapshots import SnapshotFormatError, SnapshotStore
+
+if TYPE_CHECKING:
+    from custom_components.artnet_led.bridge.playback import CueListPlayer
+    from custom_components.artnet_led.light import DmxBaseLight
+
+DOMAIN = "artnet_led"
+
+SERVICE_BULK_UPDATE = "bulk_update"
+SERVICE_CAPTURE_SNAPSHOT = "capture_snapshot"
+SERVICE_RECALL_SNAPSHOT = "recall_snapshot"
+SERVICE_DELETE_SNAPSHOT = "delete_snapshot"
+SERVICE_CUE_LIST_GO = "cue_list_go"
+SERVICE_CUE_LIST_BACK = "cue_list_back"
+SERVICE_CUE_LIST_STOP = "cue_list_stop"
+SERVICE_REPLAY_START = "replay_start"
+SERVICE_REPLAY_SEEK = "replay_seek"
+SERVICE_REPLAY_SPEED = "replay_speed"
+SERVICE_REPLAY_STOP = "replay_stop"
+SERVICE_GET_DIAGNOSTICS = "get_diagnostics"
+SERVICE_PROFILE = "profile"
+
+SNAPSHOT_FILE = "artnet_led.snapshots"
+RECORDING_FILE = "artnet_led.frames"
+
+ATTR_LIGHTS = "lights"
+ATTR_CHANNELS = "channels"
+ATTR_HOST = "host"
+ATTR_UNIVERSE = "universe"
+ATTR_CHANNEL = "channel"
+ATTR_VALUES = "values"
+ATTR_NAME = "name"
+ATTR_UNIVERSES = "universes"
+ATTR_CUE_LIST = "cue_list"
+ATTR_CUE = "cue"
+ATTR_FILE = "file"
+ATTR_POSITION = "position"
+ATTR_AT = "at"
+ATTR_SPEED = "speed"
+ATTR_LOOP = "loop"
+ATTR_DIRECTION = "direction"
+ATTR_DURATION = "duration"
+
+REPLAY_DIRECTIONS = {"sent": DIRECTION_OUT, "received": DIRECTION_IN}
+
+log = logging.getLogger(__name__)
+
+# The attributes are handed to light.turn_on, so they're exclusive the same way as there: a target that the light
+# service would reject has to fail here, before any light of the bulk update changed
+COLOR_GROUP = "color"
+
+LIGHT_TARGET_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(ATTR_STATE, default=True): cv.boolean,
+        vol.Exclusive(ATTR_BRIGHTNESS, ATTR_BRIGHTNESS): vol.All(vol.Coerce(int), vol.Range(min=0, max=255)),
+        vol.Exclusive(ATTR_BRIGHTNESS_PCT, ATTR_BRIGHTNESS): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+        vol.Exclusive(ATTR_PROFILE, COLOR_GROUP): cv.string,
+        vol.Exclusive(ATTR_RGB_COLOR, COLOR_GROUP): vol.All(vol.ExactSequence((cv.byte,) * 3), vol.Coerce(tuple)),
+        vol.Exclusive(ATTR_RGBW_COLOR, COLOR_GROUP): vol.All(vol.ExactSequence((cv.byte,) * 4), vol.Coerce(tuple)),
+        vol.Exclusive(ATTR_RGBWW_COLOR, COLOR_GROUP): vol.All(vol.ExactSequence((cv.byte,) * 5), vol.Coerce(tuple)),
+        vol.Exclusive(ATTR_HS_COLOR, COLOR_GROUP): vol.All(vol.ExactSequence((cv.small_float, cv.small_float)),
+                                                           vol.Coerce(tuple)),
+        vol.Exclusive(ATTR_COLOR_TEMP_KELVIN, COLOR_GROUP): cv.positive_int,
+        vol.Exclusive(ATTR_WHITE, COLOR_GROUP): cv.byte,
+    }
+)
+
+CHANNEL_TARGET_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_HOST): cv.string,
+        vol.Required(ATTR_UNIVERSE): vol.All(vol.Coerce(int), vol.Range(min=0, max=32767)),
+        vol.Required(ATTR_CHANNEL): vol.All(vol.Coerce(int), vol.Range(min=1, max=512)),
+        vol.Required(ATTR_VALUES): vol.All(cv.ensure_list, [cv.byte], vol.Length(min=1, max=512)),
+    }
+)
+
+BULK_UPDATE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_TRANSITION, default=0): vol.All(vol.Coerce(float), vol.Range(min=0, max=999)),
+        vol.Optional(ATTR_LIGHTS, default=[]): vol.All(cv.ensure_list, [LIGHT_TARGET_SCHEMA]),
+        vol.Optional(ATTR_CHANNELS, default=[]): vol.All(cv.ensure_list, [CHANNEL_TARGET_SCHEMA]),
+    }
+)
+
+SNAPSHOT_NAME = vol.All(cv.string, vol.Length(min=1, max=64))
+
+CAPTURE_SNAPSHOT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): SNAPSHOT_NAME,
+        vol.Optional(ATTR_HOST): cv.string,
+        vol.Optional(ATTR_UNIVERSES): vol.All(cv.ensure_list, [vol.All(vol.Coerce(int), vol.Range(min=0, max=32767))]),
+    }
+)
+
+RECALL_SNAPSHOT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): SNAPSHOT_NAME,
+        vol.Optional(ATTR_TRANSITION, default=0): vol.All(vol.Coerce(float), vol.Range(min=0, max=999)),
+    }
+)
+
+DELETE_SNAPSHOT_SCHEMA = vol.Schema({vol.Required(ATTR_NAME): SNAPSHOT_NAME})
+
+CUE_LIST_SCHEMA = vol.Schema({vol.Required(ATTR_CUE_LIST): cv.slug})
+
+CUE_LIST_GO_SCHEMA = CUE_LIST_SCHEMA.extend({vol.Optional(ATTR_CUE): vol.All(vol.Coerce(int), vol.Range(min=1))})
+
+REPLAY_SPEED = vol.All(vol.Coerce(float), vol.Range(min=0.01, max=100))
+
+REPLAY_POSITION_SCHEMA = {
+    vol.Exclusive(ATTR_POSITION, "position"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Exclusive(ATTR_AT, "position"): cv.datetime,
+}
+
+REPLAY_START_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_FILE): cv.string,
+        vol.Optional(ATTR_SPEED, default=1.0): REPLAY_SPEED,
+        vol.Optional(ATTR_LOOP, default=False): cv.boolean,
+        vol.Optional(ATTR_DIRECTION, default="sent"): vol.In(REPLAY_DIRECTIONS),
+        **REPLAY_POSITION_SCHEMA,
+    }
+)
+
+REPLAY_SEEK_SCHEMA = vol.All(vol.Schema(REPLAY_POSITION_SCHEMA), cv.has_at_least_one_key(ATTR_POSITION, ATTR_AT))
+
+REPLAY_SPEED_SCHEMA = vol.Schema({vol.Required(ATTR_SPEED): REPLAY_SPEED})
+
+PROFILE_SCHEMA = vol.Schema(
+    {vol.Optional(ATTR_DURATION, default=30): vol.All(vol.Coerce(float), vol.Range(min=1, max=600))}
+)
+
+
+def recording_path(hass: HomeAssistant) -> str:
+    return hass.config.path(STORAGE_DIR, RECORDING_FILE)
+
+
+def snapshot_store_path(hass: HomeAssistant) -> str:
+    return hass.config.path(STORAGE_DIR, SNAPSHOT_FILE)
+
+
+def recall_snapshot(hass: HomeAssistant, snapshot_store: SnapshotStore, name: str, transition: float,
+                    lights: dict[str, DmxBaseLight], nodes_by_host: dict[str, BaseNode]):
+    """Fade to a loaded snapshot in one bulk update; the lights take over its values once they arrived."""
+    snapshot = snapshot_store.get(name)
+    if snapshot is None:
+        raise ServiceValidationError(f"There is no DMX snapshot named {name}")
+
+    universes = []
+    for (host, universe_number), data in snapshot.items():
+        node = nodes_by_host.get(host)
+        try:
+            universe = node.get_universe(universe_number) if node else None
+        except UniverseNotFoundError:
+            universe = None
+        if universe is None:
+            log.warning(f"Skipping universe {universe_number} of {host} in DMX snapshot {name}, "
+                        f"it isn't configured anymore")
+            continue
+        universes.append((universe, data[:universe._data_size]))
+
+    with BulkUpdate(transition) as bulk_update:
+        for universe, data in universes:
+            bulk_update.set_universe(universe, data)
+
+    recalled = {universe for universe, _ in universes}
+    affected = [light for light in lights.values() if light.channel._parent_universe in recalled]
+
+    async def async_refresh_lights():
+        await asyncio.gather(*(light.async_refresh_from_channel() for light in affected))
+
+    hass.async_create_background_task(async_refresh_lights(), "artnet_led snapshot recall")
+
+
+def async_setup_services(hass: HomeAssistant, lights: dict[str, DmxBaseLight], nodes_by_host: dict[str, BaseNode],
+                          cue_lists: dict[str, CueListPlayer], snapshot_store: SnapshotStore):
+    """Register the integration's services once; the registries are filled by the light platform."""
+    if hass.services.has_service(DOMAIN, SERVICE_BULK_UPDATE):
+        return
+
+    def get_node(host: str | None) -> BaseNode:
+        if host is None:
+            if len(nodes_by_host) != 1:
+                raise ServiceValidationError(f"Specify the {ATTR_HOST} of the channels, configured hosts are: "
+                                             f"{', '.join(nodes_by_host)}")
+            return next(iter(nodes_by_host.values()))
+
+        node = nodes_by_host.get(host)
+        if node is None:
+            raise ServiceValidationError(f"No artnet_led node is configured for host {host}")
+        return node
+
+    async def async_bulk_update(call: ServiceCall):
+        transition = call.data[ATTR_TRANSITION]
+
+        # Resolve every target up front, so an invalid one doesn't leave a half applied change behind
+        light_targets = []
+        for target in call.data[ATTR_LIGHTS]:
+            params = dict(target)
+            entity_ids = params.pop(ATTR_ENTITY_ID)
+            for entity_id in entity_ids:
+                if entity_id not in lights:
+                    raise ServiceValidationError(f"{entity_id} is not an artnet_led light")
+            light_targets.append((entity_ids, params.pop(ATTR_STATE), params))
+
+        channel_targets = []
+        for target in call.data[ATTR_CHANNELS]:
+            node = get_node(target.get(ATTR_HOST))
+            try:
+                universe = node.get_universe(target[ATTR_UNIVERSE])
+            except UniverseNotFoundError:
+                raise ServiceValidationError(f"Universe {target[ATTR_UNIVERSE]} is not configured") from None
+            if target[ATTR_CHANNEL] + len(target[ATTR_VALUES]) - 1 > 512:
+                raise ServiceValidationError(f"Channels starting at {target[ATTR_CHANNEL]} don't fit in a universe")
+            channel_targets.append((universe, target[ATTR_CHANNEL], target[ATTR_VALUES]))
+
+        with BulkUpdate(transition) as bulk_update:
+            for universe, channel, values in channel_targets:
+                bulk_update.set_range(universe, channel, values)
+
+            # Through the light services, for their profiles, brightness_pct and color mode conversions; the lights
+            # hand their fades to the bulk update, as the service calls run in this context
+            try:
+                for entity_ids, state, params in light_targets:
+                    service = SERVICE_TURN_ON if state else SERVICE_TURN_OFF
+                    data = {ATTR_ENTITY_ID: entity_ids, **(params if state else {}), ATTR_TRANSITION: transition}
+                    await hass.services.async_call(LIGHT_DOMAIN, service, data, blocking=True, context=call.context)
+            except Exception:
+                # Nothing gets applied, so the channels still hold what the lights changed so far have to show again
+                affected = [lights[entity_id] for entity_ids, _, _ in light_targets for entity_id in entity_ids
+                            if entity_id in lights]
+
+                async def async_refresh_lights():
+                    await asyncio.gather(*(light.async_refresh_from_channel() for light in affected))
+
+                hass.async_create_background_task(async_refresh_lights(), "artnet_led bulk update rollback")
+                raise
+
+        log.debug(f"Bulk updated {sum(len(entity_ids) for entity_ids, _, _ in light_targets)} lights and "
+                  f"{len(channel_targets)} channel ranges")
+
+    hass.services.async_register(DOMAIN, SERVICE_BULK_UPDATE, async_bulk_update, schema=BULK_UPDATE_SCHEMA)
+
+    async def async_load_snapshots():
+        if snapshot_store.loaded:
+            return
+        try:
+            await hass.async_add_executor_job(snapshot_store.load)
+        except (OSError, SnapshotFormatError) as e:
+            raise HomeAssistantError(f"Unable to read DMX snapshots from {snapshot_store.path}: {e}") from e
+
+    async def async_capture_snapshot(call: ServiceCall):
+        await async_load_snapshots()
+
+        hosts = [call.data[ATTR_HOST]] if ATTR_HOST in call.data else list(nodes_by_host)
+        universe_numbers = call.data.get(ATTR_UNIVERSES)
+
+        captured = []
+        for host in hosts:
+            node = get_node(host)
+            for universe in node._universes:
+                if universe_numbers is None or universe._universe in universe_numbers:
+                    captured.append((host, universe._universe, universe._data))
+        if not captured:
+            raise ServiceValidationError("None of the requested universes is configured")
+
+        snapshot_store.capture(call.data[ATTR_NAME], captured)
+        await hass.async_add_executor_job(snapshot_store.save)
+        log.debug(f"Captured {len(captured)} universes into DMX snapshot {call.data[ATTR_NAME]}")
+
+    async def async_recall_snapshot(call: ServiceCall):
+        await async_load_snapshots()
+        recall_snapshot(hass, snapshot_store, call.data[ATTR_NAME], call.data[ATTR_TRANSITION], lights, nodes_by_host)
+
+    async def async_delete_snapshot(call: ServiceCall):
+        await async_load_snapshots()
+
+        if not snapshot_store.delete(call.data[ATTR_NAME]):
+            raise ServiceValidationError(f"There is no DMX snapshot named {call.data[ATTR_NAME]}")
+        await hass.async_add_executor_job(snapshot_store.save)
+
+    hass.services.async_register(DOMAIN, SERVICE_CAPTURE_SNAPSHOT, async_capture_snapshot,
+                                 schema=CAPTURE_SNAPSHOT_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_RECALL_SNAPSHOT, async_recall_snapshot,
+                                 schema=RECALL_SNAPSHOT_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_DELETE_SNAPSHOT, async_delete_snapshot,
+                                 schema=DELETE_SNAPSHOT_SCHEMA)
+
+    def get_cue_list(call: ServiceCall) -> CueListPlayer:
+        player = cue_lists.get(call.data[ATTR_CUE_LIST])
+        if player is None:
+            raise ServiceValidationError(f"No cue list named {call.data[ATTR_CUE_LIST]} is configured")
+        return player
+
+    async def async_cue_list_go(call: ServiceCall):
+        player = get_cue_list(call)
+        if ATTR_CUE not in call.data:
+            player.go()
+            return
+        if call.data[ATTR_CUE] > len(player.cues):
+            raise ServiceValidationError(f"Cue list {player.name} only has {len(player.cues)} cues")
+        player.go(call.data[ATTR_CUE] - 1)
+
+    async def async_cue_list_back(call: ServiceCall):
+        get_cue_list(call).back()
+
+    async def async_cue_list_stop(call: ServiceCall):
+        get_cue_list(call).stop()
+
+    hass.services.async_register(DOMAIN, SERVICE_CUE_LIST_GO, async_cue_list_go, schema=CUE_LIST_GO_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_CUE_LIST_BACK, async_cue_list_back, schema=CUE_LIST_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_CUE_LIST_STOP, async_cue_list_stop, schema=CUE_LIST_SCHEMA)
+
+    replays: list[Replay] = []
+
+    def get_replay() -> Replay:
+        if not replays:
+            raise ServiceValidationError("No recording is being replayed")
+        return replays[0]
+
+    def replay_timestamp(replay: Replay, data: dict) -> float:
+        recording = replay.recording
+        if ATTR_AT in data:
+            at: datetime.datetime = data[ATTR_AT]
+            return at.timestamp() - recording.wall_clock_offset
+        return recording.frame(recording.oldest).timestamp + data.get(ATTR_POSITION, 0.0)
+
+    async def async_stop_replay():
+        if replays:
+            replay = replays.pop()
+            replay.stop()
+            await hass.async_add_executor_job(replay.recording.close)
+
+    async def async_replay_start(call: ServiceCall):
+        controller = next((node for node in nodes_by_host.values() if isinstance(node, ArtNetController)), None)
+        if controller is None:
+            raise ServiceValidationError("Replaying a recording needs an artnet-controller node")
+
+        path = hass.config.path(call.data[ATTR_FILE]) if ATTR_FILE in call.data else recording_path(hass)
+        if ATTR_FILE in call.data and not hass.config.is_allowed_path(path):
+            raise ServiceValidationError(f"{path} is not in an allowed directory")
+        recorder = controller.recorder
+        if recorder is not None and os.path.abspath(recorder.path) == os.path.abspath(path):
+            raise ServiceValidationError(f"{path} is still being recorded to, replay a copy of it instead")
+
+        await async_stop_replay()
+        try:
+            recording = await hass.async_add_executor_job(FrameRecorder.open_recording, path)
+        except (OSError, ValueError) as e:
+            raise HomeAssistantError(f"Unable to open recording {path}: {e}") from e
+
+        try:
+            replay = Replay(hass, controller._universes, recording,
+                            direction=REPLAY_DIRECTIONS[call.data[ATTR_DIRECTION]], speed=call.data[ATTR_SPEED],
+                            loop=call.data[ATTR_LOOP])
+        except ValueError as e:
+            await hass.async_add_executor_job(recording.close)
+            raise ServiceValidationError(str(e)) from e
+        replays.append(replay)
+        replay.seek(replay_timestamp(replay, call.data))
+
+    async def async_replay_seek(call: ServiceCall):
+        replay = get_replay()
+        replay.seek(replay_timestamp(replay, call.data))
+
+    async def async_replay_speed(call: ServiceCall):
+        get_replay().set_speed(call.data[ATTR_SPEED])
+
+    async def async_replay_stop(call: ServiceCall):
+        await async_stop_replay()
+
+    hass.services.async_register(DOMAIN, SERVICE_REPLAY_START, async_replay_start, schema=REPLAY_START_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_REPLAY_SEEK, async_replay_seek, schema=REPLAY_SEEK_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_REPLAY_SPEED, async_replay_speed, schema=REPLAY_SPEED_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_REPLAY_STOP, async_replay_stop, schema=vol.Schema({}))
+
+    async def async_get_diagnostics(call: ServiceCall) -> ServiceResponse:
+        return get_diagnostics(nodes_by_host)
+
+    hass.services.async_register(DOMAIN, SERVICE_GET_DIAGNOSTICS, async_get_diagnostics, schema=vol.Schema({}),
+                                 supports_response=SupportsResponse.ONLY)
+
+    profiler = Profiler(hass)
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        if profiler.running:
+            raise ServiceValidationError("A profile is already being taken")
+        profiler.start()
+        if call.return_response:
+            return await profiler.async_profile(call.data[ATTR_DURATION])
+        hass.async_create_background_task(profiler.async_profile(call.data[ATTR_DURATION]), "artnet_led profile")
+        return None
+
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA,
+                                 supports_response=SupportsResponse.OPTIONAL)
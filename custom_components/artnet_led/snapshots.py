@@ -0,0 +1,117 @@
+"""
+Named snapshots of universe buffers, kept in one compact binary file.
+
+The file starts with a small index followed by the raw universe data, every universe padded to a full 512 byte DMX
+frame::
+
+    header    ">4sBH"  magic, format version, number of index entries
+    entry     ">BH"    length of the snapshot name, universe number, followed by the UTF-8 name,
+              ">B"     length of the node host, followed by the UTF-8 host
+    data      512 bytes per index entry, in index order
+"""
+from __future__ import annotations
+
+import logging
+import os
+import struct
+from typing import Iterable
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"ALSN"
+VERSION = 1
+UNIVERSE_SIZE = 512
+
+_HEADER = struct.Struct(">4sBH")
+_ENTRY = struct.Struct(">BH")
+_HOST = struct.Struct(">B")
+
+
+class SnapshotFormatError(Exception):
+    pass
+
+
+class SnapshotStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.snapshots: dict[str, dict[tuple[str, int], bytes]] = {}
+        self.loaded = False
+
+    def capture(self, name: str, universes: Iterable[tuple[str, int, bytes | bytearray]]):
+        """Replace a snapshot with the given ``(host, universe, buffer)`` triples."""
+        self.snapshots[name] = {(host, universe): bytes(data[:UNIVERSE_SIZE]).ljust(UNIVERSE_SIZE, b"\0")
+                                for host, universe, data in universes}
+
+    def get(self, name: str) -> dict[tuple[str, int], bytes] | None:
+        return self.snapshots.get(name)
+
+    def delete(self, name: str) -> bool:
+        return self.snapshots.pop(name, None) is not None
+
+    def load(self):
+        """Read the file, if there is one. Blocking, run it in the executor."""
+        try:
+            with open(self.path, "rb") as file:
+                content = file.read()
+        except FileNotFoundError:
+            self.loaded = True
+            return
+        self.snapshots = self.decode(memoryview(content))
+        self.loaded = True
+        log.debug(f"Loaded {len(self.snapshots)} DMX snapshots from {self.path}")
+
+    def save(self):
+        """Write the file atomically. Blocking, run it in the executor."""
+        content = self.encode(self.snapshots)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(content)
+        os.replace(temporary, self.path)
+
+    @staticmethod
+    def encode(snapshots: dict[str, dict[tuple[str, int], bytes]]) -> bytes:
+        entries = [(name, host, universe, data)
+                   for name, universes in snapshots.items()
+                   for (host, universe), data in universes.items()]
+
+        index = bytearray(_HEADER.pack(MAGIC, VERSION, len(entries)))
+        for name, host, universe, _ in entries:
+            encoded_name = name.encode("utf-8")
+            encoded_host = host.encode("utf-8")
+            index += _ENTRY.pack(len(encoded_name), universe) + encoded_name
+            index += _HOST.pack(len(encoded_host)) + encoded_host
+
+        return bytes(index) + b"".join(data for *_, data in entries)
+
+    @staticmethod
+    def decode(content: memoryview) -> dict[str, dict[tuple[str, int], bytes]]:
+        if len(content) < _HEADER.size:
+            raise SnapshotFormatError("Snapshot file is truncated")
+        magic, version, count = _HEADER.unpack_from(content)
+        if magic != MAGIC or version != VERSION:
+            raise SnapshotFormatError(f"Unsupported snapshot file (magic {bytes(magic)!r}, version {version})")
+
+        offset = _HEADER.size
+        entries = []
+        try:
+            for _ in range(count):
+                name_length, universe = _ENTRY.unpack_from(content, offset)
+                offset += _ENTRY.size
+                name = bytes(content[offset:offset + name_length]).decode("utf-8")
+                offset += name_length
+                host_length, = _HOST.unpack_from(content, offset)
+                offset += _HOST.size
+                host = bytes(content[offset:offset + host_length]).decode("utf-8")
+                offset += host_length
+                entries.append((name, host, universe))
+        except struct.error as e:
+            raise SnapshotFormatError("Snapshot index is truncated") from e
+
+        if len(content) - offset != count * UNIVERSE_SIZE:
+            raise SnapshotFormatError("Snapshot data doesn't match its index")
+
+        snapshots: dict[str, dict[tuple[str, int], bytes]] = {}
+        for name, host, universe in entries:
+            snapshots.setdefault(name, {})[(host, universe)] = bytes(content[offset:offset + UNIVERSE_SIZE])
+            offset += UNIVERSE_SIZE
+        return snapshots
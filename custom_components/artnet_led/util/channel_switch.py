@@ -1,7 +1,7 @@
 import functools
 import logging
 from math import floor
-from typing import Union
+from typing import Callable, Sequence, Union
 
 from homeassistant.exceptions import IntegrationError
 from homeassistant.util.color import color_RGB_to_hsv, color_hsv_to_RGB, rgbww_to_color_temperature
@@ -30,163 +30,202 @@ def _default_calculation_function(channel_value):
     return channel_value if isinstance(channel_value, int) else 0
 
 
-def to_values(channel_setup: str, channel_size: int, is_on: bool = True, brightness: int = 255, red: int = -1,
-              green: int = -1, blue: int = -1, cold_white: int = -1, warm_white: int = -1,
-              color_temp_kelvin: int | None = None, min_kelvin: int | None = None, max_kelvin: int | None = None
-              ) -> list[int]:
-
-    if min_kelvin is not None and max_kelvin is not None:
-        kelvin_diff = (max_kelvin - min_kelvin)
-
-        if cold_white == -1 and warm_white == -1 and color_temp_kelvin is not None:
-            cold_white = 255 * (color_temp_kelvin - min_kelvin) / kelvin_diff
+# d = dimmer
+# r = red (scaled for brightness)
+# R = red (not scaled)
+# g = green (scaled for brightness)
+# G = green (not scaled)
+# b = blue (scaled for brightness)
+# B = blue (not scaled)
+# w = white (automatically calculated, scaled for brightness)
+# W = white (automatically calculated, not scaled)
+# c = cool (scaled for brightness)
+# C = cool (not scaled)
+# h = hot (scaled for brightness)
+# H = hot (not scaled)
+# t = temperature (0 = hot, 255 = cold)
+# T = temperature (255 = hot, 0 = cold)
+# u = hue
+# U = saturation
+
+# Index into (red, green, blue, cold_white, warm_white) of the color channels
+_SCALED_COLORS = {"r": 0, "g": 1, "b": 2, "w": 3, "c": 3, "h": 4}
+_UNSCALED_COLORS = {"R": 0, "G": 1, "B": 2, "W": 3, "C": 3, "H": 4}
+
+# Index into (red, green, blue, cold_white, warm_white, hue, saturation) of what a channel decodes into
+_DECODED_SCALED = {"r": 0, "g": 1, "b": 2, "w": 3, "c": 3, "h": 4}
+_DECODED_PLAIN = {"R": 0, "G": 1, "B": 2, "W": 3, "C": 3, "H": 4, "t": 3, "T": 4}
+# Hue and saturation, with the full scale of their range
+_DECODED_ANGLES = {"u": (5, 360), "U": (6, 100)}
+
+
+def _out_of_bounds(channel, value: int) -> int:
+    log.warning(f"Value for channel {channel} isn't within bound: {value}")
+    return max(0, min(255, value))
+
+
+def _encoded(channel, value: float, channel_size: int) -> int:
+    value = floor(value)
+    if not (0 <= value <= 255):
+        value = _out_of_bounds(channel, value)
+    return int(round(value * channel_size))
+
+
+@functools.lru_cache(maxsize=None)
+def compile_encoder(channel_setup: Union[str, tuple], channel_size: int,
+                    min_kelvin: int | None = None, max_kelvin: int | None = None
+                    ) -> Callable[..., list[int]]:
+    """
+    Compile a channel setup into ``encode(is_on, brightness, red, green, blue, cold_white, warm_white,
+    color_temp_kelvin)``, which returns the DMX values exactly like ``to_values`` does.
+    """
+    has_kelvin = min_kelvin is not None and max_kelvin is not None
+    kelvin_diff = max_kelvin - min_kelvin if has_kelvin else None
+
+    # Fixed values in the setup are known up front; unknown letters are always 0
+    template = []
+    dimmers, scaled, unscaled, temperatures, hsv_parts = [], [], [], [], []
+    for index, channel in enumerate(channel_setup):
+        template.append(0)
+        if channel == "d":
+            dimmers.append((index, channel))
+        elif channel in _SCALED_COLORS:
+            scaled.append((index, channel, _SCALED_COLORS[channel]))
+        elif channel in _UNSCALED_COLORS:
+            unscaled.append((index, channel, _UNSCALED_COLORS[channel]))
+        elif channel in ("t", "T"):
+            temperatures.append((index, channel, channel == "T"))
+        elif channel in ("u", "U"):
+            hsv_parts.append((index, channel, 0 if channel == "u" else 1, 360 if channel == "u" else 100))
+        else:
+            template[index] = _encoded(channel, _default_calculation_function(channel), channel_size)
+    dimmers, scaled, unscaled, temperatures, hsv_parts = \
+        tuple(dimmers), tuple(scaled), tuple(unscaled), tuple(temperatures), tuple(hsv_parts)
+
+    def encode(is_on, brightness, red, green, blue, cold_white, warm_white, color_temp_kelvin):
+        if has_kelvin:
+            if cold_white == -1 and warm_white == -1 and color_temp_kelvin is not None:
+                cold_white = 255 * (color_temp_kelvin - min_kelvin) / kelvin_diff
+                warm_white = 255 - cold_white
+            elif cold_white != -1 and warm_white != -1 and color_temp_kelvin is None:
+                color_temp_kelvin, _ = rgbww_to_color_temperature((red, green, blue, cold_white, warm_white),
+                                                                  min_kelvin, max_kelvin)
+
+        values = list(template)
+        for index, channel in dimmers:
+            values[index] = _encoded(channel, brightness, channel_size)
+
+        if scaled or unscaled:
+            colors = (red, green, blue, cold_white, warm_white)
+            max_color = max(1, max(colors))
+            for index, channel, color in scaled:
+                values[index] = _encoded(channel, is_on * colors[color] * brightness / max_color, channel_size)
+            for index, channel, color in unscaled:
+                values[index] = _encoded(channel, is_on * colors[color] * 255 / max_color, channel_size)
+
+        if temperatures:
+            temperature = (color_temp_kelvin - min_kelvin) * 255 / kelvin_diff
+            for index, channel, inverted in temperatures:
+                values[index] = _encoded(channel, 255 - temperature if inverted else temperature, channel_size)
+
+        if hsv_parts:
+            hsv = color_RGB_to_hsv(red, green, blue)
+            for index, channel, part, full_scale in hsv_parts:
+                values[index] = _encoded(channel, hsv[part] * 255 / full_scale, channel_size)
+
+        return values
+
+    return encode
+
+
+@functools.lru_cache(maxsize=None)
+def compile_decoder(channel_setup: Union[str, tuple], channel_size: int,
+                    min_kelvin: int | None = None, max_kelvin: int | None = None
+                    ) -> Callable[[Sequence[int]], tuple]:
+    """
+    Compile a channel setup into ``decode(values)``, which returns ``(is_on, brightness, red, green, blue,
+    cold_white, warm_white, color_temp_kelvin)`` exactly like ``from_values`` does.
+    """
+    has_kelvin = min_kelvin is not None and max_kelvin is not None
+
+    # The first dimmer channel is the brightness, otherwise the brightest color channel in front of it
+    dimmer = next((index for index, channel in enumerate(channel_setup) if channel == "d"), None)
+    colors = tuple(index for index, channel in enumerate(channel_setup[:dimmer])
+                   if isinstance(channel, str) and channel in "rgbwch")
+
+    # Where several channels decode into the same field, the last one wins
+    fields = {}
+    for index, channel in enumerate(channel_setup):
+        if not isinstance(channel, str):
+            continue
+        if channel in _DECODED_SCALED:
+            fields[_DECODED_SCALED[channel]] = (index, True, None)
+        elif channel in _DECODED_PLAIN:
+            fields[_DECODED_PLAIN[channel]] = (index, False, None)
+        elif channel in _DECODED_ANGLES:
+            field, full_scale = _DECODED_ANGLES[channel]
+            fields[field] = (index, False, full_scale)
+    fields = tuple((field, index, is_scaled, full_scale) for field, (index, is_scaled, full_scale) in fields.items())
+
+    def decode(values):
+        if dimmer is not None:
+            brightness = floor(values[dimmer] / channel_size)
+        elif colors:
+            brightness = floor(max(values[index] for index in colors) / channel_size)
+        else:
+            brightness = 255
+        is_on = brightness > 0
+
+        # red, green, blue, cold_white, warm_white, hue, saturation
+        decoded = [None] * 7
+        for field, index, is_scaled, full_scale in fields:
+            value = floor(values[index] / channel_size)
+            if is_scaled:
+                decoded[field] = value if brightness == 0 else round(value * 255 / brightness)
+            elif full_scale is not None:
+                decoded[field] = int(value * full_scale / 255)
+            else:
+                decoded[field] = value
+        red, green, blue, cold_white, warm_white, hue, saturation = decoded
+
+        if cold_white is None and warm_white is not None:
+            cold_white = 255 - warm_white
+        elif cold_white is not None and warm_white is None:
             warm_white = 255 - cold_white
-        elif cold_white != -1 and warm_white != -1 and color_temp_kelvin is None:
-            color_temp_kelvin, _ = rgbww_to_color_temperature((red, green, blue, cold_white, warm_white), min_kelvin, max_kelvin)
-
-    max_color = max(1, max(red, green, blue, cold_white, warm_white))
-
-    # d = dimmer
-    # r = red (scaled for brightness)
-    # R = red (not scaled)
-    # g = green (scaled for brightness)
-    # G = green (not scaled)
-    # b = blue (scaled for brightness)
-    # B = blue (not scaled)
-    # w = white (automatically calculated, scaled for brightness)
-    # W = white (automatically calculated, not scaled)
-    # c = cool (scaled for brightness)
-    # C = cool (not scaled)
-    # h = hot (scaled for brightness)
-    # H = hot (not scaled)
-    # t = temperature (0 = hot, 255 = cold)
-    # T = temperature (255 = hot, 0 = cold)
-    # u = hue
-    # U = saturation
-    switcher = {
-        "d": lambda: brightness,
-        "r": lambda: is_on * red * brightness / max_color,
-        "R": lambda: is_on * red * 255 / max_color,
-        "g": lambda: is_on * green * brightness / max_color,
-        "G": lambda: is_on * green * 255 / max_color,
-        "b": lambda: is_on * blue * brightness / max_color,
-        "B": lambda: is_on * blue * 255 / max_color,
-        "w": lambda: is_on * cold_white * brightness / max_color,
-        "W": lambda: is_on * cold_white * 255 / max_color,
-        "c": lambda: is_on * cold_white * brightness / max_color,
-        "C": lambda: is_on * cold_white * 255 / max_color,
-        "h": lambda: is_on * warm_white * brightness / max_color,
-        "H": lambda: is_on * warm_white * 255 / max_color,
-        "t": lambda: (color_temp_kelvin - min_kelvin) * 255 / kelvin_diff,
-        "T": lambda: 255 - (color_temp_kelvin - min_kelvin) * 255 / kelvin_diff,
-        "u": lambda: color_RGB_to_hsv(red, green, blue)[0] * 255 / 360,
-        "U": lambda: color_RGB_to_hsv(red, green, blue)[1] * 255 / 100,
-    }
-
-    values: list[int] = list()
-    for channel in channel_setup:
-        calculation_function = switcher.get(channel, functools.partial(_default_calculation_function, channel))
-        value = floor(calculation_function())
-        if not (0 <= value <= 255):
-            log.warning(f"Value for channel {channel} isn't within bound: {value}")
-            value = max(0, min(255, value))
 
-        values.append(int(round(value * channel_size)))
+        color_temp_kelvin = None
+        if has_kelvin:
+            white_sum = cold_white + warm_white
+            if white_sum == 0:
+                color_temp_kelvin = round((min_kelvin + max_kelvin) / 2)
+            else:
+                cold_ratio = cold_white / white_sum
+                color_temp_kelvin = round(min_kelvin - min_kelvin * cold_ratio + max_kelvin * cold_ratio)
 
-    return values
+        if hue is not None and saturation is not None and red is None and green is None and blue is None:
+            red, green, blue = color_hsv_to_RGB(hue, saturation, 1)
+        return is_on, brightness, red, green, blue, cold_white, warm_white, color_temp_kelvin
 
+    return decode
 
-def from_values(channel_setup: str, channel_size: int, values: list[int],
-                min_kelvin: int | None = None, max_kelvin: int | None = None):
-    assert len(channel_setup) == len(values)
 
-    brightness: int | None = None
-    red: int | None = None
-    green: int | None = None
-    blue: int | None = None
-    hue: int | None = None
-    saturation: int | None = None
-    cold_white: int | None = None
-    warm_white: int | None = None
-    color_temp_kelvin: int | None = None
-
-    # Find brightness
-    for index, channel in enumerate(channel_setup):
-        value = values[index]
+def _setup_key(channel_setup: Union[str, list]) -> Union[str, tuple]:
+    return channel_setup if isinstance(channel_setup, str) else tuple(channel_setup)
 
-        if channel == "d":
-            brightness = value
-            break
-
-        elif channel in "rgbwch":
-            if brightness is None or value > brightness:
-                brightness = value
-
-    if brightness is None:
-        brightness = 255
-    else:
-        brightness = floor(brightness / channel_size)
-
-    is_on = brightness > 0
 
-    # Get values
-    for index, channel in enumerate(channel_setup):
-        value = floor(values[index] / channel_size)
-
-        if channel == "r":
-            red = _scale_brightness(value, brightness)
-        elif channel == "R":
-            red = value
-        elif channel == "g":
-            green = _scale_brightness(value, brightness)
-        elif channel == "G":
-            green = value
-        elif channel == "b":
-            blue = _scale_brightness(value, brightness)
-        elif channel == "B":
-            blue = value
-        elif channel in "wc":
-            cold_white = _scale_brightness(value, brightness)
-        elif channel in "WC":
-            cold_white = value
-        elif channel == "h":
-            warm_white = _scale_brightness(value, brightness)
-        elif channel == "H":
-            warm_white = value
-        elif channel == "t":
-            cold_white = value
-        elif channel == "T":
-            warm_white = value
-        elif channel == "u":
-            hue = int(value * 360 / 255)
-        elif channel == "U":
-            saturation = int(value * 100 / 255)
-
-    if cold_white is None and warm_white is not None:
-        cold_white = 255 - warm_white
-    elif cold_white is not None and warm_white is None:
-        warm_white = 255 - cold_white
-
-    if min_kelvin is not None and max_kelvin is not None:
-        white_sum = cold_white + warm_white
-        if white_sum == 0:
-            color_temp_kelvin = round((min_kelvin + max_kelvin) / 2)
-        else:
-            cold_ratio = cold_white / (white_sum)
-            color_temp_kelvin = round(min_kelvin - min_kelvin * cold_ratio + max_kelvin * cold_ratio)
-
-    if hue is not None and saturation is not None and red is None and green is None and blue is None:
-        red, green, blue = color_hsv_to_RGB(hue, saturation, 1)
+def to_values(channel_setup: str, channel_size: int, is_on: bool = True, brightness: int = 255, red: int = -1,
+              green: int = -1, blue: int = -1, cold_white: int = -1, warm_white: int = -1,
+              color_temp_kelvin: int | None = None, min_kelvin: int | None = None, max_kelvin: int | None = None
+              ) -> list[int]:
+    encode = compile_encoder(_setup_key(channel_setup), channel_size, min_kelvin, max_kelvin)
+    return encode(is_on, brightness, red, green, blue, cold_white, warm_white, color_temp_kelvin)
 
-    return is_on, brightness, red, green, blue, cold_white, warm_white, color_temp_kelvin
 
+def from_values(channel_setup: str, channel_size: int, values: list[int],
+                min_kelvin: int | None = None, max_kelvin: int | None = None):
+    assert len(channel_setup) == len(values)
 
-def _scale_brightness(value: int | None, brightness: int) -> int | None:
-    if value is not None:
-        if brightness == 0:
-            return value
-        else:
-            return round(value * 255 / brightness)
+    return compile_decoder(_setup_key(channel_setup), channel_size, min_kelvin, max_kelvin)(values)
 
 
 class IllegalChannelSetup(IntegrationError):
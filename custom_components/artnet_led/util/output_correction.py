@@ -0,0 +1,179 @@
+"""
+Output correction curves compiled into lookup tables.
+
+pyartnet evaluates its correction functions in floating point for every value of every frame. The curves here are
+drop-in replacements for those functions (``curve(value, value_max)``), but each one is evaluated once per possible
+value and then only looked up: 256 entries for 8 bit channels and 65,536 for 16 bit channels. 24 and 32 bit channels
+would need tables of up to 4 GiB, and a fade on them rarely hits the same raw value twice, so they are computed as
+before.
+
+Called with a NumPy array the lookup is a single gather, which is what the fade engine uses.
+"""
+import functools
+from array import array
+from bisect import bisect_left
+from typing import Callable, Union
+
+import pyartnet
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the installation
+    np = None
+
+TABLE_BYTE_SIZES = (1, 2)
+
+_ndarray = np.ndarray if np is not None else None
+
+_BYTE_SIZE_BY_VALUE_MAX = {256 ** byte_size - 1: byte_size for byte_size in (1, 2, 3, 4)}
+
+
+class CorrectionTable:
+    """Corrected output value for every raw value of one byte size."""
+
+    def __init__(self, function: Callable[[float, int], float], byte_size: int):
+        self.byte_size = byte_size
+        self.value_max = 256 ** byte_size - 1
+
+        typecode = 'B' if byte_size == 1 else 'H'
+        if np is not None:
+            raw = np.arange(self.value_max + 1, dtype=np.float64)
+            corrected = np.clip(np.rint(function(raw, self.value_max)), 0, self.value_max)
+            self.values = array(typecode, corrected.astype(np.dtype(typecode)).tobytes())
+        else:
+            self.values = array(typecode, [min(max(round(function(v, self.value_max)), 0), self.value_max)
+                                           for v in range(self.value_max + 1)])
+
+    @functools.cached_property
+    def array(self) -> "np.ndarray":
+        """Zero-copy NumPy view of the table, for gathers."""
+        return np.frombuffer(self.values, dtype=np.dtype(self.values.typecode))
+
+    @functools.cached_property
+    def inverse(self) -> array:
+        """Raw value for every output value.
+
+        The curves are monotone, so the raw value is found by bisecting the table. An output value that several raw
+        values map to resolves to the lowest of them; one that no raw value maps to, which only an external controller
+        can produce, resolves to the raw value whose output is closest. Either way ``values[inverse[v]]`` is the
+        closest output to ``v`` the curve can reproduce, and our own output round-trips exactly.
+        """
+        size = self.value_max + 1
+        if np is not None:
+            table = self.array
+            outputs = np.arange(size)
+            upper = np.minimum(np.searchsorted(table, outputs, side='left'), self.value_max)
+            lower = np.maximum(upper - 1, 0)
+            closer_below = np.abs(table[lower].astype(np.int64) - outputs) < np.abs(table[upper] - outputs)
+            inverse = np.where(closer_below, lower, upper)
+            # The lowest raw value of a run of equal outputs
+            inverse = np.searchsorted(table, table[inverse], side='left')
+            return array(self.values.typecode, inverse.astype(self.array.dtype).tobytes())
+
+        values = self.values
+        inverse = array(self.values.typecode, bytes(size * values.itemsize))
+        for output in range(size):
+            upper = min(bisect_left(values, output), self.value_max)
+            raw = upper
+            if upper and abs(values[upper - 1] - output) < abs(values[upper] - output):
+                raw = upper - 1
+            inverse[output] = bisect_left(values, values[raw])
+        return inverse
+
+    @functools.cached_property
+    def inverse_bytes(self) -> bytes:
+        """The 8 bit inverse as a ``bytes.translate`` table."""
+        return self.inverse.tobytes()
+
+
+class CorrectionCurve:
+    """Callable like a pyartnet output correction function, backed by one lookup table per byte size."""
+
+    def __init__(self, name: str, function: Callable[[float, int], float]):
+        self.name = name
+        self.function = function
+        self.__tables: dict[int, CorrectionTable] = {}
+        # Table values by value_max, for the scalar fast path of __call__
+        self.__values: dict[int, array] = {}
+
+    def table(self, byte_size: int) -> CorrectionTable | None:
+        """The table for a byte size, None for the sizes that are too wide to tabulate."""
+        if byte_size not in TABLE_BYTE_SIZES:
+            return None
+        table = self.__tables.get(byte_size)
+        if table is None:
+            table = self.__tables[byte_size] = CorrectionTable(self.function, byte_size)
+            self.__values[table.value_max] = table.values
+        return table
+
+    def __call__(self, val: Union[float, "np.ndarray"], max_val: int = 0xFF) -> Union[int, "np.ndarray"]:
+        values = self.__values.get(max_val)
+        if values is not None and val.__class__ is not _ndarray:
+            return values[round(val)]
+
+        byte_size = _BYTE_SIZE_BY_VALUE_MAX.get(max_val)
+        if byte_size is None:
+            return self.function(val, max_val)
+
+        table = self.table(byte_size)
+        if table is not None:
+            if np is not None and isinstance(val, np.ndarray):
+                return table.array[np.rint(val).astype(np.intp)]
+            return table.values[round(val)]
+
+        if np is not None and isinstance(val, np.ndarray):
+            return np.rint(self.function(val, max_val))
+        return self.__output(round(val), max_val)
+
+    def reverse(self, val: int, max_val: int = 0xFF) -> int:
+        """The raw value that produced an output value, see ``CorrectionTable.inverse``."""
+        byte_size = _BYTE_SIZE_BY_VALUE_MAX[max_val]
+        table = self.table(byte_size)
+        if table is not None:
+            return table.inverse[val]
+
+        # Too wide for a table: bisect the monotone curve itself, with the same tie breaking as the tables. The probes
+        # evaluate the function directly, so whatever __call__ keeps for the forward direction never sees them.
+        output = self.__output
+        raw = self.__lowest_raw(val, max_val)
+        if raw and abs(output(raw - 1, max_val) - val) < abs(output(raw, max_val) - val):
+            raw -= 1
+        return self.__lowest_raw(output(raw, max_val), max_val)
+
+    def __output(self, raw: int, max_val: int) -> int:
+        return round(self.function(raw, max_val))
+
+    def __lowest_raw(self, output: int, max_val: int) -> int:
+        """The lowest raw value whose output is at least ``output``, or ``max_val``."""
+        function = self.function
+        low, high = 0, max_val
+        while low < high:
+            middle = (low + high) // 2
+            if round(function(middle, max_val)) < output:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def reverse_values(self, values: array, byte_size: int) -> array:
+        """Raw values for a channel's output values, in bulk."""
+        if byte_size == 1:
+            return array('B', values.tobytes().translate(self.table(1).inverse_bytes))
+        if byte_size in TABLE_BYTE_SIZES:
+            return array(values.typecode, map(self.table(byte_size).inverse.__getitem__, values))
+        max_val = 256 ** byte_size - 1
+        return array(values.typecode, [self.reverse(value, max_val) for value in values])
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__:s} {self.name:s}>'
+
+
+@functools.lru_cache(maxsize=None)
+def correction_curve(name: str) -> Callable[[float, int], float] | None:
+    """The shared correction for a configured name; ``linear`` stays pyartnet's function so it's skipped entirely."""
+    if name is None:
+        return None
+    function = getattr(pyartnet.output_correction, name)
+    if function is pyartnet.output_correction.linear:
+        return function
+    return CorrectionCurve(name, function)
@@ -0,0 +1,106 @@
+import asyncio
+
+import pyartnet
+import pytest
+
+from custom_components.artnet_led.bridge.bulk_update import BulkUpdate, UniverseFade, current_bulk_update
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 5))
+
+
+def node_with_universe() -> tuple[pyartnet.ArtNetNode, pyartnet.base.BaseUniverse, list[bytes]]:
+    node = pyartnet.ArtNetNode("127.0.0.1", 6454, max_fps=40, start_refresh_task=False)
+    sent = []
+    node._send_universe = lambda id, byte_size, values, universe: sent.append(bytes(values))
+    return node, node.add_universe(0), sent
+
+
+def test_changes_land_together():
+    async def scenario():
+        node, universe, sent = node_with_universe()
+        channels = [universe.add_channel(1 + i * 3, 3) for i in range(4)]
+
+        with BulkUpdate(0.1) as bulk_update:
+            assert current_bulk_update() is bulk_update
+            for channel in channels:
+                bulk_update.set_channel(channel, [255, 100, 0])
+            bulk_update.set_range(universe, 100, [1, 2, 3])
+        assert current_bulk_update() is None
+        assert len(node._process_jobs) == 1
+
+        await channels[0]
+        await asyncio.sleep(0.1)
+        assert sent[-1][:12] == bytes([255, 100, 0]) * 4
+        assert sent[-1][99:102] == bytes([1, 2, 3])
+        assert [list(channel.get_values()) for channel in channels] == [[255, 100, 0]] * 4
+        assert node._process_jobs == []
+
+    run(scenario())
+
+
+def test_failure_applies_nothing():
+    async def scenario():
+        node, universe, sent = node_with_universe()
+        channel = universe.add_channel(1, 1)
+        channel.set_values([10])
+
+        with pytest.raises(ValueError):
+            with BulkUpdate(0) as bulk_update:
+                bulk_update.set_channel(channel, [200])
+                bulk_update.set_range(universe, 10, [5])
+                # A later invalid target discards everything collected before it
+                bulk_update.set_range(universe, 512, [1, 2])
+
+        assert current_bulk_update() is None
+        assert node._process_jobs == []
+        assert channel._current_fade is None
+        assert list(channel.get_values()) == [10]
+        assert universe._data[9] == 0
+
+    run(scenario())
+
+
+def test_invalid_channel_values_are_rejected():
+    async def scenario():
+        _, universe, _ = node_with_universe()
+        channel = universe.add_channel(1, 2)
+
+        bulk_update = BulkUpdate()
+        with pytest.raises(ValueError):
+            bulk_update.set_channel(channel, [1])
+        with pytest.raises(ValueError):
+            bulk_update.set_channel(channel, [1, 256])
+
+    run(scenario())
+
+
+def test_each_channel_has_its_own_event():
+    async def scenario():
+        node, universe, _ = node_with_universe()
+        first, second = universe.add_channel(1, 1), universe.add_channel(2, 1)
+
+        with BulkUpdate(5) as bulk_update:
+            bulk_update.set_channel(first, [255])
+            bulk_update.set_channel(second, [255])
+        first_fade, second_fade = first._current_fade, second._current_fade
+        job = first_fade.job
+        assert isinstance(job, UniverseFade)
+        assert first_fade.event is not second_fade.event
+
+        # Fading the channel on its own takes it out of the bulk fade
+        first.set_fade([0], 0)
+        assert first_fade.event.is_set()
+        assert not second_fade.event.is_set()
+        assert not job.is_done
+
+        second_fade.cancel()
+        assert second_fade.event.is_set()
+        assert second._current_fade is None
+        # Nothing left to fade, so the process loop drops the job
+        assert job.is_done
+        await asyncio.wait_for(job.event.wait(), 1)
+        assert job not in node._process_jobs
+
+    run(scenario())
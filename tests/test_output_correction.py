@@ -0,0 +1,92 @@
+from array import array
+from bisect import bisect_left
+
+import pyartnet.output_correction
+import pytest
+
+from custom_components.artnet_led.util import output_correction
+from custom_components.artnet_led.util.output_correction import CorrectionCurve, CorrectionTable, correction_curve
+
+CURVES = ("quadratic", "cubic", "quadruple")
+TABLE_WIDTHS = (1, 2)
+
+
+@pytest.mark.parametrize("name", CURVES)
+@pytest.mark.parametrize("byte_size", TABLE_WIDTHS)
+def test_table_matches_pyartnet(name: str, byte_size: int):
+    function = getattr(pyartnet.output_correction, name)
+    value_max = 256 ** byte_size - 1
+    curve = CorrectionCurve(name, function)
+
+    for raw in range(0, value_max + 1, 1 if byte_size == 1 else 97):
+        assert curve(raw, value_max) == min(max(round(function(raw, value_max)), 0), value_max)
+
+
+@pytest.mark.parametrize("name", CURVES)
+@pytest.mark.parametrize("byte_size", TABLE_WIDTHS)
+def test_reverse_round_trips(name: str, byte_size: int):
+    curve = CorrectionCurve(name, getattr(pyartnet.output_correction, name))
+    table = curve.table(byte_size)
+    values = table.values
+
+    for raw in range(table.value_max + 1):
+        output = values[raw]
+        reverse = curve.reverse(output, table.value_max)
+        assert values[reverse] == output
+        # The lowest raw value that produces the output
+        assert reverse == 0 or values[reverse - 1] < output
+
+
+@pytest.mark.parametrize("name", CURVES)
+@pytest.mark.parametrize("byte_size", TABLE_WIDTHS)
+def test_reverse_of_unreachable_output_is_closest(name: str, byte_size: int):
+    table = CorrectionCurve(name, getattr(pyartnet.output_correction, name)).table(byte_size)
+    values = table.values
+
+    for output in range(table.value_max + 1):
+        # The table is monotone, so the closest outputs are on either side of the insertion point
+        upper = bisect_left(values, output)
+        candidates = [values[index] for index in (upper - 1, upper) if 0 <= index <= table.value_max]
+        assert abs(values[table.inverse[output]] - output) == min(abs(value - output) for value in candidates)
+
+
+@pytest.mark.skipif(output_correction.np is None, reason="NumPy isn't installed")
+@pytest.mark.parametrize("name", CURVES)
+@pytest.mark.parametrize("byte_size", TABLE_WIDTHS)
+def test_numpy_and_pure_tables_agree(monkeypatch: pytest.MonkeyPatch, name: str, byte_size: int):
+    function = getattr(pyartnet.output_correction, name)
+    with_numpy = CorrectionTable(function, byte_size)
+    monkeypatch.setattr(output_correction, "np", None)
+    without_numpy = CorrectionTable(function, byte_size)
+
+    assert with_numpy.values == without_numpy.values
+    assert with_numpy.inverse == without_numpy.inverse
+
+
+@pytest.mark.parametrize("byte_size", TABLE_WIDTHS)
+def test_reverse_values_matches_reverse(byte_size: int):
+    curve = CorrectionCurve("quadratic", pyartnet.output_correction.quadratic)
+    value_max = 256 ** byte_size - 1
+    values = array('B' if byte_size == 1 else 'H', range(0, value_max + 1, 1 if byte_size == 1 else 251))
+
+    assert curve.reverse_values(values, byte_size).tolist() == [curve.reverse(v, value_max) for v in values]
+
+
+@pytest.mark.parametrize("byte_size", (3, 4))
+def test_wide_channels_are_computed_without_state(byte_size: int):
+    curve = CorrectionCurve("cubic", pyartnet.output_correction.cubic)
+    value_max = 256 ** byte_size - 1
+    cached = {name: len(value) for name, value in vars(curve).items() if isinstance(value, dict)}
+
+    for raw in range(0, value_max, value_max // 499):
+        output = curve(raw, value_max)
+        assert output == round(pyartnet.output_correction.cubic(raw, value_max))
+        assert curve(curve.reverse(output, value_max), value_max) == output
+
+    assert curve.table(byte_size) is None
+    assert {name: len(value) for name, value in vars(curve).items() if isinstance(value, dict)} == cached
+
+
+def test_linear_is_left_to_pyartnet():
+    assert correction_curve("linear") is pyartnet.output_correction.linear
+    assert correction_curve("quadratic") is correction_curve("quadratic")
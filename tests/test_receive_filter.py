@@ -0,0 +1,97 @@
+import pytest
+
+from custom_components.artnet_led.client.packet_view import ArtDmxView
+from custom_components.artnet_led.client.receive_filter import REORDER_WINDOW, SOURCE_TIMEOUT, ReceiveFilter
+
+CONSOLE = ("192.168.1.10", 6454)
+OTHER_CONSOLE = ("192.168.1.11", 6454)
+
+
+def dmx(sequence_number: int, data: bytes, physical: int = 0) -> ArtDmxView:
+    return ArtDmxView(14, sequence_number, physical, 0, 0, len(data), memoryview(data))
+
+
+def frame(n: int) -> bytes:
+    """A payload that differs for every n, so only the sequence number decides."""
+    return n.to_bytes(2, "big") * 4
+
+
+def test_accepts_increasing_sequence():
+    receive_filter = ReceiveFilter()
+    assert all(receive_filter.accept(CONSOLE, dmx(n, frame(n)), 0.0) for n in range(1, 50))
+    assert receive_filter.counters() == {"accepted": 49, "duplicates": 0, "out_of_order": 0}
+
+
+def test_sequence_wraps_from_255_to_1():
+    receive_filter = ReceiveFilter()
+    for n in range(250, 256):
+        assert receive_filter.accept(CONSOLE, dmx(n, frame(n)), 0.0)
+
+    assert receive_filter.accept(CONSOLE, dmx(1, frame(256)), 0.0)
+    assert receive_filter.accept(CONSOLE, dmx(2, frame(257)), 0.0)
+    # 255 is now one step behind 1, not 254 ahead of it
+    assert not receive_filter.accept(CONSOLE, dmx(255, frame(258)), 0.0)
+    assert receive_filter.out_of_order == 1
+
+
+@pytest.mark.parametrize("behind, late", [(1, True), (REORDER_WINDOW, True), (REORDER_WINDOW + 1, False)])
+def test_reorder_window(behind: int, late: bool):
+    receive_filter = ReceiveFilter()
+    latest = 100
+    assert receive_filter.accept(CONSOLE, dmx(latest, frame(latest)), 0.0)
+
+    # Further back than the window is taken as the sender having restarted its counter
+    assert receive_filter.accept(CONSOLE, dmx(latest - behind, frame(0)), 0.0) is not late
+    assert receive_filter.out_of_order == int(late)
+
+
+def test_reorder_window_across_the_wrap():
+    receive_filter = ReceiveFilter()
+    assert receive_filter.accept(CONSOLE, dmx(3, frame(3)), 0.0)
+    # 3 - 5 wraps to 253, which is 5 steps behind
+    assert not receive_filter.accept(CONSOLE, dmx(253, frame(253)), 0.0)
+    assert receive_filter.accept(CONSOLE, dmx(255 - REORDER_WINDOW + 2, frame(0)), 0.0)
+
+
+def test_unsequenced_frames_skip_the_order_check():
+    receive_filter = ReceiveFilter()
+    assert receive_filter.accept(CONSOLE, dmx(100, frame(1)), 0.0)
+    assert receive_filter.accept(CONSOLE, dmx(0, frame(2)), 0.0)
+    assert receive_filter.accept(CONSOLE, dmx(0, frame(3)), 0.0)
+    assert receive_filter.out_of_order == 0
+
+
+def test_source_timeout_forgets_the_sequence():
+    receive_filter = ReceiveFilter()
+    assert receive_filter.accept(CONSOLE, dmx(100, frame(1)), 0.0)
+
+    assert not receive_filter.accept(CONSOLE, dmx(99, frame(2)), SOURCE_TIMEOUT)
+    # Silent for longer than the timeout, so the console restarted rather than sent a late frame
+    assert receive_filter.accept(CONSOLE, dmx(99, frame(3)), 2 * SOURCE_TIMEOUT + 0.01)
+
+
+def test_stale_sources_are_dropped():
+    receive_filter = ReceiveFilter()
+    for physical in range(4):
+        receive_filter.accept(CONSOLE, dmx(1, frame(physical), physical), 0.0)
+    assert len(receive_filter.sources) == 4
+
+    receive_filter.accept(OTHER_CONSOLE, dmx(1, frame(10)), SOURCE_TIMEOUT + 0.01)
+    assert list(receive_filter.sources) == [(OTHER_CONSOLE[0], 0)]
+
+
+def test_duplicates():
+    receive_filter = ReceiveFilter()
+    assert receive_filter.accept(CONSOLE, dmx(1, frame(1)), 0.0)
+    assert not receive_filter.accept(CONSOLE, dmx(2, frame(1)), 0.0)
+    assert receive_filter.accept(CONSOLE, dmx(3, frame(2)), 0.0)
+    assert receive_filter.counters() == {"accepted": 2, "duplicates": 1, "out_of_order": 0}
+
+
+def test_duplicates_are_judged_against_the_port_not_the_source():
+    receive_filter = ReceiveFilter()
+    assert receive_filter.accept(CONSOLE, dmx(1, frame(1)), 0.0)
+    assert receive_filter.accept(OTHER_CONSOLE, dmx(1, frame(2)), 0.0)
+    # The first console repeating its own last frame changes the port back
+    assert receive_filter.accept(CONSOLE, dmx(2, frame(1)), 0.0)
+    assert not receive_filter.accept(OTHER_CONSOLE, dmx(2, frame(1)), 0.0)